@@ -2,6 +2,7 @@ from fastapi import HTTPException, Header, status
 from typing import Optional
 from .jwt import decode_access_token
 from database import admins_collection
+from .principal_cache import admin_principal_cache
 
 async def get_current_admin(authorization: Optional[str] = Header(None)):
     """Get current authenticated admin from JWT token"""
@@ -33,8 +34,13 @@ async def get_current_admin(authorization: Optional[str] = Header(None)):
             detail="Invalid or expired token"
         )
     
+    admin_id = payload.get("id")
+    principal = admin_principal_cache.get(admin_id)
+    if principal:
+        return principal
+    
     # Get admin from database
-    admin = await admins_collection.find_one({"id": payload.get("id")})
+    admin = await admins_collection.find_one({"id": admin_id})
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,13 +53,15 @@ async def get_current_admin(authorization: Optional[str] = Header(None)):
         # Fallback to is_super_admin field
         role = "super_admin" if admin.get("is_super_admin", False) else "admin"
     
-    return {
+    principal = {
         "id": admin["id"],
         "username": admin.get("username", admin.get("email", "")),
         "email": admin.get("email", ""),
         "role": role,
         "permissions": admin.get("permissions", {})
     }
+    admin_principal_cache.set(admin_id, principal)
+    return principal
 
 async def require_super_admin(authorization: Optional[str] = Header(None)):
     """Require super admin role"""
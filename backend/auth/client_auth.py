@@ -2,6 +2,7 @@ from fastapi import HTTPException, Header, status
 from typing import Optional
 from .jwt import decode_access_token
 from database import clients_collection
+from .principal_cache import client_principal_cache
 
 async def get_current_client(authorization: Optional[str] = Header(None)):
     """Get current authenticated client from JWT token"""
@@ -40,8 +41,13 @@ async def get_current_client(authorization: Optional[str] = Header(None)):
             detail="Invalid token type"
         )
     
+    client_id = payload.get("id")
+    principal = client_principal_cache.get(client_id)
+    if principal:
+        return principal
+    
     # Get client from database
-    client = await clients_collection.find_one({"id": payload.get("id")})
+    client = await clients_collection.find_one({"id": client_id})
     if not client:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,10 +61,13 @@ async def get_current_client(authorization: Optional[str] = Header(None)):
             detail="Client account is deactivated"
         )
     
-    return {
+    # Only active clients are cached, so deactivation takes effect on invalidate/expiry
+    principal = {
         "id": client["id"],
         "name": client["name"],
         "email": client["email"],
         "company": client.get("company"),
         "phone": client.get("phone")
     }
+    client_principal_cache.set(client_id, principal)
+    return principal
@@ -1,8 +1,32 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+# bcrypt work factor for new hashes. Existing hashes with a different cost are
+# upgraded transparently on the next successful login (see rehash_if_needed).
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
+# bcrypt releases the GIL, so a few threads give real parallelism without
+# letting a login burst starve the event loop or the Mongo driver's threads.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+
+# Hash jobs allowed in flight (running + queued) before new ones are refused
+# with 503 instead of piling up behind each other for seconds.
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -12,3 +36,72 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if unparseable"""
+    try:
+        return int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS"""
+    return get_hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _executor
+
+async def _run_bounded(func, *args):
+    """Run a bcrypt call on the hashing pool, refusing work once the queue is full"""
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        logger.warning(f"Password hashing queue full ({_pending} pending), rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """hash_password without blocking the event loop"""
+    return await _run_bounded(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_bounded(verify_password, plain_password, hashed_password)
+
+async def rehash_if_needed(plain_password: str, hashed_password: str) -> Optional[str]:
+    """
+    After a successful login, return a fresh hash if the stored one uses an
+    outdated cost factor, otherwise None. The caller persists it.
+
+    The upgrade is optional: when the hashing queue is full it is skipped
+    (and retried on a later login) rather than failing a verified login.
+    """
+    if not needs_rehash(hashed_password):
+        return None
+    try:
+        return await hash_password_async(plain_password)
+    except HTTPException:
+        logger.info("Password hashing queue full, deferring rehash to a later login")
+        return None
+
+def shutdown_password_hasher():
+    """Release the hashing threads on application shutdown"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,82 @@
+"""
+In-process cache of authenticated principals.
+
+get_current_admin / get_current_client resolve the token's id claim to an
+admin or client document on every protected request. Caching the resolved
+principal for a short TTL saves that round trip on the dashboard's bursts of
+calls. Routes that change or remove an account call invalidate_everywhere()
+so this worker sees the change immediately and the others as soon as
+utils.cache_versions relays it. Should that relay be down, entries still
+expire, so a revoked or deactivated account is locked out within
+PRINCIPAL_CACHE_TTL_SECONDS at most.
+"""
+import copy
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.cache_versions import cache_versions
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', 1024))
+
+class PrincipalCache:
+    """Small TTL + LRU map from token subject id to the resolved principal"""
+
+    def __init__(self, namespace: str, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS,
+                 max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        cache_versions.register(namespace, self.invalidate)
+
+    def get(self, subject_id: str) -> Optional[Dict]:
+        entry = self._entries.get(subject_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[subject_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(subject_id)
+        self.hits += 1
+        # Hand out a deep copy so a handler mutating its principal (or nested
+        # fields like permissions) can't poison the cache
+        return copy.deepcopy(entry[1])
+
+    def set(self, subject_id: str, principal: Dict):
+        if self.ttl <= 0:
+            return
+        self._entries[subject_id] = (time.monotonic() + self.ttl, copy.deepcopy(principal))
+        self._entries.move_to_end(subject_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject_id: str):
+        self._entries.pop(subject_id, None)
+
+    async def invalidate_everywhere(self, subject_id: str):
+        """Drop the principal here and on every other worker"""
+        self.invalidate(subject_id)
+        await cache_versions.bump(self.namespace, subject_id)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+admin_principal_cache = PrincipalCache("admin")
+client_principal_cache = PrincipalCache("client")
@@ -1,4 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 import os
 import logging
@@ -16,6 +18,13 @@ load_dotenv(ROOT_DIR / ".env")
 # ---------------- ENV VARIABLES ----------------
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "promptforge_dev_db")
+# Raw analytics events expire after this many days (0 keeps them forever);
+# the analytics_daily rollups are kept regardless
+ANALYTICS_RETENTION_DAYS = int(os.getenv("ANALYTICS_RETENTION_DAYS", 180))
+# Funnel sessions idle for this long are dropped (their counts stay)
+FUNNEL_SESSION_TTL_HOURS = int(os.getenv("FUNNEL_SESSION_TTL_HOURS", 24))
+# Realtime events relayed between workers only need to outlive the poll interval
+REALTIME_EVENT_TTL_SECONDS = int(os.getenv("REALTIME_EVENT_TTL_SECONDS", 300))
 
 if not MONGODB_URI:
     logger.error("❌ MONGODB_URI is missing!")
@@ -73,19 +82,297 @@ content_collection = db["content"]
 notes_collection = db["notes"]
 contact_page_collection = db["contact_page"]
 conversations_collection = db["conversations"]
+chat_message_buckets_collection = db["chat_message_buckets"]
 blogs_collection = db["blogs"]
 testimonials_collection = db["testimonials"]
 newsletter_collection = db["newsletter"]
 pricing_collection = db["pricing"]
 analytics_collection = db["analytics"]
+analytics_daily_collection = db["analytics_daily"]
+analytics_hourly_collection = db["analytics_hourly"]
+analytics_visitors_collection = db["analytics_visitors"]
+analytics_funnel_sessions_collection = db["analytics_funnel_sessions"]
+analytics_funnel_daily_collection = db["analytics_funnel_daily"]
 clients_collection = db["clients"]
 client_projects_collection = db["client_projects"]
 bookings_collection = db["bookings"]
 booking_settings_collection = db["booking_settings"]
+booking_slots_collection = db["booking_slots"]
 feelings_services_collection = db["feelings_services"]
 service_requests_collection = db["service_requests"]
 generated_links_collection = db["generated_links"]
 
+# Client project sub-entities (one document per entry, keyed by project_id)
+project_milestones_collection = db["project_milestones"]
+project_tasks_collection = db["project_tasks"]
+project_files_collection = db["project_files"]
+project_comments_collection = db["project_comments"]
+project_chat_messages_collection = db["project_chat_messages"]
+project_activity_collection = db["project_activity"]
+
+# Outgoing email queue drained by utils.email_outbox
+email_outbox_collection = db["email_outbox"]
+# Cross-worker relay for utils.realtime
+realtime_events_collection = db["realtime_events"]
+# Entry versions that keep every worker's in-process caches coherent (utils.cache_versions)
+cache_versions_collection = db["cache_versions"]
+
+# ---------------- INDEXES ----------------
+def _unique(field: str) -> IndexModel:
+    """Unique lookup key. Sparse so legacy documents missing the field don't collide."""
+    return IndexModel([(field, ASCENDING)], name=f"{field}_unique", unique=True, sparse=True)
+
+def _index(*keys, **kwargs) -> IndexModel:
+    """Plain (or compound) index named after its keys, e.g. status_1_created_at_-1"""
+    name = kwargs.pop("name", None) or "_".join(f"{field}_{direction}" for field, direction in keys)
+    return IndexModel(list(keys), name=name, **kwargs)
+
+# Declarative index registry: collection name -> indexes the routes rely on.
+# Reconciled on startup by ensure_indexes(); add new entries here, never ad hoc.
+INDEX_REGISTRY = {
+    "users": [_unique("id"), _unique("email")],
+    "page_content": [
+        _unique("id"),
+        _index(("page", ASCENDING), ("section", ASCENDING)),
+    ],
+    "services": [_unique("id"), _unique("slug"), _index(("order", ASCENDING))],
+    "projects": [
+        _unique("id"),
+        _unique("slug"),
+        _index(("is_private", ASCENDING), ("created_at", DESCENDING)),
+        _index(("created_at", DESCENDING)),
+    ],
+    "contacts": [_unique("id"), _index(("created_at", DESCENDING))],
+    "settings": [_unique("id")],
+    "admins": [
+        _unique("id"),
+        _index(("username", ASCENDING)),
+        _index(("email", ASCENDING)),
+        _index(("role", ASCENDING)),
+    ],
+    "storage": [
+        _unique("id"),
+        _index(("created_by", ASCENDING)),
+        _index(("visibleTo", ASCENDING)),
+        _index(("tags", ASCENDING)),
+    ],
+    "skills": [_unique("id")],
+    "content": [_unique("id")],
+    "notes": [_unique("id"), _index(("updated_at", DESCENDING)), _index(("tags", ASCENDING))],
+    "contact_page": [_unique("id")],
+    "conversations": [
+        _unique("id"),
+        _unique("customer_email"),
+        _index(("last_message_at", DESCENDING)),
+        # Inbox keyset pagination and the unread total
+        _index(("last_message_at", DESCENDING), ("id", DESCENDING)),
+        _index(("unread_count", ASCENDING)),
+    ],
+    # Public chat messages, BUCKET_SIZE per document, see utils/chat_buckets.py
+    "chat_message_buckets": [
+        _index(("conversation_id", ASCENDING), ("seq", ASCENDING), unique=True),
+    ],
+    "blogs": [
+        _unique("id"),
+        _unique("slug"),
+        _index(("status", ASCENDING), ("created_at", DESCENDING)),
+        _index(("created_at", DESCENDING)),
+    ],
+    "testimonials": [
+        _unique("id"),
+        _index(("status", ASCENDING)),
+        _index(("client_id", ASCENDING), ("project_id", ASCENDING)),
+    ],
+    "newsletter": [_unique("id"), _unique("email"), _index(("created_at", DESCENDING))],
+    "pricing": [_unique("id")],
+    "analytics": [
+        _index(("meta.event_type", ASCENDING), ("timestamp", DESCENDING)),
+        _index(("timestamp", DESCENDING)),
+    ],
+    # One counter per (day, event_type, page_name, blog_id), see utils/analytics_rollups.py
+    "analytics_daily": [
+        _index(("day", ASCENDING), ("event_type", ASCENDING), ("page_name", ASCENDING), ("blog_id", ASCENDING), unique=True),
+    ],
+    "analytics_hourly": [
+        _index(("hour", ASCENDING), ("event_type", ASCENDING), ("page_name", ASCENDING), unique=True),
+    ],
+    # HyperLogLog sketch per (day, page_name), see utils/analytics_visitors.py
+    "analytics_visitors": [
+        _index(("day", ASCENDING), ("page_name", ASCENDING), unique=True),
+    ],
+    # Conversion funnel state and counters, see utils/analytics_funnel.py
+    "analytics_funnel_sessions": [
+        _index(("session_id", ASCENDING), unique=True),
+        _index(("updated_at", ASCENDING), expireAfterSeconds=FUNNEL_SESSION_TTL_HOURS * 3600),
+    ],
+    "analytics_funnel_daily": [
+        _index(("day", ASCENDING), ("landing_page", ASCENDING), unique=True),
+    ],
+    "clients": [_unique("id"), _unique("email")],
+    "client_projects": [
+        _unique("id"),
+        _index(("client_id", ASCENDING), ("created_at", DESCENDING)),
+        _index(("status", ASCENDING), ("created_at", DESCENDING)),
+        _index(("created_at", DESCENDING), ("id", DESCENDING)),
+        _index(("tags", ASCENDING)),
+        _index(("chat_unread.client", ASCENDING)),
+        _index(("client_id", ASCENDING), ("chat_unread.admin", ASCENDING)),
+    ],
+    "bookings": [
+        _unique("id"),
+        _index(("preferred_date", ASCENDING), ("preferred_time_slot", ASCENDING), ("status", ASCENDING)),
+        _index(("status", ASCENDING), ("created_at", DESCENDING)),
+        _index(("created_at", DESCENDING)),
+    ],
+    "booking_settings": [_unique("id"), _index(("is_active", ASCENDING))],
+    "booking_slots": [
+        _index(("date", ASCENDING), ("time_slot", ASCENDING), unique=True),
+    ],
+    "feelings_services": [
+        _unique("id"),
+        _index(("is_active", ASCENDING), ("display_order", ASCENDING)),
+        _index(("display_order", ASCENDING)),
+    ],
+    "service_requests": [
+        _unique("id"),
+        _index(("status", ASCENDING), ("created_at", DESCENDING)),
+        _index(("created_at", DESCENDING)),
+    ],
+    "generated_links": [
+        _unique("id"),
+        _unique("short_code"),
+        _index(("request_id", ASCENDING)),
+        _index(("created_at", DESCENDING)),
+    ],
+    "project_milestones": [_unique("id"), _index(("project_id", ASCENDING), ("created_at", ASCENDING))],
+    "project_tasks": [_unique("id"), _index(("project_id", ASCENDING), ("created_at", ASCENDING))],
+    "project_files": [_unique("id"), _index(("project_id", ASCENDING), ("uploaded_at", ASCENDING))],
+    "project_comments": [_unique("id"), _index(("project_id", ASCENDING), ("created_at", ASCENDING))],
+    "project_chat_messages": [
+        _unique("id"),
+        _index(("project_id", ASCENDING), ("created_at", ASCENDING)),
+        _index(("project_id", ASCENDING), ("sender_type", ASCENDING), ("read", ASCENDING)),
+    ],
+    "project_activity": [_unique("id"), _index(("project_id", ASCENDING), ("timestamp", ASCENDING))],
+    "email_outbox": [
+        _unique("id"),
+        _index(("status", ASCENDING), ("next_attempt_at", ASCENDING)),
+    ],
+    "realtime_events": [
+        _index(("created_at", ASCENDING), expireAfterSeconds=REALTIME_EVENT_TTL_SECONDS),
+    ],
+    "cache_versions": [_index(("updated_at", ASCENDING))],
+    # Collections opened directly from their route modules
+    "about_content": [_unique("id")],
+    "credentials": [_unique("id"), _unique("key")],
+}
+
+# Collections created as MongoDB time-series collections (timeseries options).
+# They must exist before ensure_indexes() touches them, otherwise the first
+# index build creates a regular collection under the same name.
+TIMESERIES_COLLECTIONS = {
+    "analytics": {
+        "options": {"timeField": "timestamp", "metaField": "meta", "granularity": "minutes"},
+        "retention_days": ANALYTICS_RETENTION_DAYS,
+    },
+}
+
+_INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+def _index_spec(info: dict) -> dict:
+    """Normalize an index description so registry and server copies can be compared"""
+    # The server reports numeric directions as floats (1.0); registry uses ints
+    spec = {"key": [(field, int(d) if isinstance(d, (int, float)) else d) for field, d in info["key"]]}
+    for option in _INDEX_OPTIONS:
+        if info.get(option) not in (None, False):
+            spec[option] = info[option]
+    return spec
+
+async def ensure_timeseries_collections():
+    """
+    Create missing time-series collections and keep their retention in sync.
+
+    An existing regular collection is left alone with a warning; converting it
+    is done by scripts/maintenance/migrate_analytics_timeseries.py.
+    """
+    existing = {
+        info["name"]: info
+        async for info in db.list_collections(filter={"name": {"$in": list(TIMESERIES_COLLECTIONS)}})
+    }
+
+    for name, spec in TIMESERIES_COLLECTIONS.items():
+        expire_after = spec["retention_days"] * 86400 if spec["retention_days"] > 0 else None
+        info = existing.get(name)
+
+        if info is None:
+            kwargs = {"timeseries": spec["options"]}
+            if expire_after:
+                kwargs["expireAfterSeconds"] = expire_after
+            await db.create_collection(name, **kwargs)
+            logger.info(f"🕒 Created time-series collection {name}")
+        elif info.get("type") != "timeseries":
+            logger.warning(f"⚠️ {name} is a regular collection; run scripts/maintenance/migrate_analytics_timeseries.py")
+        elif info.get("options", {}).get("expireAfterSeconds") != expire_after:
+            await db.command({"collMod": name, "expireAfterSeconds": expire_after or "off"})
+            logger.info(f"🕒 Set {name} retention to {spec['retention_days'] or 'unlimited'} days")
+
+async def ensure_indexes(registry: dict = None) -> dict:
+    """
+    Reconcile INDEX_REGISTRY against the server.
+
+    Creates missing indexes and leaves matching ones alone, so it is safe to
+    run on every startup. Indexes whose definition differs from the registry
+    and indexes the registry doesn't know about are reported as drift, not
+    dropped - fixing them is an explicit admin decision.
+    """
+    registry = registry if registry is not None else INDEX_REGISTRY
+    report = {"created": [], "unchanged": [], "drift": [], "failed": []}
+
+    for collection_name, models in registry.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except OperationFailure:
+            existing = {}
+
+        expected_names = set()
+        for model in models:
+            document = model.document
+            name = document["name"]
+            expected_names.add(name)
+            label = f"{collection_name}.{name}"
+
+            if name in existing:
+                wanted = _index_spec({**document, "key": list(document["key"].items())})
+                actual = _index_spec(existing[name])
+                if wanted == actual:
+                    report["unchanged"].append(label)
+                else:
+                    report["drift"].append({"index": label, "expected": wanted, "actual": actual})
+                continue
+
+            try:
+                await collection.create_indexes([model])
+                report["created"].append(label)
+            except OperationFailure as e:
+                # Typically duplicate values blocking a unique index
+                report["failed"].append({"index": label, "error": str(e)})
+
+        for name, info in existing.items():
+            if name != "_id_" and name not in expected_names:
+                report["drift"].append({"index": f"{collection_name}.{name}", "expected": None, "actual": _index_spec(info)})
+
+    logger.info(
+        f"🗂️ Indexes reconciled | created: {len(report['created'])}, "
+        f"unchanged: {len(report['unchanged'])}, drift: {len(report['drift'])}, failed: {len(report['failed'])}"
+    )
+    for item in report["drift"]:
+        logger.warning(f"⚠️ Index drift on {item['index']}: expected {item['expected']}, found {item['actual']}")
+    for item in report["failed"]:
+        logger.error(f"❌ Could not create index {item['index']}: {item['error']}")
+
+    return report
+
 # ---------------- CLEAN SHUTDOWN ----------------
 async def close_db_connection():
     logger.info("🔌 Closing MongoDB connection...")
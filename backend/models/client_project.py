@@ -96,6 +96,8 @@ class ClientProject(BaseModel):
     notes: Optional[str] = None  # Admin notes visible to client
     
     # Enhanced features
+    # milestones/tasks/files/comments/chat_messages/activity_log are stored in
+    # their own collections (see utils/project_entities.py), not on this document
     milestones: List[ProjectMilestone] = []
     tasks: List[ProjectTask] = []
     files: List[ProjectFile] = []
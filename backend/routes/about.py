@@ -4,26 +4,29 @@ from schemas.about import AboutContentUpdate, AboutContentResponse
 from database import db
 from auth.admin_auth import get_current_admin
 from models.about import AboutContent
+from utils.singleton_cache import singleton_cache
+from utils.public_bundle import public_data_changed
 from datetime import datetime
 import uuid
 
-router = APIRouter(prefix="/about", tags=["about"])
+router = APIRouter(prefix="/about", tags=["about"], dependencies=[Depends(public_data_changed("about"))])
 
 # Collection
 about_collection = db['about_content']
 
+async def load_about_content() -> Optional[dict]:
+    # Should only be one document
+    return await about_collection.find_one({}, {"_id": 0})
+
 @router.get("/", response_model=AboutContentResponse)
 async def get_about_content():
     """Get About page content"""
-    # Get the about content (should only be one document)
-    about_doc = await about_collection.find_one({})
+    about_doc = await singleton_cache.get("about", load_about_content)
     
     if not about_doc:
         # Return default content if none exists
         return get_default_about_content()
     
-    # Remove MongoDB _id field
-    about_doc.pop('_id', None)
     return AboutContentResponse(**about_doc)
 
 @router.put("/", response_model=AboutContentResponse)
@@ -74,6 +77,7 @@ async def update_about_content(
             # Create new content
             content_dict['id'] = str(uuid.uuid4())
             await about_collection.insert_one(content_dict)
+        await singleton_cache.invalidate_everywhere("about")
         
         # Return updated content
         content_dict.pop('_id', None)
@@ -102,6 +106,7 @@ async def initialize_about_content(current_admin: dict = Depends(get_current_adm
     content_dict['updated_by'] = current_admin['username']
     
     await about_collection.insert_one(content_dict)
+    await singleton_cache.invalidate_everywhere("about")
     
     content_dict.pop('_id', None)
     return AboutContentResponse(**content_dict)
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Query
+from typing import List, Optional
 from schemas.client_project import (
     ClientProjectCreate, ClientProjectUpdate, ClientProjectResponse, 
     FileUploadResponse, ProjectFileResponse, MilestoneCreate, MilestoneUpdate,
     MilestoneResponse, TaskCreate, TaskUpdate, TaskResponse, CommentCreate,
     CommentResponse, TeamMemberAdd, TeamMemberResponse, BudgetUpdate,
-    BudgetResponse, ActivityResponse, ChatMessageCreate, ChatMessageResponse
+    BudgetResponse, ActivityResponse, ChatMessageCreate, ChatMessageResponse,
+    ClientProjectSummary, ClientProjectSummaryPage
 )
 from database import client_projects_collection, clients_collection, admins_collection
 from auth.admin_auth import get_current_admin
@@ -14,7 +15,17 @@ from models.client_project import (
     ProjectComment, ProjectActivity, TeamMember, Budget, ChatMessage
 )
 from utils.currency_converter import get_all_currencies, convert_currency, format_currency, get_currency_info
+from utils.project_entities import (
+    PROJECT_ENTITIES, attach_project_entities, load_project, project_exists,
+    add_project_entity, find_project_entity, update_project_entity,
+    delete_project_entity, delete_project_entities, record_project_activity,
+    add_chat_message, mark_chat_messages_read, count_project_entities,
+    resolve_chat_cursor, load_chat_messages_since
+)
+from utils.realtime import broker, long_poll, project_chat_topics, ADMIN_PROJECTS_TOPIC, MAX_LONG_POLL_SECONDS
+from utils.helpers import encode_cursor, decode_cursor, keyset_before
 from datetime import datetime
+import asyncio
 import os
 import uuid
 import shutil
@@ -143,15 +154,102 @@ def convert_project_to_response(project_doc) -> ClientProjectResponse:
 @router.get("/", response_model=List[ClientProjectResponse])
 async def get_all_projects(admin = Depends(get_current_admin)):
     """Get all client projects (Admin only)"""
-    projects = []
-    async for project_doc in client_projects_collection.find():
-        projects.append(convert_project_to_response(project_doc))
-    return projects
+    project_docs = await client_projects_collection.find().to_list(length=None)
+    await attach_project_entities(project_docs)
+    return [convert_project_to_response(project_doc) for project_doc in project_docs]
+
+def _iso(value):
+    """Dates are stored as ISO strings by the routes but as datetimes by older seed data"""
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+@router.get("/summary", response_model=ClientProjectSummaryPage)
+async def get_project_summaries(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    client_id: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    admin = Depends(get_current_admin)
+):
+    """Get a page of project summaries for list views (Admin only)"""
+    query = {}
+    if status_filter:
+        query["status"] = status_filter
+    if priority:
+        query["priority"] = priority
+    if client_id:
+        query["client_id"] = client_id
+    if tags:
+        query["tags"] = {"$all": tags}
+
+    if cursor:
+        after = decode_cursor(cursor)
+        if not after or len(after) != 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        last_created_at, last_id = after
+        query["$or"] = keyset_before("created_at", last_created_at, "id", last_id)
+
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"created_at": -1, "id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "_id": 0, "id": 1, "name": 1, "client_id": 1, "status": 1, "priority": 1,
+            "progress": 1, "start_date": 1, "expected_delivery": 1, "actual_delivery": 1,
+            "tags": 1, "created_at": 1, "last_activity_at": 1,
+            # Entries still embedded on projects that haven't been migrated yet
+            "legacy_tasks": {"$size": {"$ifNull": ["$tasks", []]}},
+            "legacy_files": {"$size": {"$ifNull": ["$files", []]}},
+            "unread_messages": {"$ifNull": ["$chat_unread.client", 0]}
+        }}
+    ]
+    rows = await client_projects_collection.aggregate(pipeline).to_list(length=limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    project_ids = [row["id"] for row in rows]
+    client_ids = list({row["client_id"] for row in rows})
+    task_counts, file_counts, clients = await asyncio.gather(
+        count_project_entities("tasks", project_ids),
+        count_project_entities("files", project_ids),
+        clients_collection.find({"id": {"$in": client_ids}}, {"_id": 0, "id": 1, "name": 1}).to_list(length=None)
+    )
+    client_names = {client["id"]: client.get("name") for client in clients}
+
+    items = [
+        ClientProjectSummary(
+            id=row["id"],
+            name=row["name"],
+            client_id=row["client_id"],
+            client_name=client_names.get(row["client_id"]),
+            status=row["status"],
+            priority=row.get("priority", "medium"),
+            progress=row.get("progress", 0),
+            start_date=_iso(row.get("start_date")),
+            expected_delivery=_iso(row.get("expected_delivery")),
+            actual_delivery=_iso(row.get("actual_delivery")),
+            tags=row.get("tags", []),
+            task_count=row["legacy_tasks"] + task_counts.get(row["id"], 0),
+            file_count=row["legacy_files"] + file_counts.get(row["id"], 0),
+            unread_messages=row["unread_messages"],
+            created_at=_iso(row["created_at"]),
+            last_activity_at=_iso(row.get("last_activity_at"))
+        ) for row in rows
+    ]
+
+    next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
+    return ClientProjectSummaryPage(items=items, next_cursor=next_cursor)
 
 @router.get("/{project_id}", response_model=ClientProjectResponse)
 async def get_project(project_id: str, admin = Depends(get_current_admin)):
     """Get a specific client project (Admin only)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
+    project_doc = await load_project({"id": project_id})
     
     if not project_doc:
         raise HTTPException(
@@ -195,7 +293,7 @@ async def create_project(project_data: ClientProjectCreate, admin = Depends(get_
         admin["id"],
         admin.get("username", "Admin")
     )
-    project.activity_log.append(ProjectActivity(**activity))
+    activity['timestamp'] = activity['timestamp'].isoformat()
     project.last_activity_at = datetime.utcnow()
     
     project_dict = project.model_dump()
@@ -206,20 +304,19 @@ async def create_project(project_data: ClientProjectCreate, admin = Depends(get_
     if project_dict['expected_delivery']:
         project_dict['expected_delivery'] = project_dict['expected_delivery'].isoformat()
     
-    # Convert nested objects
-    project_dict['activity_log'] = [
-        {**a, 'timestamp': a['timestamp'].isoformat() if isinstance(a['timestamp'], datetime) else a['timestamp']}
-        for a in project_dict['activity_log']
-    ]
+    # Sub-entities live in their own collections, not on the project document
+    for kind in PROJECT_ENTITIES:
+        project_dict.pop(kind, None)
     
     await client_projects_collection.insert_one(project_dict)
+    await add_project_entity("activity_log", project.id, activity)
     
-    return convert_project_to_response(project_dict)
+    return convert_project_to_response({**project_dict, 'activity_log': [activity]})
 
 @router.put("/{project_id}", response_model=ClientProjectResponse)
 async def update_project(project_id: str, project_data: ClientProjectUpdate, admin = Depends(get_current_admin)):
     """Update a client project (Admin only)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
+    project_doc = await client_projects_collection.find_one({"id": project_id}, {"status": 1})
     
     if not project_doc:
         raise HTTPException(
@@ -295,23 +392,20 @@ async def update_project(project_id: str, project_data: ClientProjectUpdate, adm
             admin.get("username", "Admin")
         )
         activity['timestamp'] = activity['timestamp'].isoformat()
-        await client_projects_collection.update_one(
-            {"id": project_id},
-            {"$push": {"activity_log": activity}}
-        )
+        await add_project_entity("activity_log", project_id, activity)
     
     await client_projects_collection.update_one(
         {"id": project_id},
         {"$set": update_data}
     )
     
-    updated_project = await client_projects_collection.find_one({"id": project_id})
+    updated_project = await load_project({"id": project_id})
     return convert_project_to_response(updated_project)
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: str, admin = Depends(get_current_admin)):
     """Delete a client project (Admin only)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
+    project_doc = await load_project({"id": project_id}, kinds=["files"])
     
     if project_doc:
         # Delete associated files from filesystem
@@ -331,6 +425,8 @@ async def delete_project(project_id: str, admin = Depends(get_current_admin)):
             detail="Project not found"
         )
     
+    await delete_project_entities(project_id)
+    
     return {"message": "Project deleted successfully"}
 
 # ============================================================================
@@ -340,8 +436,7 @@ async def delete_project(project_id: str, admin = Depends(get_current_admin)):
 @router.post("/{project_id}/milestones", response_model=MilestoneResponse)
 async def add_milestone(project_id: str, milestone_data: MilestoneCreate, admin = Depends(get_current_admin)):
     """Add a milestone to project"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
     milestone = ProjectMilestone(**milestone_data.model_dump())
@@ -360,15 +455,9 @@ async def add_milestone(project_id: str, milestone_data: MilestoneCreate, admin
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "milestones": milestone_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        add_project_entity("milestones", project_id, milestone_dict),
+        record_project_activity(project_id, activity)
     )
     
     return MilestoneResponse(**{**milestone_dict, 'created_at': milestone_dict['created_at']})
@@ -381,32 +470,24 @@ async def update_milestone(
     admin = Depends(get_current_admin)
 ):
     """Update a milestone"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    
-    # Find and update milestone
-    milestones = project_doc.get('milestones', [])
-    milestone_found = False
-    
-    for idx, milestone in enumerate(milestones):
-        if milestone['id'] == milestone_id:
-            milestone_found = True
-            if milestone_data.title is not None:
-                milestones[idx]['title'] = milestone_data.title
-            if milestone_data.description is not None:
-                milestones[idx]['description'] = milestone_data.description
-            if milestone_data.due_date is not None:
-                milestones[idx]['due_date'] = milestone_data.due_date.isoformat()
-            if milestone_data.status is not None:
-                milestones[idx]['status'] = milestone_data.status
-                if milestone_data.status == "completed":
-                    milestones[idx]['completion_date'] = datetime.utcnow().isoformat()
-            if milestone_data.order is not None:
-                milestones[idx]['order'] = milestone_data.order
-            break
-    
-    if not milestone_found:
+    update_data = {}
+    if milestone_data.title is not None:
+        update_data['title'] = milestone_data.title
+    if milestone_data.description is not None:
+        update_data['description'] = milestone_data.description
+    if milestone_data.due_date is not None:
+        update_data['due_date'] = milestone_data.due_date.isoformat()
+    if milestone_data.status is not None:
+        update_data['status'] = milestone_data.status
+        if milestone_data.status == "completed":
+            update_data['completion_date'] = datetime.utcnow().isoformat()
+    if milestone_data.order is not None:
+        update_data['order'] = milestone_data.order
+    
+    milestone = await update_project_entity("milestones", project_id, milestone_id, update_data)
+    if not milestone:
+        if not await project_exists({"id": project_id}):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found")
     
     # Add activity log
@@ -419,23 +500,16 @@ async def update_milestone(
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$set": {
-                "milestones": milestones,
-                "last_activity_at": datetime.utcnow().isoformat()
-            },
-            "$push": {"activity_log": activity}
-        }
-    )
+    await record_project_activity(project_id, activity)
     
-    updated_milestone = milestones[idx]
-    return MilestoneResponse(**updated_milestone)
+    return MilestoneResponse(**milestone)
 
 @router.delete("/{project_id}/milestones/{milestone_id}")
 async def delete_milestone(project_id: str, milestone_id: str, admin = Depends(get_current_admin)):
     """Delete a milestone"""
+    if not await delete_project_entity("milestones", project_id, milestone_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found")
+    
     # Add activity log
     activity = log_activity(
         project_id,
@@ -445,18 +519,7 @@ async def delete_milestone(project_id: str, milestone_id: str, admin = Depends(g
         admin.get("username", "Admin")
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
-    
-    result = await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$pull": {"milestones": {"id": milestone_id}},
-            "$push": {"activity_log": activity},
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
-    )
-    
-    if result.modified_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found")
+    await record_project_activity(project_id, activity)
     
     return {"message": "Milestone deleted successfully"}
 
@@ -467,8 +530,7 @@ async def delete_milestone(project_id: str, milestone_id: str, admin = Depends(g
 @router.post("/{project_id}/tasks", response_model=TaskResponse)
 async def add_task(project_id: str, task_data: TaskCreate, admin = Depends(get_current_admin)):
     """Add a task to project"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
     task = ProjectTask(**task_data.model_dump())
@@ -487,15 +549,9 @@ async def add_task(project_id: str, task_data: TaskCreate, admin = Depends(get_c
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "tasks": task_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        add_project_entity("tasks", project_id, task_dict),
+        record_project_activity(project_id, activity)
     )
     
     return TaskResponse(**task_dict)
@@ -508,35 +564,28 @@ async def update_task(
     admin = Depends(get_current_admin)
 ):
     """Update a task"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    
-    tasks = project_doc.get('tasks', [])
-    task_found = False
-    
-    for idx, task in enumerate(tasks):
-        if task['id'] == task_id:
-            task_found = True
-            if task_data.title is not None:
-                tasks[idx]['title'] = task_data.title
-            if task_data.description is not None:
-                tasks[idx]['description'] = task_data.description
-            if task_data.status is not None:
-                tasks[idx]['status'] = task_data.status
-                if task_data.status == "completed":
-                    tasks[idx]['completed_at'] = datetime.utcnow().isoformat()
-            if task_data.priority is not None:
-                tasks[idx]['priority'] = task_data.priority
-            if task_data.assigned_to is not None:
-                tasks[idx]['assigned_to'] = task_data.assigned_to
-            if task_data.due_date is not None:
-                tasks[idx]['due_date'] = task_data.due_date.isoformat()
-            if task_data.milestone_id is not None:
-                tasks[idx]['milestone_id'] = task_data.milestone_id
-            break
-    
-    if not task_found:
+    update_data = {}
+    if task_data.title is not None:
+        update_data['title'] = task_data.title
+    if task_data.description is not None:
+        update_data['description'] = task_data.description
+    if task_data.status is not None:
+        update_data['status'] = task_data.status
+        if task_data.status == "completed":
+            update_data['completed_at'] = datetime.utcnow().isoformat()
+    if task_data.priority is not None:
+        update_data['priority'] = task_data.priority
+    if task_data.assigned_to is not None:
+        update_data['assigned_to'] = task_data.assigned_to
+    if task_data.due_date is not None:
+        update_data['due_date'] = task_data.due_date.isoformat()
+    if task_data.milestone_id is not None:
+        update_data['milestone_id'] = task_data.milestone_id
+    
+    task = await update_project_entity("tasks", project_id, task_id, update_data)
+    if not task:
+        if not await project_exists({"id": project_id}):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
     
     # Add activity log
@@ -549,22 +598,16 @@ async def update_task(
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$set": {
-                "tasks": tasks,
-                "last_activity_at": datetime.utcnow().isoformat()
-            },
-            "$push": {"activity_log": activity}
-        }
-    )
+    await record_project_activity(project_id, activity)
     
-    return TaskResponse(**tasks[idx])
+    return TaskResponse(**task)
 
 @router.delete("/{project_id}/tasks/{task_id}")
 async def delete_task(project_id: str, task_id: str, admin = Depends(get_current_admin)):
     """Delete a task"""
+    if not await delete_project_entity("tasks", project_id, task_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    
     activity = log_activity(
         project_id,
         "task_deleted",
@@ -573,18 +616,7 @@ async def delete_task(project_id: str, task_id: str, admin = Depends(get_current
         admin.get("username", "Admin")
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
-    
-    result = await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$pull": {"tasks": {"id": task_id}},
-            "$push": {"activity_log": activity},
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
-    )
-    
-    if result.modified_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    await record_project_activity(project_id, activity)
     
     return {"message": "Task deleted successfully"}
 
@@ -595,8 +627,7 @@ async def delete_task(project_id: str, task_id: str, admin = Depends(get_current
 @router.post("/{project_id}/comments", response_model=CommentResponse)
 async def add_comment(project_id: str, comment_data: CommentCreate, admin = Depends(get_current_admin)):
     """Add a comment to project"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
     comment = ProjectComment(
@@ -619,15 +650,9 @@ async def add_comment(project_id: str, comment_data: CommentCreate, admin = Depe
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "comments": comment_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        add_project_entity("comments", project_id, comment_dict),
+        record_project_activity(project_id, activity)
     )
     
     return CommentResponse(**comment_dict)
@@ -635,17 +660,14 @@ async def add_comment(project_id: str, comment_data: CommentCreate, admin = Depe
 @router.delete("/{project_id}/comments/{comment_id}")
 async def delete_comment(project_id: str, comment_id: str, admin = Depends(get_current_admin)):
     """Delete a comment"""
-    result = await client_projects_collection.update_one(
+    if not await delete_project_entity("comments", project_id, comment_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+    
+    await client_projects_collection.update_one(
         {"id": project_id},
-        {
-            "$pull": {"comments": {"id": comment_id}},
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+        {"$set": {"last_activity_at": datetime.utcnow().isoformat()}}
     )
     
-    if result.modified_count == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-    
     return {"message": "Comment deleted successfully"}
 
 # ============================================================================
@@ -655,8 +677,7 @@ async def delete_comment(project_id: str, comment_id: str, admin = Depends(get_c
 @router.post("/{project_id}/team", response_model=TeamMemberResponse)
 async def add_team_member(project_id: str, member_data: TeamMemberAdd, admin = Depends(get_current_admin)):
     """Add a team member to project"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
     member = TeamMember(**member_data.model_dump())
@@ -673,15 +694,12 @@ async def add_team_member(project_id: str, member_data: TeamMemberAdd, admin = D
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "team_members": member_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        client_projects_collection.update_one(
+            {"id": project_id},
+            {"$push": {"team_members": member_dict}}
+        ),
+        record_project_activity(project_id, activity)
     )
     
     return TeamMemberResponse(**member_dict)
@@ -709,7 +727,7 @@ async def remove_team_member(project_id: str, admin_id: str, admin = Depends(get
 @router.put("/{project_id}/budget", response_model=BudgetResponse)
 async def update_budget(project_id: str, budget_data: BudgetUpdate, admin = Depends(get_current_admin)):
     """Update project budget"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
+    project_doc = await client_projects_collection.find_one({"id": project_id}, {"budget": 1})
     if not project_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
@@ -740,15 +758,12 @@ async def update_budget(project_id: str, budget_data: BudgetUpdate, admin = Depe
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$set": {
-                "budget": current_budget,
-                "last_activity_at": datetime.utcnow().isoformat()
-            },
-            "$push": {"activity_log": activity}
-        }
+    await asyncio.gather(
+        client_projects_collection.update_one(
+            {"id": project_id},
+            {"$set": {"budget": current_budget}}
+        ),
+        record_project_activity(project_id, activity)
     )
     
     return BudgetResponse(**current_budget)
@@ -764,8 +779,7 @@ async def upload_project_file(
     admin = Depends(get_current_admin)
 ):
     """Upload a file to a project (Admin only)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
@@ -818,15 +832,9 @@ async def upload_project_file(
     activity['timestamp'] = activity['timestamp'].isoformat()
     
     # Add file to project
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "files": file_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        add_project_entity("files", project_id, file_dict),
+        record_project_activity(project_id, activity)
     )
     
     return FileUploadResponse(
@@ -842,19 +850,14 @@ async def delete_project_file(
     admin = Depends(get_current_admin)
 ):
     """Delete a file from a project (Admin only)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    if not await project_exists({"id": project_id}):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
     # Find file in project
-    file_to_delete = None
-    for file_info in project_doc.get('files', []):
-        if file_info['id'] == file_id:
-            file_to_delete = file_info
-            break
+    file_to_delete = await find_project_entity("files", project_id, file_id)
     
     if not file_to_delete:
         raise HTTPException(
@@ -884,13 +887,9 @@ async def delete_project_file(
     activity['timestamp'] = activity['timestamp'].isoformat()
     
     # Remove file from project
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$pull": {"files": {"id": file_id}},
-            "$push": {"activity_log": activity},
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        delete_project_entity("files", project_id, file_id),
+        record_project_activity(project_id, activity)
     )
     
     return {"message": "File deleted successfully"}
@@ -902,8 +901,8 @@ async def delete_project_file(
 @router.post("/{project_id}/chat", response_model=ChatMessageResponse)
 async def send_chat_message(project_id: str, message_data: ChatMessageCreate, admin = Depends(get_current_admin)):
     """Send a chat message to client (Admin)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    project = await client_projects_collection.find_one({"id": project_id}, {"_id": 0, "client_id": 1})
+    if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
     chat_message = ChatMessage(
@@ -927,39 +926,63 @@ async def send_chat_message(project_id: str, message_data: ChatMessageCreate, ad
     )
     activity['timestamp'] = activity['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "chat_messages": message_dict,
-                "activity_log": activity
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    unread_count, _ = await asyncio.gather(
+        add_chat_message(project_id, message_dict),
+        record_project_activity(project_id, activity)
     )
+    await broker.publish(project_chat_topics(project["client_id"]), "project.chat.message", {
+        "project_id": project_id,
+        "message": message_dict,
+        "unread_count": unread_count
+    })
     
     return ChatMessageResponse(**message_dict)
 
 @router.get("/{project_id}/chat", response_model=List[ChatMessageResponse])
-async def get_chat_messages(project_id: str, admin = Depends(get_current_admin)):
-    """Get all chat messages for a project (Admin)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+async def get_chat_messages(
+    project_id: str,
+    after: Optional[str] = Query(None, description="Message id or ISO timestamp; only newer messages are returned"),
+    before: Optional[str] = Query(None, description="Message id or ISO timestamp; only older messages are returned"),
+    limit: int = Query(100, ge=1, le=500),
+    wait: int = Query(0, ge=0, le=MAX_LONG_POLL_SECONDS, description="With after: seconds to wait for a new message"),
+    admin = Depends(get_current_admin)
+):
+    """
+    Get chat messages for a project (Admin)
+    Without after/before the full history is returned; with one of them only
+    up to `limit` messages on that side of the cursor.
+    """
+    project = await client_projects_collection.find_one({"id": project_id}, {"_id": 0, "client_id": 1})
+    if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    
-    # Mark admin messages as read
-    chat_messages = project_doc.get('chat_messages', [])
-    updated = False
-    for msg in chat_messages:
-        if msg['sender_type'] == 'client' and not msg.get('read', False):
-            msg['read'] = True
-            updated = True
-    
-    if updated:
-        await client_projects_collection.update_one(
-            {"id": project_id},
-            {"$set": {"chat_messages": chat_messages}}
-        )
+    if after and before:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either after or before, not both")
+    
+    if after or before:
+        timestamp = await resolve_chat_cursor(project_id, after or before)
+        if not timestamp:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown message cursor")
+        if after:
+            chat_messages = await long_poll(
+                [ADMIN_PROJECTS_TOPIC],
+                wait,
+                lambda: load_chat_messages_since(project_id, after=timestamp, limit=limit)
+            )
+        else:
+            chat_messages = await load_chat_messages_since(project_id, before=timestamp, limit=limit)
+    else:
+        project_doc = await load_project({"id": project_id}, kinds=["chat_messages"])
+        chat_messages = project_doc.get('chat_messages', []) if project_doc else []
+    
+    # Mark client messages as read
+    if any(msg['sender_type'] == 'client' and not msg.get('read', False) for msg in chat_messages):
+        unread_count = await mark_chat_messages_read(project_id, "client")
+        await broker.publish(project_chat_topics(project["client_id"]), "project.chat.read", {
+            "project_id": project_id, "sender_type": "client", "unread_count": unread_count
+        })
+        for msg in chat_messages:
+            if msg['sender_type'] == 'client':
+                msg['read'] = True
     
     return [
         ChatMessageResponse(
@@ -976,12 +999,11 @@ async def get_chat_messages(project_id: str, admin = Depends(get_current_admin))
 @router.get("/{project_id}/unread-count")
 async def get_unread_count(project_id: str, admin = Depends(get_current_admin)):
     """Get count of unread messages from client (Admin)"""
-    project_doc = await client_projects_collection.find_one({"id": project_id})
-    if not project_doc:
+    project = await client_projects_collection.find_one(
+        {"id": project_id}, {"_id": 0, "chat_unread.client": 1}
+    )
+    if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
-    chat_messages = project_doc.get('chat_messages', [])
-    unread_count = sum(1 for msg in chat_messages if msg['sender_type'] == 'client' and not msg.get('read', False))
-    
-    return {"unread_count": unread_count}
+    return {"unread_count": (project.get("chat_unread") or {}).get("client", 0)}
 
@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from schemas.client import ClientCreate, ClientUpdate, ClientResponse
 from database import clients_collection
-from auth.password import hash_password
+from auth.password import hash_password_async
+from auth.principal_cache import client_principal_cache
 from auth.admin_auth import get_current_admin
 from models.client import Client
 from datetime import datetime
@@ -61,7 +62,7 @@ async def create_client(client_data: ClientCreate, admin = Depends(get_current_a
     client = Client(
         name=client_data.name,
         email=client_data.email,
-        password_hash=hash_password(client_data.password),
+        password_hash=await hash_password_async(client_data.password),
         company=client_data.company,
         phone=client_data.phone,
         is_active=client_data.is_active,
@@ -108,7 +109,7 @@ async def update_client(client_id: str, client_data: ClientUpdate, admin = Depen
             )
         update_data['email'] = client_data.email
     if client_data.password is not None:
-        update_data['password_hash'] = hash_password(client_data.password)
+        update_data['password_hash'] = await hash_password_async(client_data.password)
     if client_data.company is not None:
         update_data['company'] = client_data.company
     if client_data.phone is not None:
@@ -122,6 +123,7 @@ async def update_client(client_id: str, client_data: ClientUpdate, admin = Depen
         {"id": client_id},
         {"$set": update_data}
     )
+    await client_principal_cache.invalidate_everywhere(client_id)
     
     # Fetch updated client
     updated_client = await clients_collection.find_one({"id": client_id})
@@ -140,6 +142,7 @@ async def update_client(client_id: str, client_data: ClientUpdate, admin = Depen
 async def delete_client(client_id: str, admin = Depends(get_current_admin)):
     """Delete a client (Admin only)"""
     result = await clients_collection.delete_one({"id": client_id})
+    await client_principal_cache.invalidate_everywhere(client_id)
     
     if result.deleted_count == 0:
         raise HTTPException(
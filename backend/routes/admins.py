@@ -2,8 +2,11 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from schemas.admin import AdminCreate, AdminUpdate, AdminLogin, AdminResponse, TokenResponse
 from database import admins_collection
-from auth import hash_password, verify_password, create_access_token
+from auth import hash_password_async, verify_password_async, rehash_if_needed, create_access_token
 from auth.admin_auth import get_current_admin, require_super_admin
+from auth.principal_cache import admin_principal_cache, client_principal_cache
+from utils.singleton_cache import singleton_cache
+from utils.cache_versions import cache_versions
 from models.admin import Admin, AdminPermissions
 from utils import serialize_document
 
@@ -27,12 +30,20 @@ async def admin_login(credentials: AdminLogin):
     
     # Verify password - handle both password and password_hash fields
     password_hash = admin_doc.get('password_hash', admin_doc.get('password'))
-    if not password_hash or not verify_password(credentials.password, password_hash):
+    if not password_hash or not await verify_password_async(credentials.password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
+    # Upgrade hashes made with an old cost factor; skip if the password changed meanwhile
+    new_hash = await rehash_if_needed(credentials.password, password_hash)
+    if new_hash:
+        await admins_collection.update_one(
+            {"id": admin_doc['id'], "password_hash": admin_doc.get('password_hash')},
+            {"$set": {"password_hash": new_hash}}
+        )
+    
     # Determine role - handle both role and is_super_admin fields
     role = admin_doc.get("role")
     if not role:
@@ -75,7 +86,7 @@ async def initialize_super_admin():
     # Create default super admin with all permissions
     admin = Admin(
         username="admin",
-        password_hash=hash_password("admin123"),
+        password_hash=await hash_password_async("admin123"),
         role="super_admin",
         permissions=AdminPermissions(
             canManageAdmins=True,
@@ -188,7 +199,7 @@ async def create_admin(
     # Create admin
     admin = Admin(
         username=admin_data.username,
-        password_hash=hash_password(admin_data.password),
+        password_hash=await hash_password_async(admin_data.password),
         role=admin_data.role,
         permissions=permissions,
         created_by=current_admin['username']
@@ -238,7 +249,7 @@ async def update_admin(
         update_data['username'] = admin_data.username
     
     if admin_data.password:
-        update_data['password_hash'] = hash_password(admin_data.password)
+        update_data['password_hash'] = await hash_password_async(admin_data.password)
     
     if admin_data.permissions:
         update_data['permissions'] = admin_data.permissions.model_dump()
@@ -248,6 +259,7 @@ async def update_admin(
             {"id": admin_id},
             {"$set": update_data}
         )
+        await admin_principal_cache.invalidate_everywhere(admin_id)
     
     return {"message": "Admin updated successfully"}
 
@@ -280,4 +292,23 @@ async def delete_admin(
         )
     
     await admins_collection.delete_one({"id": admin_id})
+    await admin_principal_cache.invalidate_everywhere(admin_id)
     return {"message": "Admin deleted successfully"}
+
+@router.get("/principal-cache/stats")
+async def get_principal_cache_stats(current_admin: dict = Depends(require_super_admin)):
+    """Hit/miss counters for the authenticated-principal caches (super admin only)"""
+    return {
+        "admins": admin_principal_cache.stats(),
+        "clients": client_principal_cache.stats()
+    }
+
+@router.get("/singleton-cache/stats")
+async def get_singleton_cache_stats(current_admin: dict = Depends(require_super_admin)):
+    """Hit rate and entries of the public content document cache on this worker (super admin only)"""
+    return singleton_cache.stats()
+
+@router.get("/cache-versions/stats")
+async def get_cache_versions_stats(current_admin: dict = Depends(require_super_admin)):
+    """How this worker follows other workers' cache invalidations (super admin only)"""
+    return cache_versions.stats()
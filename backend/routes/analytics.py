@@ -1,42 +1,101 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from pydantic import ValidationError
+from typing import List, Optional
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
 import uuid
 import logging
 
-from database import analytics_collection
 from schemas.analytics import (
     AnalyticsEventCreate,
     AnalyticsEventResponse,
     AnalyticsSummary,
     PageViewStats,
-    BlogViewStats
+    BlogViewStats,
+    AnalyticsTimeSeries,
+    AnalyticsFunnel
 )
 from auth.admin_auth import get_current_admin
+from utils.analytics_ingest import analytics_buffer
+from utils.analytics_rollups import load_rollups, load_counts, day_of
+from utils.analytics_timeseries import GRANULARITY_FREQ, bucket_range, build_time_series
+from utils.analytics_visitors import count_unique_visitors
+from utils.analytics_funnel import load_funnel
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 logger = logging.getLogger(__name__)
 
+# Upper bound on events accepted in one batch request
+MAX_BATCH_EVENTS = 100
+
+# A year of hourly buckets, with room for a leap year
+MAX_TIMESERIES_BUCKETS = 24 * 366
+
+def build_event_document(event: AnalyticsEventCreate) -> dict:
+    """Raw event as stored in the analytics collection"""
+    return {
+        "_id": str(uuid.uuid4()),
+        "event_type": event.event_type,
+        "page_name": event.page_name,
+        "blog_id": event.blog_id,
+        "blog_title": event.blog_title,
+        "visitor_id": event.visitor_id,
+        "session_id": event.session_id,
+        "timestamp": datetime.utcnow()
+    }
+
+def parse_utc(value: str) -> datetime:
+    """ISO date/datetime -> naive UTC datetime, the form rollups are keyed by"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 @router.post("/event", status_code=201)
 async def track_event(event: AnalyticsEventCreate):
     """Track an analytics event - public endpoint, fails silently"""
     try:
-        event_data = {
-            "_id": str(uuid.uuid4()),
-            "event_type": event.event_type,
-            "page_name": event.page_name,
-            "blog_id": event.blog_id,
-            "blog_title": event.blog_title,
-            "timestamp": datetime.utcnow()
-        }
-        
-        await analytics_collection.insert_one(event_data)
+        # Buffered and written in batches; see utils/analytics_ingest.py
+        analytics_buffer.submit([build_event_document(event)])
         return {"status": "success", "message": "Event tracked"}
     except Exception as e:
         # Fail silently - don't block user actions
         logger.warning(f"Analytics tracking failed: {str(e)}")
         return {"status": "success", "message": "Event received"}
 
+@router.post("/events", status_code=201)
+async def track_events_batch(request: Request):
+    """
+    Track a batch of analytics events - public endpoint, fails silently.
+    
+    Takes a JSON array of events. The body is parsed by hand so it works with
+    navigator.sendBeacon, which posts as text/plain to avoid a CORS preflight.
+    """
+    try:
+        payload = json.loads(await request.body() or b"[]")
+        if isinstance(payload, dict):
+            payload = payload.get("events", [])
+        
+        events = []
+        for item in payload[:MAX_BATCH_EVENTS]:
+            try:
+                events.append(build_event_document(AnalyticsEventCreate(**item)))
+            except (TypeError, ValidationError):
+                continue
+        
+        accepted = analytics_buffer.submit(events)
+        return {"status": "success", "message": "Events tracked", "accepted": accepted}
+    except Exception as e:
+        logger.warning(f"Analytics batch tracking failed: {str(e)}")
+        return {"status": "success", "message": "Events received", "accepted": 0}
+
+@router.get("/ingest/stats")
+async def get_ingest_stats(current_admin: dict = Depends(get_current_admin)):
+    """Event buffer counters for this worker - admin only"""
+    return analytics_buffer.stats()
+
 @router.get("/summary", response_model=AnalyticsSummary)
 async def get_analytics_summary(
     period: str = "7days",
@@ -56,83 +115,118 @@ async def get_analytics_summary(
         else:
             start_date = now - timedelta(days=7)
         
-        # Query filter
-        date_filter = {"timestamp": {"$gte": start_date}}
-        
-        # Get total page views
-        total_page_views = await analytics_collection.count_documents({
-            **date_filter,
-            "event_type": "page_view"
-        })
-        
-        # Get contact submissions
-        contact_submissions = await analytics_collection.count_documents({
-            **date_filter,
-            "event_type": "contact_submission"
-        })
-        
-        # Get calculator usage
-        calculator_opened = await analytics_collection.count_documents({
-            **date_filter,
-            "event_type": "calculator_opened"
-        })
-        
-        calculator_estimates = await analytics_collection.count_documents({
-            **date_filter,
-            "event_type": "calculator_estimate"
-        })
-        
-        # Get page views by page
-        page_views_pipeline = [
-            {"$match": {**date_filter, "event_type": "page_view"}},
-            {"$group": {
-                "_id": "$page_name",
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"count": -1}}
-        ]
+        # Rollups are per UTC day, so the window starts at midnight of its first day
+        rows, (unique_visitors, page_visitors) = await asyncio.gather(
+            load_rollups(day_of(start_date), day_of(now)),
+            count_unique_visitors(day_of(start_date), day_of(now))
+        )
         
-        page_views_cursor = analytics_collection.aggregate(page_views_pipeline)
-        page_views_list = await page_views_cursor.to_list(length=None)
+        totals = Counter()
+        page_counts = Counter()
+        blog_counts = Counter()
+        blog_titles = {}
+        for row in rows:
+            totals[row["event_type"]] += row["count"]
+            if row["event_type"] == "page_view" and row.get("page_name"):
+                page_counts[row["page_name"]] += row["count"]
+            elif row["event_type"] == "blog_view" and row.get("blog_id"):
+                blog_counts[row["blog_id"]] += row["count"]
+                if row.get("blog_title"):
+                    blog_titles[row["blog_id"]] = row["blog_title"]
         
         page_views_by_page = [
-            PageViewStats(page_name=item["_id"], count=item["count"])
-            for item in page_views_list if item["_id"]
-        ]
-        
-        # Get blog views
-        blog_views_pipeline = [
-            {"$match": {**date_filter, "event_type": "blog_view"}},
-            {"$group": {
-                "_id": {"blog_id": "$blog_id", "blog_title": "$blog_title"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
+            PageViewStats(page_name=page_name, count=count, unique_visitors=page_visitors.get(page_name, 0))
+            for page_name, count in page_counts.most_common()
         ]
         
-        blog_views_cursor = analytics_collection.aggregate(blog_views_pipeline)
-        blog_views_list = await blog_views_cursor.to_list(length=None)
-        
         blog_views = [
             BlogViewStats(
-                blog_id=item["_id"]["blog_id"],
-                blog_title=item["_id"]["blog_title"] or "Untitled",
-                count=item["count"]
+                blog_id=blog_id,
+                blog_title=blog_titles.get(blog_id) or "Untitled",
+                count=count
             )
-            for item in blog_views_list if item["_id"]["blog_id"]
+            for blog_id, count in blog_counts.most_common(10)
         ]
         
         return AnalyticsSummary(
-            total_page_views=total_page_views,
-            contact_submissions=contact_submissions,
-            calculator_opened=calculator_opened,
-            calculator_estimates=calculator_estimates,
+            total_page_views=totals["page_view"],
+            contact_submissions=totals["contact_submission"],
+            calculator_opened=totals["calculator_opened"],
+            calculator_estimates=totals["calculator_estimate"],
             page_views_by_page=page_views_by_page,
             blog_views=blog_views,
+            unique_visitors=unique_visitors,
             period=period
         )
         
     except Exception as e:
         logger.error(f"Error fetching analytics summary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/timeseries", response_model=AnalyticsTimeSeries)
+async def get_analytics_timeseries(
+    start: str,
+    end: Optional[str] = None,
+    granularity: str = "day",
+    event_type: Optional[List[str]] = Query(None),
+    page_name: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Get zero-filled event counts per bucket - admin only
+    Query params:
+    - start, end: ISO date or datetime, UTC (end defaults to now)
+    - granularity: hour, day, week or month
+    - event_type (repeatable), page_name: optional filters
+    """
+    if granularity not in GRANULARITY_FREQ:
+        raise HTTPException(status_code=400, detail="granularity must be one of hour, day, week, month")
+    
+    try:
+        start_at = parse_utc(start)
+        end_at = parse_utc(end) if end else datetime.utcnow()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601, e.g. 2025-01-31 or 2025-01-31T13:00")
+    
+    if end_at < start_at:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if len(bucket_range(start_at, end_at, granularity)) > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range too large: at most {MAX_TIMESERIES_BUCKETS} buckets")
+    
+    rows = await load_counts(start_at, end_at, granularity == "hour", event_type, page_name)
+    series = build_time_series(rows, start_at, end_at, granularity)
+    
+    return AnalyticsTimeSeries(
+        granularity=granularity,
+        start=start_at.isoformat(),
+        end=end_at.isoformat(),
+        **series
+    )
+
+@router.get("/funnel", response_model=AnalyticsFunnel)
+async def get_analytics_funnel(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    period: str = "30days",
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Get page view -> calculator -> estimate -> contact conversion - admin only
+    Query params:
+    - start, end: YYYY-MM-DD (UTC), inclusive; otherwise period (today, 7days, 30days)
+    """
+    now = datetime.utcnow()
+    try:
+        if start:
+            start_day = day_of(datetime.strptime(start, "%Y-%m-%d"))
+            end_day = day_of(datetime.strptime(end, "%Y-%m-%d")) if end else day_of(now)
+        else:
+            days = {"today": 0, "7days": 7, "30days": 30}.get(period, 30)
+            start_day, end_day = day_of(now - timedelta(days=days)), day_of(now)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    if end_day < start_day:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    steps, by_landing_page = await load_funnel(start_day, end_day)
+    return AnalyticsFunnel(start=start_day, end=end_day, steps=steps, by_landing_page=by_landing_page)
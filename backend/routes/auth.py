@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status
 from schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
 from database import users_collection
-from auth import hash_password, verify_password, create_access_token
+from auth import hash_password_async, verify_password_async, rehash_if_needed, create_access_token
 from utils import serialize_document
 from models import User
 
@@ -22,7 +22,7 @@ async def register(user_data: UserCreate):
     user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password_async(user_data.password),
         role=user_data.role
     )
     
@@ -50,12 +50,19 @@ async def login(credentials: UserLogin):
         )
     
     # Verify password
-    if not verify_password(credentials.password, user_doc['password_hash']):
+    if not await verify_password_async(credentials.password, user_doc['password_hash']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    new_hash = await rehash_if_needed(credentials.password, user_doc['password_hash'])
+    if new_hash:
+        await users_collection.update_one(
+            {"id": user_doc['id'], "password_hash": user_doc['password_hash']},
+            {"$set": {"password_hash": new_hash}}
+        )
+    
     # Create access token
     access_token = create_access_token(
         data={"sub": user_doc['email'], "id": user_doc['id'], "role": user_doc['role']}
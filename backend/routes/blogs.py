@@ -6,14 +6,17 @@ from utils import serialize_document, create_slug
 from models import Blog
 from datetime import datetime
 from auth.admin_auth import get_current_admin
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/blogs", tags=["blogs"])
+router = APIRouter(prefix="/blogs", tags=["blogs"], dependencies=[Depends(public_data_changed("blogs"))])
 
 # ====================================
 # PUBLIC ROUTES
 # ====================================
 
 @router.get("/", response_model=List[BlogResponse])
+@public_cache
 async def get_published_blogs():
     """Get all published blogs (public endpoint)"""
     cursor = blogs_collection.find({"status": "published"}).sort("created_at", -1)
@@ -21,6 +24,7 @@ async def get_published_blogs():
     return [serialize_document(blog) for blog in blogs]
 
 @router.get("/{slug}", response_model=BlogResponse)
+@public_cache
 async def get_blog_by_slug(slug: str):
     """Get a single published blog by slug (public endpoint)"""
     blog = await blogs_collection.find_one({"slug": slug, "status": "published"})
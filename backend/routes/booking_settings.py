@@ -10,6 +10,7 @@ from schemas.booking_setting import (
     BookingSettingResponse
 )
 from auth.admin_auth import get_current_admin
+from utils.singleton_cache import singleton_cache
 
 router = APIRouter(prefix="/booking-settings", tags=["booking-settings"])
 
@@ -20,11 +21,13 @@ def get_ist_now():
     """Get current time in IST"""
     return datetime.now(IST)
 
+async def load_active_booking_settings() -> Optional[dict]:
+    return await booking_settings_collection.find_one({"is_active": True}, {"_id": 0})
+
 @router.get("/", response_model=Optional[BookingSettingResponse])
 async def get_booking_settings():
     """Get active booking settings (PUBLIC)"""
-    settings = await booking_settings_collection.find_one({"is_active": True})
-    return settings
+    return await singleton_cache.get("booking_settings", load_active_booking_settings)
 
 @router.get("/admin", response_model=Optional[BookingSettingResponse])
 async def get_booking_settings_admin(_: dict = Depends(get_current_admin)):
@@ -58,6 +61,7 @@ async def create_booking_settings(
             {"id": existing["id"]},
             {"$set": settings_data}
         )
+        await singleton_cache.invalidate_everywhere("booking_settings")
         updated = await booking_settings_collection.find_one({"id": existing["id"]})
         return updated
     else:
@@ -66,6 +70,7 @@ async def create_booking_settings(
         settings_data["created_at"] = now
         
         await booking_settings_collection.insert_one(settings_data)
+        await singleton_cache.invalidate_everywhere("booking_settings")
         return settings_data
 
 @router.put("/admin/{settings_id}", response_model=BookingSettingResponse)
@@ -97,6 +102,7 @@ async def update_booking_settings(
         {"id": settings_id},
         {"$set": update_data}
     )
+    await singleton_cache.invalidate_everywhere("booking_settings")
     
     updated = await booking_settings_collection.find_one({"id": settings_id})
     return updated
@@ -110,4 +116,5 @@ async def delete_booking_settings(
     result = await booking_settings_collection.delete_one({"id": settings_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Settings not found")
+    await singleton_cache.invalidate_everywhere("booking_settings")
     return {"message": "Settings deleted successfully"}
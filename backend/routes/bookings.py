@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import uuid
 import pytz
-from database import bookings_collection, booking_settings_collection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from database import bookings_collection, booking_settings_collection, booking_slots_collection
 from schemas.booking import BookingCreate, BookingUpdate, BookingResponse, AvailableSlot
 from auth.admin_auth import get_current_admin
 
@@ -12,6 +14,11 @@ router = APIRouter(prefix="/bookings", tags=["bookings"])
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
 
+# Bookings in these statuses hold a spot in their slot
+ACTIVE_BOOKING_STATUSES = ["pending", "confirmed"]
+
+MAX_AVAILABILITY_DAYS = 90
+
 def get_ist_now():
     """Get current time in IST"""
     return datetime.now(IST)
@@ -55,7 +62,7 @@ async def check_slot_availability(date: str, time_slot: str) -> dict:
     existing_bookings = await bookings_collection.count_documents({
         "preferred_date": date,
         "preferred_time_slot": time_slot,
-        "status": {"$in": ["pending", "confirmed"]}
+        "status": {"$in": ACTIVE_BOOKING_STATUSES}
     })
     
     max_bookings = slot_info.get("max_bookings", 1)
@@ -71,15 +78,100 @@ async def check_slot_availability(date: str, time_slot: str) -> dict:
         "meeting_type": settings.get("meeting_type", "Google Meet")
     }
 
+async def count_booked_slots(start_date: str, end_date: str) -> Dict[Tuple[str, str], int]:
+    """Active bookings per (date, time slot) for an inclusive date range, in one aggregation"""
+    pipeline = [
+        {"$match": {
+            "preferred_date": {"$gte": start_date, "$lte": end_date},
+            "status": {"$in": ACTIVE_BOOKING_STATUSES}
+        }},
+        {"$group": {
+            "_id": {"date": "$preferred_date", "slot": "$preferred_time_slot"},
+            "count": {"$sum": 1}
+        }}
+    ]
+    rows = await bookings_collection.aggregate(pipeline).to_list(length=None)
+    return {(row["_id"]["date"], row["_id"]["slot"]): row["count"] for row in rows}
+
+def build_slot_grid(settings: dict, start: datetime, days: int, booked: Dict[Tuple[str, str], int]) -> List[dict]:
+    """Availability for every configured slot on every open day, computed in memory"""
+    available_days = set(settings.get("available_days", []))
+    time_slots = [
+        (f"{slot['start_time']}-{slot['end_time']}", slot.get("max_bookings", 1))
+        for slot in settings.get("time_slots", [])
+    ]
+    
+    grid = []
+    for i in range(days):
+        check_date = start + timedelta(days=i)
+        if check_date.strftime("%A") not in available_days:
+            continue
+        
+        date_str = check_date.strftime("%Y-%m-%d")
+        for time_slot_str, max_bookings in time_slots:
+            available_spots = max(0, max_bookings - booked.get((date_str, time_slot_str), 0))
+            grid.append({
+                "date": date_str,
+                "time_slot": time_slot_str,
+                "available_spots": available_spots,
+                "is_available": available_spots > 0
+            })
+    return grid
+
+async def reserve_slot(date: str, time_slot: str, max_bookings: int) -> bool:
+    """
+    Take one spot in a slot's inventory counter. Returns False if the slot is full.
+    
+    The capacity check and the increment are a single conditional update, so
+    concurrent requests can never push `booked` past max_bookings.
+    """
+    slot_filter = {"date": date, "time_slot": time_slot}
+    
+    if not await booking_slots_collection.find_one(slot_filter, {"_id": 1}):
+        # First reservation for this slot: seed the counter from bookings made
+        # before the inventory existed. Concurrent seeders lose on the unique index.
+        existing = await bookings_collection.count_documents({
+            "preferred_date": date,
+            "preferred_time_slot": time_slot,
+            "status": {"$in": ACTIVE_BOOKING_STATUSES}
+        })
+        try:
+            await booking_slots_collection.insert_one({**slot_filter, "booked": existing})
+        except DuplicateKeyError:
+            pass
+    
+    reserved = await booking_slots_collection.find_one_and_update(
+        {**slot_filter, "booked": {"$lt": max_bookings}},
+        {"$inc": {"booked": 1}},
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return reserved is not None
+
+async def release_slot(date: str, time_slot: str):
+    """Give back one spot taken by reserve_slot"""
+    await booking_slots_collection.update_one(
+        {"date": date, "time_slot": time_slot, "booked": {"$gt": 0}},
+        {"$inc": {"booked": -1}}
+    )
+
+async def get_slot_capacity(date: str, time_slot: str) -> Optional[int]:
+    """max_bookings for a slot under the active settings, or None if it isn't offered"""
+    settings = await booking_settings_collection.find_one({"is_active": True})
+    for slot in (settings or {}).get("time_slots", []):
+        if f"{slot['start_time']}-{slot['end_time']}" == time_slot:
+            return slot.get("max_bookings", 1)
+    return None
+
 # PUBLIC ENDPOINTS
 
 @router.get("/available-slots", response_model=List[AvailableSlot])
-async def get_available_slots(start_date: str, days: int = 14):
+async def get_available_slots(start_date: str, days: int = Query(14, ge=1, le=MAX_AVAILABILITY_DAYS)):
     """
     Get available time slots for the next N days
     Query params:
     - start_date: YYYY-MM-DD format
-    - days: number of days to check (default 14)
+    - days: number of days to check (default 14, max 90)
     """
     settings = await booking_settings_collection.find_one({"is_active": True})
     if not settings:
@@ -90,32 +182,9 @@ async def get_available_slots(start_date: str, days: int = 14):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
-    available_slots = []
-    
-    for i in range(days):
-        check_date = current_date + timedelta(days=i)
-        date_str = check_date.strftime("%Y-%m-%d")
-        day_name = check_date.strftime("%A")
-        
-        # Skip if day is not available
-        if day_name not in settings.get("available_days", []):
-            continue
-        
-        # Check each time slot
-        for slot in settings.get("time_slots", []):
-            time_slot_str = f"{slot['start_time']}-{slot['end_time']}"
-            
-            # Check availability
-            availability = await check_slot_availability(date_str, time_slot_str)
-            
-            available_slots.append({
-                "date": date_str,
-                "time_slot": time_slot_str,
-                "available_spots": availability.get("available_spots", 0) if availability.get("available") else 0,
-                "is_available": availability.get("available", False)
-            })
-    
-    return available_slots
+    end_date = (current_date + timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    booked = await count_booked_slots(current_date.strftime("%Y-%m-%d"), end_date)
+    return build_slot_grid(settings, current_date, days, booked)
 
 @router.post("/", response_model=BookingResponse)
 async def create_booking(booking: BookingCreate):
@@ -132,9 +201,11 @@ async def create_booking(booking: BookingCreate):
             detail=availability.get("reason", "Slot not available")
         )
     
-    # Get booking settings for meeting type
-    settings = await booking_settings_collection.find_one({"is_active": True})
-    meeting_type = settings.get("meeting_type", "Google Meet") if settings else "Google Meet"
+    # Atomically claim a spot; the check above can race with other requests
+    if not await reserve_slot(booking.preferred_date, booking.preferred_time_slot, availability["max_bookings"]):
+        raise HTTPException(status_code=400, detail="Slot is fully booked")
+    
+    meeting_type = availability.get("meeting_type", "Google Meet")
     
     # Create booking
     now = get_ist_now().isoformat()
@@ -158,9 +229,13 @@ async def create_booking(booking: BookingCreate):
         "admin_notes": None
     }
     
-    await bookings_collection.insert_one(booking_data)
+    try:
+        await bookings_collection.insert_one(booking_data)
+    except Exception:
+        await release_slot(booking.preferred_date, booking.preferred_time_slot)
+        raise
     
-    # Send email notification to admin (async, non-blocking)
+    # Queue email notification to admin; the outbox worker sends it in the background
     try:
         from utils.email_service import send_booking_notification
         await send_booking_notification(booking_data)
@@ -231,6 +306,16 @@ async def update_booking(
         "updated_at": get_ist_now().isoformat()
     }
     
+    date, time_slot = booking["preferred_date"], booking["preferred_time_slot"]
+    now_active = booking_update.status in ACTIVE_BOOKING_STATUSES
+    reserved = False
+    if booking_update.status and now_active and booking["status"] not in ACTIVE_BOOKING_STATUSES:
+        # Reinstating a cancelled booking needs its spot back
+        max_bookings = await get_slot_capacity(date, time_slot)
+        if max_bookings is None or not await reserve_slot(date, time_slot, max_bookings):
+            raise HTTPException(status_code=400, detail="Slot is fully booked")
+        reserved = True
+    
     if booking_update.status:
         update_data["status"] = booking_update.status
         
@@ -246,10 +331,25 @@ async def update_booking(
     if booking_update.admin_notes is not None:
         update_data["admin_notes"] = booking_update.admin_notes
     
-    await bookings_collection.update_one(
+    # The previous status decides whether this update frees or takes a spot
+    previous = await bookings_collection.find_one_and_update(
         {"id": booking_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"status": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if not previous:
+        if reserved:
+            await release_slot(date, time_slot)
+        raise HTTPException(status_code=404, detail="Booking not found")
+    
+    was_active = previous["status"] in ACTIVE_BOOKING_STATUSES
+    if booking_update.status:
+        if was_active and not now_active:
+            await release_slot(date, time_slot)
+        elif was_active and reserved:
+            # Someone else reinstated it first; don't hold the spot twice
+            await release_slot(date, time_slot)
     
     updated_booking = await bookings_collection.find_one({"id": booking_id})
     return updated_booking
@@ -257,9 +357,12 @@ async def update_booking(
 @router.delete("/admin/{booking_id}")
 async def delete_booking(booking_id: str, _: dict = Depends(get_current_admin)):
     """Delete a booking (ADMIN)"""
-    result = await bookings_collection.delete_one({"id": booking_id})
-    if result.deleted_count == 0:
+    booking = await bookings_collection.find_one_and_delete({"id": booking_id})
+    if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
+    
+    if booking.get("status") in ACTIVE_BOOKING_STATUSES:
+        await release_slot(booking["preferred_date"], booking["preferred_time_slot"])
     return {"message": "Booking deleted successfully"}
 
 @router.get("/admin/stats/summary")
@@ -1,15 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List, Optional
+import asyncio
+import re
 from schemas.chat import ChatMessageCreate, ChatReply
-from database import conversations_collection
+from database import conversations_collection, client_projects_collection
 from auth.admin_auth import get_current_admin, check_permission
 from models.chat import Conversation, ChatMessage
+from utils.realtime import broker, long_poll, ADMIN_CHAT_TOPIC, MAX_LONG_POLL_SECONDS, conversation_topic
+from utils.chat_buckets import (
+    append_message, attach_messages, load_message_page,
+    mark_customer_messages_read, delete_messages, message_preview,
+    find_message_timestamp, load_messages_since
+)
+from utils.helpers import encode_cursor, decode_cursor, normalize_timestamp
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+async def total_unread() -> int:
+    """Unread customer messages across all conversations"""
+    rows = await conversations_collection.aggregate([
+        {"$match": {"unread_count": {"$gt": 0}}},
+        {"$group": {"_id": None, "total": {"$sum": "$unread_count"}}}
+    ]).to_list(length=1)
+    return rows[0]["total"] if rows else 0
+
 @router.post("/messages")
 async def create_message(message_data: ChatMessageCreate):
     """Create new customer message (public endpoint for chat widget)"""
@@ -35,9 +54,10 @@ async def create_message(message_data: ChatMessageCreate):
             )
         
         # Find existing conversation by email
-        conversation = await conversations_collection.find_one({
-            "customer_email": message_data.customer_email
-        })
+        conversation = await conversations_collection.find_one(
+            {"customer_email": message_data.customer_email},
+            {"_id": 0, "id": 1, "bucket_seq": 1}
+        )
         
         # Create new message
         new_message = ChatMessage(
@@ -46,43 +66,86 @@ async def create_message(message_data: ChatMessageCreate):
             read=False
         )
         
-        if conversation:
-            # Add message to existing conversation
-            message_dict = new_message.model_dump()
-            message_dict['timestamp'] = message_dict['timestamp'].isoformat()
-            
-            await conversations_collection.update_one(
-                {"id": conversation['id']},
-                {
-                    "$push": {"messages": message_dict},
-                    "$inc": {"unread_count": 1},
-                    "$set": {"last_message_at": datetime.utcnow().isoformat()}
-                }
-            )
-            return {"success": True, "id": conversation['id'], "message": "Message sent successfully"}
-        else:
+        message_dict = new_message.model_dump()
+        message_dict['timestamp'] = message_dict['timestamp'].isoformat()
+        
+        if not conversation:
             # Create new conversation
             new_conversation = Conversation(
                 customer_name=message_data.customer_name,
                 customer_email=message_data.customer_email,
                 customer_phone=message_data.customer_phone or "",
-                messages=[new_message],
                 unread_count=1
             )
             
             conv_dict = new_conversation.model_dump()
             conv_dict['created_at'] = conv_dict['created_at'].isoformat()
             conv_dict['last_message_at'] = conv_dict['last_message_at'].isoformat()
+            # Messages live in chat_message_buckets
+            conv_dict.pop('messages')
+            conv_dict['bucket_seq'] = 0
+            conv_dict['message_count'] = 1
+            conv_dict['last_message'] = message_preview(message_dict)
             
-            # Convert messages to dict
-            conv_dict['messages'] = []
-            for msg in new_conversation.messages:
-                msg_dict = msg.model_dump()
-                msg_dict['timestamp'] = msg_dict['timestamp'].isoformat()
-                conv_dict['messages'].append(msg_dict)
-            
-            await conversations_collection.insert_one(conv_dict)
-            return {"success": True, "id": new_conversation.id, "message": "Conversation started successfully"}
+            try:
+                await conversations_collection.insert_one(conv_dict)
+            except DuplicateKeyError:
+                # A concurrent first message from the same email created it;
+                # add this one to that conversation instead
+                conversation = await conversations_collection.find_one(
+                    {"customer_email": message_data.customer_email},
+                    {"_id": 0, "id": 1, "bucket_seq": 1}
+                )
+            else:
+                await append_message(conv_dict['id'], message_dict)
+                await broker.publish([ADMIN_CHAT_TOPIC], "chat.conversation", {
+                    "id": conv_dict['id'],
+                    "customerName": conv_dict['customer_name'],
+                    "customerEmail": conv_dict['customer_email'],
+                    "customerPhone": conv_dict.get('customer_phone'),
+                    "messages": [message_dict],
+                    "lastMessage": conv_dict['last_message'],
+                    "messageCount": 1,
+                    "unreadCount": conv_dict['unread_count'],
+                    "totalUnread": await total_unread(),
+                    "lastMessageAt": conv_dict['last_message_at'],
+                    "createdAt": conv_dict['created_at']
+                })
+                return {"success": True, "id": new_conversation.id, "message": "Conversation started successfully"}
+        
+        # Count the message before it is stored: mark_as_read can then only
+        # flag (and subtract) messages that are already counted
+        updated = await conversations_collection.find_one_and_update(
+            {"id": conversation['id']},
+            {
+                "$inc": {"unread_count": 1, "message_count": 1},
+                "$set": {
+                    "last_message_at": datetime.utcnow().isoformat(),
+                    "last_message": message_preview(message_dict)
+                }
+            },
+            projection={"unread_count": 1, "last_message_at": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        # Add message to the conversation's tail bucket
+        try:
+            seq = await append_message(conversation['id'], message_dict, conversation.get('bucket_seq', 0))
+        except Exception:
+            await conversations_collection.update_one(
+                {"id": conversation['id']},
+                {"$inc": {"unread_count": -1, "message_count": -1}}
+            )
+            raise
+        if seq != conversation.get('bucket_seq', 0):
+            await conversations_collection.update_one({"id": conversation['id']}, {"$max": {"bucket_seq": seq}})
+        await broker.publish([ADMIN_CHAT_TOPIC], "chat.message", {
+            "conversationId": conversation['id'],
+            "message": message_dict,
+            "unreadCount": updated.get('unread_count', 0),
+            "totalUnread": await total_unread(),
+            "lastMessageAt": updated['last_message_at']
+        })
+        return {"success": True, "id": conversation['id'], "message": "Message sent successfully"}
     
     except HTTPException:
         raise
@@ -94,14 +157,30 @@ async def create_message(message_data: ChatMessageCreate):
         )
 
 @router.get("/user-conversation")
-async def get_user_conversation(email: str, phone: Optional[str] = None):
-    """Get user's conversation by email and phone (public endpoint)"""
+async def get_user_conversation(
+    email: str,
+    phone: Optional[str] = None,
+    after: Optional[str] = Query(None, description="Message id or ISO timestamp; only newer messages are returned"),
+    before: Optional[str] = Query(None, description="Message id or ISO timestamp; only older messages are returned"),
+    limit: int = Query(100, ge=1, le=500),
+    wait: int = Query(0, ge=0, le=MAX_LONG_POLL_SECONDS, description="With after: seconds to wait for a new message"),
+):
+    """
+    Get user's conversation by email and phone (public endpoint)
+    Without after/before the full history is returned; with one of them only
+    up to `limit` messages on that side of the cursor.
+    """
     try:
         if not email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email is required"
             )
+        if after and before:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either after or before, not both"
+            )
         
         # Find conversation by email
         query = {"customer_email": email}
@@ -117,6 +196,26 @@ async def get_user_conversation(email: str, phone: Optional[str] = None):
                 "message": "No conversation found"
             }
         
+        cursor = after or before
+        if cursor:
+            timestamp = normalize_timestamp(cursor) or await find_message_timestamp(conversation, cursor)
+            if not timestamp:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Unknown message cursor"
+                )
+            if after:
+                messages = await long_poll(
+                    [conversation_topic(conversation['id'])],
+                    wait,
+                    lambda: load_messages_since(conversation, after=timestamp, limit=limit)
+                )
+            else:
+                messages = await load_messages_since(conversation, before=timestamp, limit=limit)
+        else:
+            await attach_messages([conversation])
+            messages = conversation['messages']
+        
         return {
             "success": True,
             "conversation": {
@@ -124,7 +223,7 @@ async def get_user_conversation(email: str, phone: Optional[str] = None):
                 "customerName": conversation['customer_name'],
                 "customerEmail": conversation['customer_email'],
                 "customerPhone": conversation.get('customer_phone'),
-                "messages": conversation['messages'],
+                "messages": messages,
                 "lastMessageAt": conversation['last_message_at'],
                 "createdAt": conversation['created_at']
             }
@@ -138,16 +237,95 @@ async def get_user_conversation(email: str, phone: Optional[str] = None):
             detail="Failed to fetch conversation"
         )
 
+async def get_inbox(cursor: Optional[str], limit: int, unread_only: bool, search: Optional[str]) -> dict:
+    """One page of conversation previews, newest activity first, without message history"""
+    query = {}
+    if unread_only:
+        query["unread_count"] = {"$gt": 0}
+    if search and search.strip():
+        pattern = {"$regex": re.escape(search.strip()), "$options": "i"}
+        query["$or"] = [{"customer_name": pattern}, {"customer_email": pattern}]
+    if cursor:
+        after = decode_cursor(cursor)
+        if not after or len(after) != 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        last_message_at, last_id = after
+        query["$and"] = [{"$or": [
+            {"last_message_at": {"$lt": last_message_at}},
+            {"last_message_at": last_message_at, "id": {"$lt": last_id}}
+        ]}]
+    
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"last_message_at": -1, "id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "_id": 0, "id": 1, "customer_name": 1, "customer_email": 1, "customer_phone": 1,
+            "unread_count": 1, "last_message_at": 1, "created_at": 1,
+            # Conversations not yet migrated to buckets still embed their messages
+            "last_message": {"$ifNull": ["$last_message", {"$arrayElemAt": ["$messages", -1]}]},
+            "message_count": {"$add": [
+                {"$ifNull": ["$message_count", 0]},
+                {"$size": {"$ifNull": ["$messages", []]}}
+            ]}
+        }}
+    ]
+    rows, unread = await asyncio.gather(
+        conversations_collection.aggregate(pipeline).to_list(length=limit + 1),
+        total_unread()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        "success": True,
+        "conversations": [
+            {
+                "id": conv['id'],
+                "customerName": conv['customer_name'],
+                "customerEmail": conv['customer_email'],
+                "customerPhone": conv.get('customer_phone'),
+                "lastMessage": message_preview(conv['last_message']) if conv.get('last_message') else None,
+                "messageCount": conv['message_count'],
+                "unreadCount": conv.get('unread_count', 0),
+                "lastMessageAt": conv['last_message_at'],
+                "createdAt": conv['created_at']
+            } for conv in rows
+        ],
+        "totalUnread": unread,
+        "nextCursor": encode_cursor(rows[-1]['last_message_at'], rows[-1]['id']) if has_more else None
+    }
+
 @router.get("/conversations")
-async def get_conversations(current_admin: dict = Depends(get_current_admin)):
-    """Get all conversations (admin only)"""
+async def get_conversations(
+    view: str = Query("full", pattern="^(full|inbox)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    unread_only: bool = False,
+    search: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Get conversations (admin only)
+    - view=full (default): every conversation with its full message history
+    - view=inbox: a page of previews (last message, unread count, timestamps);
+      filter with unread_only and search (name/email), page with nextCursor,
+      and load history per conversation from /conversations/{id}/messages
+    """
     if not check_permission(current_admin, 'canAccessChat') and current_admin['role'] != 'super_admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
     
+    if view == "inbox":
+        return await get_inbox(cursor, limit, unread_only, search)
+    
     conversations = await conversations_collection.find({}).sort("last_message_at", -1).to_list(length=1000)
+    await attach_messages(conversations)
     
     result = []
     total_unread = 0
@@ -171,6 +349,44 @@ async def get_conversations(current_admin: dict = Depends(get_current_admin)):
         "totalUnread": total_unread
     }
 
+@router.get("/unread-totals")
+async def get_unread_totals(current_admin: dict = Depends(get_current_admin)):
+    """
+    Unread totals for the admin badge: public conversations (with chat
+    access) and client project chats, from the stored counters in one
+    aggregation over the indexed unread fields
+    """
+    can_access_chat = check_permission(current_admin, 'canAccessChat') or current_admin['role'] == 'super_admin'
+    
+    projects = [
+        {"$match": {"chat_unread.client": {"$gt": 0}}},
+        {"$project": {"_id": 0, "kind": {"$literal": "project"}, "id": 1, "name": 1, "count": "$chat_unread.client"}}
+    ]
+    if can_access_chat:
+        pipeline = [
+            {"$match": {"unread_count": {"$gt": 0}}},
+            {"$project": {"_id": 0, "kind": {"$literal": "conversation"}, "id": 1, "count": "$unread_count"}},
+            {"$unionWith": {"coll": client_projects_collection.name, "pipeline": projects}}
+        ]
+        rows = await conversations_collection.aggregate(pipeline).to_list(length=None)
+    else:
+        rows = await client_projects_collection.aggregate(projects).to_list(length=None)
+    
+    conversations_unread = sum(row["count"] for row in rows if row["kind"] == "conversation")
+    project_rows = [row for row in rows if row["kind"] == "project"]
+    projects_unread = sum(row["count"] for row in project_rows)
+    
+    return {
+        "success": True,
+        "conversationsUnread": conversations_unread if can_access_chat else None,
+        "projectsUnread": projects_unread,
+        "projects": [
+            {"projectId": row["id"], "projectName": row.get("name"), "unreadCount": row["count"]}
+            for row in project_rows
+        ],
+        "totalUnread": conversations_unread + projects_unread
+    }
+
 @router.get("/conversations/{conversation_id}")
 async def get_conversation(
     conversation_id: str,
@@ -189,6 +405,7 @@ async def get_conversation(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
+    await attach_messages([conversation])
     
     return {
         "id": conversation['id'],
@@ -201,39 +418,63 @@ async def get_conversation(
         "createdAt": conversation['created_at']
     }
 
-@router.put("/conversations/{conversation_id}/read")
-async def mark_as_read(
+@router.get("/conversations/{conversation_id}/messages")
+async def get_conversation_messages(
     conversation_id: str,
+    before: Optional[int] = Query(None, description="Cursor from a previous page; omit for the newest messages"),
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Mark conversation as read"""
+    """Page backwards through a conversation's messages, one bucket at a time"""
     if not check_permission(current_admin, 'canAccessChat') and current_admin['role'] != 'super_admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
     
-    conversation = await conversations_collection.find_one({"id": conversation_id})
+    conversation = await conversations_collection.find_one({"id": conversation_id}, {"_id": 0, "id": 1, "messages": 1})
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
     
-    # Mark all customer messages as read
-    messages = conversation['messages']
-    for msg in messages:
-        if msg['sender'] == 'customer':
-            msg['read'] = True
+    messages, next_before = await load_message_page(conversation, before)
+    return {
+        "messages": messages,
+        "before": next_before
+    }
+
+@router.put("/conversations/{conversation_id}/read")
+async def mark_as_read(
+    conversation_id: str,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Mark conversation as read"""
+    if not check_permission(current_admin, 'canAccessChat') and current_admin['role'] != 'super_admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
     
-    await conversations_collection.update_one(
+    # Mark all customer messages as read, then take off only what was flagged:
+    # a message sent meanwhile stays counted
+    flagged = await mark_customer_messages_read(conversation_id)
+    updated = await conversations_collection.find_one_and_update(
         {"id": conversation_id},
-        {
-            "$set": {
-                "messages": messages,
-                "unread_count": 0
-            }
-        }
+        [{"$set": {"unread_count": {"$max": [0, {"$subtract": [{"$ifNull": ["$unread_count", 0]}, flagged]}]}}}],
+        projection={"_id": 0, "unread_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    
+    await broker.publish(
+        [ADMIN_CHAT_TOPIC, conversation_topic(conversation_id)],
+        "chat.read",
+        {"conversationId": conversation_id, "unreadCount": updated["unread_count"], "totalUnread": await total_unread()}
     )
     
     return {"message": "Marked as read"}
@@ -251,7 +492,7 @@ async def send_reply(
             detail="Access denied"
         )
     
-    conversation = await conversations_collection.find_one({"id": conversation_id})
+    conversation = await conversations_collection.find_one({"id": conversation_id}, {"_id": 0, "bucket_seq": 1})
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -268,25 +509,37 @@ async def send_reply(
     reply_dict = reply_message.model_dump()
     reply_dict['timestamp'] = reply_dict['timestamp'].isoformat()
     
-    await conversations_collection.update_one(
+    seq = await append_message(conversation_id, reply_dict, conversation.get('bucket_seq', 0))
+    updated_conv = await conversations_collection.find_one_and_update(
         {"id": conversation_id},
         {
-            "$push": {"messages": reply_dict},
-            "$set": {"last_message_at": datetime.utcnow().isoformat()}
-        }
+            "$inc": {"message_count": 1},
+            "$max": {"bucket_seq": seq},
+            "$set": {
+                "last_message_at": datetime.utcnow().isoformat(),
+                "last_message": message_preview(reply_dict)
+            }
+        },
+        projection={"_id": 0, "messages": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    await broker.publish(
+        [ADMIN_CHAT_TOPIC, conversation_topic(conversation_id)],
+        "chat.message",
+        {"conversationId": conversation_id, "message": reply_dict}
     )
     
-    # Get updated conversation
-    updated_conv = await conversations_collection.find_one({"id": conversation_id})
-    
+    # The stored reply only; the history is already on screen and new
+    # customer messages arrive as events
     return {
         "success": True,
+        "message": reply_dict,
         "conversation": {
             "id": updated_conv['id'],
             "customerName": updated_conv['customer_name'],
             "customerEmail": updated_conv['customer_email'],
             "customerPhone": updated_conv.get('customer_phone'),
-            "messages": updated_conv['messages'],
+            "messageCount": updated_conv.get('message_count', 0),
             "unreadCount": updated_conv.get('unread_count', 0),
             "lastMessageAt": updated_conv['last_message_at']
         }
@@ -310,5 +563,7 @@ async def delete_conversation(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
+    await delete_messages(conversation_id)
+    await broker.publish([ADMIN_CHAT_TOPIC], "chat.deleted", {"conversationId": conversation_id})
     
     return {"message": "Conversation deleted successfully"}
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.responses import FileResponse
-from typing import List
+from typing import List, Optional
 from schemas.client_project import (
     ClientProjectResponse, CommentCreate, CommentResponse,
     MilestoneResponse, TaskResponse, ProjectFileResponse,
@@ -11,7 +11,14 @@ from database import client_projects_collection
 from auth.client_auth import get_current_client
 from models.client_project import ProjectComment, ProjectActivity
 from models.client_project import ChatMessage
-from datetime import datetime
+from utils.project_entities import (
+    attach_project_entities, load_project, project_exists,
+    add_project_entity, find_project_entity, record_project_activity,
+    add_chat_message, mark_chat_messages_read,
+    resolve_chat_cursor, load_chat_messages_since
+)
+from utils.realtime import broker, long_poll, project_chat_topics, client_topic, MAX_LONG_POLL_SECONDS
+import asyncio
 import os
 
 router = APIRouter(prefix="/client/projects", tags=["client-projects"])
@@ -134,15 +141,24 @@ def convert_project_to_response(project_doc) -> ClientProjectResponse:
 @router.get("/", response_model=List[ClientProjectResponse])
 async def get_my_projects(client = Depends(get_current_client)):
     """Get all projects assigned to the current client"""
-    projects = []
-    async for project_doc in client_projects_collection.find({"client_id": client["id"]}):
-        projects.append(convert_project_to_response(project_doc))
-    return projects
+    project_docs = await client_projects_collection.find({"client_id": client["id"]}).to_list(length=None)
+    await attach_project_entities(project_docs)
+    return [convert_project_to_response(project_doc) for project_doc in project_docs]
+
+@router.get("/unread-count")
+async def get_my_unread_count(client = Depends(get_current_client)):
+    """Unread admin messages across the client's projects, from the per-project counters"""
+    projects = await client_projects_collection.find(
+        {"client_id": client["id"], "chat_unread.admin": {"$gt": 0}},
+        {"_id": 0, "id": 1, "chat_unread.admin": 1}
+    ).to_list(length=None)
+    by_project = {project["id"]: project["chat_unread"]["admin"] for project in projects}
+    return {"unread_count": sum(by_project.values()), "projects": by_project}
 
 @router.get("/{project_id}", response_model=ClientProjectResponse)
 async def get_project(project_id: str, client = Depends(get_current_client)):
     """Get a specific project (only if assigned to current client)"""
-    project_doc = await client_projects_collection.find_one({
+    project_doc = await load_project({
         "id": project_id,
         "client_id": client["id"]
     })
@@ -158,12 +174,10 @@ async def get_project(project_id: str, client = Depends(get_current_client)):
 @router.post("/{project_id}/comments", response_model=CommentResponse)
 async def add_comment(project_id: str, comment_data: CommentCreate, client = Depends(get_current_client)):
     """Add a comment to project (Client)"""
-    project_doc = await client_projects_collection.find_one({
+    if not await project_exists({
         "id": project_id,
         "client_id": client["id"]
-    })
-    
-    if not project_doc:
+    }):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found or not assigned to you"
@@ -189,15 +203,9 @@ async def add_comment(project_id: str, comment_data: CommentCreate, client = Dep
     activity_dict = activity.model_dump()
     activity_dict['timestamp'] = activity_dict['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "comments": comment_dict,
-                "activity_log": activity_dict
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    await asyncio.gather(
+        add_project_entity("comments", project_id, comment_dict),
+        record_project_activity(project_id, activity_dict)
     )
     
     return CommentResponse(**comment_dict)
@@ -210,23 +218,17 @@ async def download_project_file(
 ):
     """Download a file from a project (only if project is assigned to current client)"""
     # Verify project belongs to client
-    project_doc = await client_projects_collection.find_one({
+    if not await project_exists({
         "id": project_id,
         "client_id": client["id"]
-    })
-    
-    if not project_doc:
+    }):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found or not assigned to you"
         )
     
     # Find file in project
-    file_info = None
-    for f in project_doc.get('files', []):
-        if f['id'] == file_id:
-            file_info = f
-            break
+    file_info = await find_project_entity("files", project_id, file_id)
     
     if not file_info:
         raise HTTPException(
@@ -255,12 +257,10 @@ async def download_project_file(
 @router.post("/{project_id}/chat", response_model=ChatMessageResponse)
 async def send_chat_message(project_id: str, message_data: ChatMessageCreate, client = Depends(get_current_client)):
     """Send a chat message to admin (Client)"""
-    project_doc = await client_projects_collection.find_one({
+    if not await project_exists({
         "id": project_id,
         "client_id": client["id"]
-    })
-    
-    if not project_doc:
+    }):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found or not assigned to you"
@@ -287,46 +287,74 @@ async def send_chat_message(project_id: str, message_data: ChatMessageCreate, cl
     activity_dict = activity.model_dump()
     activity_dict['timestamp'] = activity_dict['timestamp'].isoformat()
     
-    await client_projects_collection.update_one(
-        {"id": project_id},
-        {
-            "$push": {
-                "chat_messages": message_dict,
-                "activity_log": activity_dict
-            },
-            "$set": {"last_activity_at": datetime.utcnow().isoformat()}
-        }
+    unread_count, _ = await asyncio.gather(
+        add_chat_message(project_id, message_dict),
+        record_project_activity(project_id, activity_dict)
     )
+    await broker.publish(project_chat_topics(client["id"]), "project.chat.message", {
+        "project_id": project_id,
+        "message": message_dict,
+        "unread_count": unread_count
+    })
     
     return ChatMessageResponse(**message_dict)
 
 @router.get("/{project_id}/chat", response_model=List[ChatMessageResponse])
-async def get_chat_messages(project_id: str, client = Depends(get_current_client)):
-    """Get all chat messages for a project (Client)"""
-    project_doc = await client_projects_collection.find_one({
-        "id": project_id,
-        "client_id": client["id"]
-    })
-    
-    if not project_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found or not assigned to you"
-        )
+async def get_chat_messages(
+    project_id: str,
+    after: Optional[str] = Query(None, description="Message id or ISO timestamp; only newer messages are returned"),
+    before: Optional[str] = Query(None, description="Message id or ISO timestamp; only older messages are returned"),
+    limit: int = Query(100, ge=1, le=500),
+    wait: int = Query(0, ge=0, le=MAX_LONG_POLL_SECONDS, description="With after: seconds to wait for a new message"),
+    client = Depends(get_current_client)
+):
+    """
+    Get chat messages for a project (Client)
+    Without after/before the full history is returned; with one of them only
+    up to `limit` messages on that side of the cursor.
+    """
+    if after and before:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either after or before, not both")
     
-    # Mark client messages as read
-    chat_messages = project_doc.get('chat_messages', [])
-    updated = False
-    for msg in chat_messages:
-        if msg['sender_type'] == 'admin' and not msg.get('read', False):
-            msg['read'] = True
-            updated = True
+    if after or before:
+        if not await project_exists({"id": project_id, "client_id": client["id"]}):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found or not assigned to you"
+            )
+        timestamp = await resolve_chat_cursor(project_id, after or before)
+        if not timestamp:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown message cursor")
+        if after:
+            chat_messages = await long_poll(
+                [client_topic(client["id"])],
+                wait,
+                lambda: load_chat_messages_since(project_id, after=timestamp, limit=limit)
+            )
+        else:
+            chat_messages = await load_chat_messages_since(project_id, before=timestamp, limit=limit)
+    else:
+        project_doc = await load_project({
+            "id": project_id,
+            "client_id": client["id"]
+        }, kinds=["chat_messages"])
+        
+        if not project_doc:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found or not assigned to you"
+            )
+        chat_messages = project_doc.get('chat_messages', [])
     
-    if updated:
-        await client_projects_collection.update_one(
-            {"id": project_id},
-            {"$set": {"chat_messages": chat_messages}}
-        )
+    # Mark admin messages as read
+    if any(msg['sender_type'] == 'admin' and not msg.get('read', False) for msg in chat_messages):
+        unread_count = await mark_chat_messages_read(project_id, "admin")
+        await broker.publish(project_chat_topics(client["id"]), "project.chat.read", {
+            "project_id": project_id, "sender_type": "admin", "unread_count": unread_count
+        })
+        for msg in chat_messages:
+            if msg['sender_type'] == 'admin':
+                msg['read'] = True
     
     return [
         ChatMessageResponse(
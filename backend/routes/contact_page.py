@@ -1,26 +1,29 @@
 """Contact Page Content Routes"""
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 from database import contact_page_collection
 from models.contact_page import ContactPageContent, ContactPageUpdate
 from auth.admin_auth import get_current_admin
+from utils.singleton_cache import singleton_cache
+from utils.public_bundle import public_data_changed
 import uuid
 
-router = APIRouter(prefix="/contact-page", tags=["Contact Page"])
+router = APIRouter(prefix="/contact-page", tags=["Contact Page"], dependencies=[Depends(public_data_changed("contact_page"))])
+
+async def load_contact_page() -> Optional[Dict[str, Any]]:
+    return await contact_page_collection.find_one({}, {"_id": 0})
 
 @router.get("/", response_model=Dict[str, Any])
 async def get_contact_page():
     """Get contact page content (public)"""
     try:
-        content = await contact_page_collection.find_one()
+        content = await singleton_cache.get("contact_page", load_contact_page)
         
         if not content:
             # Return default content if none exists
             return get_default_contact_content()
         
-        # Remove MongoDB _id field
-        content.pop('_id', None)
         return content
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -61,6 +64,7 @@ async def update_contact_page(
             {'$set': existing},
             upsert=True
         )
+        await singleton_cache.invalidate_everywhere("contact_page")
         
         # Remove MongoDB _id field
         existing.pop('_id', None)
@@ -78,6 +82,7 @@ async def reset_contact_page(current_admin: dict = Depends(get_current_admin)):
         
         await contact_page_collection.delete_many({})
         await contact_page_collection.insert_one(default_content)
+        await singleton_cache.invalidate_everywhere("contact_page")
         
         default_content.pop('_id', None)
         return {"message": "Contact page reset to default", "content": default_content}
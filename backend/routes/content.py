@@ -1,15 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.content import ContentUpdate, ContentResponse
 from database import content_collection
 from utils import serialize_document
+from utils.singleton_cache import singleton_cache
+from utils.public_bundle import public_data_changed
 from models.content import WebsiteContent
 from datetime import datetime
 
-router = APIRouter(prefix="/content", tags=["content"])
+router = APIRouter(prefix="/content", tags=["content"], dependencies=[Depends(public_data_changed("content"))])
 
-@router.get("/", response_model=ContentResponse)
-async def get_content():
-    """Get website content"""
+async def load_content() -> dict:
     content = await content_collection.find_one({"id": "website_content"})
     
     if not content:
@@ -22,6 +22,11 @@ async def get_content():
     
     return serialize_document(content)
 
+@router.get("/", response_model=ContentResponse)
+async def get_content():
+    """Get website content"""
+    return await singleton_cache.get("content", load_content)
+
 @router.put("/", response_model=ContentResponse)
 async def update_content(content_data: ContentUpdate):
     """Update website content"""
@@ -45,5 +50,6 @@ async def update_content(content_data: ContentUpdate):
         {"$set": update_data}
     )
     
+    await singleton_cache.invalidate_everywhere("content")
     updated_content = await content_collection.find_one({"id": "website_content"})
     return serialize_document(updated_content)
@@ -21,8 +21,14 @@ from models.feelings_service import FeelingsService
 from models.service_request import ServiceRequest
 from models.generated_link import GeneratedLink
 from auth.admin_auth import get_current_admin
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/feelings-services", tags=["Feelings Services"])
+router = APIRouter(
+    prefix="/feelings-services",
+    tags=["Feelings Services"],
+    dependencies=[Depends(public_data_changed("feelings_services"))]
+)
 
 # ============================================
 # FEELINGS SERVICES (Admin Only)
@@ -50,6 +56,7 @@ async def create_feelings_service(
 
 
 @router.get("/", response_model=List[FeelingsService])
+@public_cache
 async def get_all_feelings_services(
     active_only: bool = False
 ):
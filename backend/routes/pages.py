@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Dict, Any
 from schemas.page_content import PageContentCreate, PageContentUpdate, PageContentResponse
 from database import page_content_collection
 from utils import serialize_document
 from models import PageContent
 from datetime import datetime
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/pages", tags=["pages"])
+router = APIRouter(prefix="/pages", tags=["pages"], dependencies=[Depends(public_data_changed("pages"))])
 
 @router.get("/{page_name}")
+@public_cache
 async def get_page_content(page_name: str):
     """Get all content sections for a specific page"""
     cursor = page_content_collection.find({"page": page_name})
@@ -2,15 +2,15 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.pricing import PricingUpdate, PricingResponse
 from database import pricing_collection
 from utils import serialize_document
+from utils.singleton_cache import singleton_cache
+from utils.public_bundle import public_data_changed
 from models.pricing import Pricing, WebsiteType, Technology, Feature, TimelineMultiplier
 from datetime import datetime
 from auth.admin_auth import get_current_admin
 
-router = APIRouter(prefix="/pricing", tags=["pricing"])
+router = APIRouter(prefix="/pricing", tags=["pricing"], dependencies=[Depends(public_data_changed("pricing"))])
 
-@router.get("/", response_model=PricingResponse)
-async def get_pricing():
-    """Get pricing configuration (public endpoint)"""
+async def load_pricing() -> dict:
     pricing = await pricing_collection.find_one({"id": "pricing_config"})
     
     if not pricing:
@@ -56,6 +56,11 @@ async def get_pricing():
     
     return serialize_document(pricing)
 
+@router.get("/", response_model=PricingResponse)
+async def get_pricing():
+    """Get pricing configuration (public endpoint)"""
+    return await singleton_cache.get("pricing", load_pricing)
+
 @router.put("/", response_model=PricingResponse)
 async def update_pricing(
     pricing_data: PricingUpdate,
@@ -87,5 +92,6 @@ async def update_pricing(
         doc['updated_at'] = doc['updated_at'].isoformat()
         await pricing_collection.insert_one(doc)
     
+    await singleton_cache.invalidate_everywhere("pricing")
     updated_pricing = await pricing_collection.find_one({"id": "pricing_config"})
     return serialize_document(updated_pricing)
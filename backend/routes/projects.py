@@ -6,10 +6,13 @@ from utils import serialize_document, create_slug
 from models import Project
 from datetime import datetime
 from auth.admin_auth import get_current_admin
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], dependencies=[Depends(public_data_changed("projects"))])
 
 @router.get("/", response_model=List[ProjectResponse])
+@public_cache
 async def get_projects():
     """Get public projects only (for public portfolio page)"""
     cursor = projects_collection.find({"is_private": {"$ne": True}}).sort("created_at", -1)
@@ -0,0 +1,148 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from pydantic import TypeAdapter
+from typing import Any, Dict, List
+import asyncio
+import hashlib
+import json
+
+from database import projects_collection, page_content_collection
+from auth.admin_auth import get_current_admin
+from schemas.content import ContentResponse
+from schemas.about import AboutContentResponse
+from schemas.service import ServiceResponse
+from schemas.project import ProjectResponse
+from schemas.blog import BlogResponse
+from schemas.testimonial import TestimonialResponse
+from schemas.pricing import PricingResponse
+from schemas.settings import SettingsResponse
+from models.feelings_service import FeelingsService
+from utils import serialize_document
+from utils.http_cache import public_cache
+from utils.public_bundle import bundle_cache, HOME_BUNDLE, BUNDLE_SECTIONS, on_public_data_change
+from utils.public_snapshot import public_snapshot
+from routes.content import get_content
+from routes.about import get_about_content
+from routes.services import get_services
+from routes.projects import get_projects
+from routes.blogs import get_published_blogs
+from routes.testimonials import get_public_testimonials
+from routes.skills import get_skills
+from routes.pricing import get_pricing
+from routes.pages import get_page_content
+from routes.feelings_services import get_all_feelings_services
+from routes.contact_page import get_contact_page
+from routes.settings import get_settings
+
+router = APIRouter(prefix="/public", tags=["public"])
+
+# Featured projects shown on the home page
+FEATURED_PROJECTS = 3
+
+def to_json(value: Any, model: Any) -> Any:
+    """`value` as its endpoint would send it: validated against the response model, JSON-ready"""
+    adapter = TypeAdapter(model)
+    return adapter.dump_python(adapter.validate_python(value), mode="json")
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+async def get_featured_projects() -> list:
+    cursor = projects_collection.find(
+        {"is_private": {"$ne": True}, "featured": True}
+    ).sort("created_at", -1).limit(FEATURED_PROJECTS)
+    return [serialize_document(project) for project in await cursor.to_list(length=FEATURED_PROJECTS)]
+
+# Bundle key -> (loader, response model the standalone endpoint uses)
+HOME_SECTIONS = {
+    "content": (get_content, ContentResponse),
+    "about": (get_about_content, AboutContentResponse),
+    "services": (get_services, List[ServiceResponse]),
+    "featured_projects": (get_featured_projects, List[ProjectResponse]),
+    "testimonials": (get_public_testimonials, List[TestimonialResponse]),
+    "skills": (get_skills, dict),
+    "pricing": (get_pricing, PricingResponse),
+}
+
+async def build_home_bundle() -> dict:
+    """Load every section in parallel and encode the whole bundle once"""
+    values = await asyncio.gather(*(loader() for loader, _ in HOME_SECTIONS.values()))
+    body = encode({
+        key: to_json(value, model)
+        for (key, (_, model)), value in zip(HOME_SECTIONS.items(), values)
+    })
+    return {"body": body, "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"'}
+
+@router.get("/bundle")
+@public_cache
+async def get_public_bundle():
+    """
+    Everything the home page renders in one response: content, about,
+    services, featured projects, testimonials, skills and pricing, each in
+    the same shape as its own endpoint
+    """
+    bundle = await bundle_cache.get(HOME_BUNDLE, build_home_bundle)
+    return Response(content=bundle["body"], media_type="application/json", headers={"ETag": bundle["etag"]})
+
+# ---------------- Static snapshot ----------------
+# Files are named after the endpoint path (see utils/public_snapshot.py)
+
+def single_file(path: str, loader, model):
+    async def render() -> Dict[str, bytes]:
+        return {path: encode(to_json(await loader(), model))}
+    return render
+
+async def render_pages() -> Dict[str, bytes]:
+    names = [name for name in await page_content_collection.distinct("page") if isinstance(name, str)]
+    contents = await asyncio.gather(*(get_page_content(name) for name in names))
+    return {f"pages/{name}.json": encode(to_json(content, dict)) for name, content in zip(names, contents)}
+
+async def render_blogs() -> Dict[str, bytes]:
+    blogs = to_json(await get_published_blogs(), List[BlogResponse])
+    files = {"blogs.json": encode(blogs)}
+    for blog in blogs:
+        files[f"blogs/{blog['slug']}.json"] = encode(blog)
+    return files
+
+async def render_feelings_services() -> Dict[str, bytes]:
+    every, active = await asyncio.gather(
+        get_all_feelings_services(active_only=False),
+        get_all_feelings_services(active_only=True)
+    )
+    return {
+        "feelings-services.json": encode(to_json(every, List[FeelingsService])),
+        "feelings-services.active.json": encode(to_json(active, List[FeelingsService]))
+    }
+
+async def render_bundle() -> Dict[str, bytes]:
+    bundle = await bundle_cache.get(HOME_BUNDLE, build_home_bundle)
+    return {"public/bundle.json": bundle["body"]}
+
+public_snapshot.register("pages", render_pages)
+public_snapshot.register("services", single_file("services.json", get_services, List[ServiceResponse]))
+public_snapshot.register("projects", single_file("projects.json", get_projects, List[ProjectResponse]))
+public_snapshot.register("blogs", render_blogs)
+public_snapshot.register("testimonials", single_file("testimonials.json", get_public_testimonials, List[TestimonialResponse]))
+public_snapshot.register("pricing", single_file("pricing.json", get_pricing, PricingResponse))
+public_snapshot.register("feelings_services", render_feelings_services)
+public_snapshot.register("content", single_file("content.json", get_content, ContentResponse))
+public_snapshot.register("about", single_file("about.json", get_about_content, AboutContentResponse))
+public_snapshot.register("contact_page", single_file("contact-page.json", get_contact_page, Dict[str, Any]))
+public_snapshot.register("settings", single_file("settings.json", get_settings, SettingsResponse))
+public_snapshot.register("skills", single_file("skills.json", get_skills, dict))
+public_snapshot.register("bundle", render_bundle, depends_on=BUNDLE_SECTIONS)
+on_public_data_change(public_snapshot.mark_dirty)
+
+@router.get("/snapshot")
+async def get_snapshot_status(admin = Depends(get_current_admin)):
+    """Current static snapshot version and pending sections (Admin)"""
+    return public_snapshot.stats()
+
+@router.post("/snapshot")
+async def rebuild_snapshot(admin = Depends(get_current_admin)):
+    """Render every section and publish a new snapshot version if anything changed (Admin)"""
+    if not public_snapshot.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Static snapshots are disabled; set PUBLIC_SNAPSHOT_DIR"
+        )
+    return await public_snapshot.build()
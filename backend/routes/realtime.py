@@ -0,0 +1,139 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional, Set
+import asyncio
+import json
+
+from database import conversations_collection
+from auth.jwt import decode_access_token
+from auth.admin_auth import get_current_admin, check_permission
+from auth.client_auth import get_current_client
+from utils.realtime import (
+    broker, ADMIN_CHAT_TOPIC, ADMIN_PROJECTS_TOPIC, client_topic, conversation_topic
+)
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+# Keep idle connections alive through proxies and notice dead ones
+HEARTBEAT_SECONDS = 25
+
+async def resolve_topics(token: Optional[str], conversation_id: Optional[str], email: Optional[str]) -> Set[str]:
+    """
+    Topics a connection may follow:
+    - admin token: project chat, plus public chat with canAccessChat
+    - client token: the client's own projects
+    - conversation_id + email: one public chat conversation (chat widget)
+    """
+    if token:
+        payload = decode_access_token(token) or {}
+        if payload.get("type") == "client":
+            client = await get_current_client(f"Bearer {token}")
+            return {client_topic(client["id"])}
+        admin = await get_current_admin(f"Bearer {token}")
+        topics = {ADMIN_PROJECTS_TOPIC}
+        if check_permission(admin, 'canAccessChat'):
+            topics.add(ADMIN_CHAT_TOPIC)
+        return topics
+
+    if conversation_id and email:
+        conversation = await conversations_collection.find_one(
+            {"id": conversation_id, "customer_email": email}, {"_id": 1}
+        )
+        if conversation:
+            return {conversation_topic(conversation_id)}
+
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Authentication required"
+    )
+
+def _wire(event: dict) -> dict:
+    return {"id": event["id"], "type": event["type"], "data": event["data"]}
+
+async def _read_until_closed(websocket: WebSocket):
+    # Clients don't send anything; reading is how a close is noticed
+    while True:
+        await websocket.receive_text()
+
+async def _send_events(websocket: WebSocket, subscription):
+    while True:
+        event = await subscription.next(HEARTBEAT_SECONDS)
+        await websocket.send_json(_wire(event) if event else {"type": "ping"})
+
+@router.websocket("/ws")
+async def realtime_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    email: Optional[str] = None
+):
+    """
+    Push chat events over a WebSocket. Browsers can't set headers on a
+    WebSocket, so the access token comes as ?token=.
+    """
+    try:
+        topics = await resolve_topics(token, conversation_id, email)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = broker.subscribe(topics)
+    tasks = []
+    try:
+        await websocket.send_json({"type": "ready", "data": {"topics": sorted(topics)}})
+        tasks = [
+            asyncio.create_task(_read_until_closed(websocket)),
+            asyncio.create_task(_send_events(websocket, subscription))
+        ]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exception = task.exception()
+            if exception and not isinstance(exception, WebSocketDisconnect):
+                raise exception
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        broker.unsubscribe(subscription)
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\ndata: {json.dumps(_wire(event))}\n\n"
+
+@router.get("/events")
+async def realtime_event_stream(
+    request: Request,
+    token: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    email: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events fallback for the WebSocket. EventSource can't set
+    headers either, so ?token= is accepted alongside Authorization.
+    """
+    if not token and authorization:
+        token = authorization.split()[-1]
+    topics = await resolve_topics(token, conversation_id, email)
+    subscription = broker.subscribe(topics)
+
+    async def stream():
+        try:
+            yield f"data: {json.dumps({'type': 'ready', 'data': {'topics': sorted(topics)}})}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.next(HEARTBEAT_SECONDS)
+                yield _sse(event) if event else ": ping\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats")
+async def get_realtime_stats(current_admin: dict = Depends(get_current_admin)):
+    """Connections and event counts for this worker - admin only"""
+    return broker.stats()
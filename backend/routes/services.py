@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
 from database import services_collection
 from utils import serialize_document
 from models import Service
 from datetime import datetime
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/services", tags=["services"])
+router = APIRouter(prefix="/services", tags=["services"], dependencies=[Depends(public_data_changed("services"))])
 
 @router.get("/", response_model=List[ServiceResponse])
+@public_cache
 async def get_services():
     """Get all services"""
     cursor = services_collection.find().sort("order", 1)
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from schemas.settings import SettingsUpdate, SettingsResponse
 from database import settings_collection
 from utils import serialize_document
+from utils.singleton_cache import singleton_cache
+from utils.public_bundle import public_data_changed
 from models import Settings
 from datetime import datetime
 
-router = APIRouter(prefix="/settings", tags=["settings"])
+router = APIRouter(prefix="/settings", tags=["settings"], dependencies=[Depends(public_data_changed("settings"))])
+
+async def load_settings() -> dict:
+    return serialize_document(await settings_collection.find_one({"id": "global_settings"}))
 
 @router.get("/", response_model=SettingsResponse)
 async def get_settings():
     """Get global settings"""
-    settings = await settings_collection.find_one({"id": "global_settings"})
+    settings = await singleton_cache.get("settings", load_settings)
     if not settings:
         # Return default settings if none exist
         default_settings = Settings(
@@ -24,7 +29,7 @@ async def get_settings():
             enable_share_buttons=True
         )
         return default_settings.model_dump()
-    return serialize_document(settings)
+    return settings
 
 @router.put("/", response_model=SettingsResponse)
 async def update_settings(settings_data: SettingsUpdate):
@@ -59,5 +64,6 @@ async def update_settings(settings_data: SettingsUpdate):
         doc['updated_at'] = doc['updated_at'].isoformat()
         await settings_collection.insert_one(doc)
     
+    await singleton_cache.invalidate_everywhere("settings")
     updated_settings = await settings_collection.find_one({"id": "global_settings"})
     return serialize_document(updated_settings)
@@ -3,10 +3,13 @@ from schemas.skill import SkillCreate, SkillUpdate
 from database import skills_collection
 from auth.admin_auth import get_current_admin
 from models.skill import Skill
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter(prefix="/skills", tags=["skills"])
+router = APIRouter(prefix="/skills", tags=["skills"], dependencies=[Depends(public_data_changed("skills"))])
 
 @router.get("")
+@public_cache
 async def get_skills():
     """Get all skills (public endpoint)"""
     skills = await skills_collection.find({}).to_list(length=100)
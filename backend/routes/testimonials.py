@@ -7,8 +7,10 @@ from database import testimonials_collection, clients_collection, client_project
 from schemas.testimonial import TestimonialCreate, TestimonialSubmit, TestimonialUpdate, TestimonialResponse
 from auth.admin_auth import get_current_admin
 from auth.client_auth import get_current_client
+from utils.http_cache import public_cache
+from utils.public_bundle import public_data_changed
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(public_data_changed("testimonials"))])
 
 
 # Helper function to convert MongoDB document to response format
@@ -38,6 +40,7 @@ def testimonial_helper(testimonial) -> dict:
 # ================================
 
 @router.get("/", response_model=List[TestimonialResponse])
+@public_cache
 async def get_public_testimonials():
     """Get all approved testimonials (public endpoint)"""
     try:
@@ -8,6 +8,10 @@ class AnalyticsEventCreate(BaseModel):
     page_name: Optional[str] = None
     blog_id: Optional[str] = None
     blog_title: Optional[str] = None
+    # Random id kept by the browser; only used for unique-visitor estimates
+    visitor_id: Optional[str] = Field(None, max_length=64)
+    # Per-tab id used to follow one visit through the conversion funnel
+    session_id: Optional[str] = Field(None, max_length=64)
 
 class AnalyticsEventResponse(BaseModel):
     """Response schema for analytics events"""
@@ -22,6 +26,7 @@ class PageViewStats(BaseModel):
     """Page view statistics"""
     page_name: str
     count: int
+    unique_visitors: int = 0
 
 class BlogViewStats(BaseModel):
     """Blog view statistics"""
@@ -37,4 +42,40 @@ class AnalyticsSummary(BaseModel):
     calculator_estimates: int
     page_views_by_page: List[PageViewStats]
     blog_views: List[BlogViewStats]
+    # HyperLogLog estimate, ~1.6% standard error
+    unique_visitors: int = 0
     period: str  # 'today', '7days', '30days'
+
+class AnalyticsSeries(BaseModel):
+    """Counts of one event type (and page) per bucket"""
+    event_type: str
+    page_name: Optional[str] = None
+    total: int
+    values: List[int]
+
+class AnalyticsTimeSeries(BaseModel):
+    """Zero-filled series aligned to a shared list of bucket start times"""
+    granularity: str  # 'hour', 'day', 'week', 'month'
+    start: str
+    end: str
+    buckets: List[str]
+    series: List[AnalyticsSeries]
+
+class FunnelStep(BaseModel):
+    """Sessions that reached one funnel step"""
+    event_type: str
+    sessions: int
+    step_conversion: Optional[float] = None  # share of the previous step; None for the first
+    overall_conversion: float  # share of the first step
+
+class FunnelBreakdown(BaseModel):
+    """Funnel for sessions that landed on one page"""
+    landing_page: str
+    steps: List[FunnelStep]
+
+class AnalyticsFunnel(BaseModel):
+    """Conversion funnel for sessions started in a period"""
+    start: str
+    end: str
+    steps: List[FunnelStep]
+    by_landing_page: List[FunnelBreakdown]
@@ -252,3 +252,27 @@ class FileUploadResponse(BaseModel):
     id: str
     filename: str
     message: str
+
+class ClientProjectSummary(BaseModel):
+    """Lightweight project row for list views (no sub-entity payloads)"""
+    id: str
+    name: str
+    client_id: str
+    client_name: Optional[str] = None
+    status: str
+    priority: str
+    progress: int
+    start_date: Optional[str] = None
+    expected_delivery: Optional[str] = None
+    actual_delivery: Optional[str] = None
+    tags: List[str] = []
+    task_count: int = 0
+    file_count: int = 0
+    unread_messages: int = 0
+    created_at: str
+    last_activity_at: Optional[str] = None
+
+class ClientProjectSummaryPage(BaseModel):
+    """One page of project summaries; pass next_cursor back to get the next page"""
+    items: List[ClientProjectSummary]
+    next_cursor: Optional[str] = None
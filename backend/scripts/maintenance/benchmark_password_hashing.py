@@ -0,0 +1,75 @@
+"""
+Measure how a burst of logins affects the latency of unrelated requests.
+
+Runs entirely in-process (no server or database needed). A "probe" coroutine
+stands in for a cheap unrelated endpoint: it wakes every few milliseconds and
+records how late it was scheduled. Meanwhile a burst of password checks runs
+either inline on the event loop (how the routes used to call bcrypt) or through
+the bounded hashing pool in auth.password.
+
+Usage:
+    cd /app/backend
+    python scripts/maintenance/benchmark_password_hashing.py [--logins 40] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+PROBE_INTERVAL = 0.005  # seconds between probe requests
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def probe(stop: asyncio.Event, samples: list):
+    """Unrelated endpoint: record how late each wake-up is, in milliseconds"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+async def run_scenario(name, login, stored_hash, logins):
+    stop = asyncio.Event()
+    samples = []
+    probe_task = asyncio.create_task(probe(stop, samples))
+    await asyncio.sleep(0.05)  # let the probe settle
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login("correct horse battery staple", stored_hash) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    print(f"  {name:<22} burst {elapsed:6.2f}s | probe p50 {percentile(samples, 50):7.1f}ms"
+          f" | p99 {percentile(samples, 99):7.1f}ms | max {max(samples):7.1f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=40, help="concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(max(64, args.logins)))
+    from auth import password
+
+    stored_hash = password.hash_password("correct horse battery staple")
+
+    async def inline_login(plain, hashed):
+        return password.verify_password(plain, hashed)
+
+    print(f"🔐 {args.logins} concurrent logins, bcrypt cost {args.rounds}, "
+          f"{password.PASSWORD_HASH_WORKERS} hashing workers\n")
+    await run_scenario("before (inline bcrypt)", inline_login, stored_hash, args.logins)
+    await run_scenario("after (hashing pool)", password.verify_password_async, stored_hash, args.logins)
+    password.shutdown_password_hasher()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+"""
+Render every public GET into a new static snapshot version.
+
+The server keeps the snapshot current on its own once PUBLIC_SNAPSHOT_DIR is
+set; this does a full build on demand, e.g. from a deploy step or to export
+into a directory the server doesn't write to. Files whose content did not
+change are hard-linked from the previous version, and no version is written
+when nothing changed, so it is safe to re-run.
+
+Usage:
+    cd /app/backend
+    python scripts/maintenance/export_public_snapshot.py [--dir /var/www/snapshot]
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from routes.public import public_snapshot
+
+async def export_public_snapshot(directory: str):
+    print(f"📦 Exporting public snapshot to {directory}...")
+    public_snapshot.root = Path(directory)
+    summary = await public_snapshot.build()
+
+    if not summary["published"]:
+        print(f"\n✅ Nothing changed, {summary['version']} is still current")
+        return
+    print(f"  • {summary['written']} files written, {summary['linked']} unchanged")
+    for path in summary["removed"]:
+        print(f"  • removed {path}")
+    print(f"\n✅ Published {summary['version']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export public site data as a static snapshot")
+    parser.add_argument("--dir", default=str(public_snapshot.root or ""),
+                        help="Snapshot directory (default: PUBLIC_SNAPSHOT_DIR)")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir is required when PUBLIC_SNAPSHOT_DIR is not set")
+    asyncio.run(export_public_snapshot(args.dir))
@@ -0,0 +1,86 @@
+"""
+Convert the analytics collection into a time-series collection.
+
+MongoDB can't convert a collection in place, and time-series collections
+can't be renamed, so the existing collection is moved aside first:
+
+1. rename analytics -> analytics_legacy
+2. create analytics as a time-series collection (timeField timestamp,
+   metaField meta, ANALYTICS_RETENTION_DAYS retention)
+3. move documents from analytics_legacy in batches, reshaping
+   event_type/page_name into meta, deleting each batch once copied
+4. drop analytics_legacy when it is empty
+
+Steps 1-2 run back to back; the app's ingest buffer holds events for up to a
+second, so run this at a quiet time. Re-running resumes from whatever step was
+interrupted. A crash between copying and deleting a batch duplicates at most
+that one batch.
+
+Usage:
+    cd /app/backend
+    python scripts/maintenance/migrate_analytics_timeseries.py
+"""
+import asyncio
+
+from database import db, INDEX_REGISTRY, TIMESERIES_COLLECTIONS, ensure_timeseries_collections, ensure_indexes
+
+BATCH_SIZE = 1000
+LEGACY_NAME = "analytics_legacy"
+
+def reshape(doc: dict) -> dict:
+    """Old flat event -> time-series layout"""
+    if "meta" not in doc:
+        doc["meta"] = {"event_type": doc.pop("event_type", None), "page_name": doc.pop("page_name", None)}
+    return doc
+
+async def collection_type(name: str):
+    async for info in db.list_collections(filter={"name": name}):
+        return info.get("type", "collection")
+    return None
+
+async def migrate_analytics_timeseries():
+    print("🔧 Migrating analytics to a time-series collection...")
+
+    current = await collection_type("analytics")
+    if current == "collection":
+        if await collection_type(LEGACY_NAME):
+            # Live traffic recreated a regular analytics during an earlier run;
+            # fold its events into the legacy collection and start over
+            stray = await db["analytics"].find().to_list(length=None)
+            if stray:
+                await db[LEGACY_NAME].insert_many(stray, ordered=False)
+            await db["analytics"].drop()
+            print(f"  • Folded {len(stray)} stray events into {LEGACY_NAME}")
+        else:
+            await db["analytics"].rename(LEGACY_NAME)
+            print(f"  • Renamed analytics -> {LEGACY_NAME}")
+
+    await ensure_timeseries_collections()
+    if await collection_type("analytics") != "timeseries":
+        print("❌ analytics was recreated as a regular collection by live traffic; re-run the script to retry")
+        return
+    await ensure_indexes({"analytics": INDEX_REGISTRY["analytics"]})
+
+    if not await collection_type(LEGACY_NAME):
+        print("✅ Nothing left to migrate")
+        return
+
+    legacy = db[LEGACY_NAME]
+    target = db["analytics"]
+    moved = 0
+    while True:
+        batch = await legacy.find().limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+        ids = [doc["_id"] for doc in batch]
+        await target.insert_many([reshape(doc) for doc in batch], ordered=False)
+        await legacy.delete_many({"_id": {"$in": ids}})
+        moved += len(batch)
+        print(f"  • Moved {moved} events")
+
+    await legacy.drop()
+    retention = TIMESERIES_COLLECTIONS["analytics"]["retention_days"]
+    print(f"\n✅ Migrated {moved} events (retention: {retention or 'unlimited'} days)")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_analytics_timeseries())
@@ -0,0 +1,89 @@
+"""
+Move embedded public chat messages into chat_message_buckets.
+
+Safe to run while the API is serving traffic and safe to re-run:
+- new messages already go to buckets, so an embedded array only changes when
+  an admin marks the conversation read
+- legacy messages are written as whole buckets with negative seqs (-n..-1), so
+  they sort before anything appended since; re-runs overwrite the same buckets
+- the embedded array is removed only if it is still exactly the one copied,
+  otherwise the conversation is copied again
+- the routes read both locations until a conversation has been migrated
+"""
+import asyncio
+import math
+from pymongo import ReplaceOne
+from database import conversations_collection, chat_message_buckets_collection
+from utils.chat_buckets import BUCKET_SIZE, message_preview
+
+MAX_ATTEMPTS = 5
+
+def legacy_buckets(conversation_id: str, messages: list) -> list:
+    """Split legacy messages into full buckets numbered -n..-1 (newest last)"""
+    count = math.ceil(len(messages) / BUCKET_SIZE)
+    buckets = []
+    for index in range(count):
+        chunk = messages[index * BUCKET_SIZE:(index + 1) * BUCKET_SIZE]
+        buckets.append({
+            "conversation_id": conversation_id,
+            "seq": index - count,
+            "count": len(chunk),
+            "messages": chunk,
+            "first_at": chunk[0].get("timestamp"),
+            "last_at": chunk[-1].get("timestamp")
+        })
+    return buckets
+
+async def migrate_conversation(conversation_id: str) -> int:
+    """Copy one conversation's embedded messages out and strip them. Returns the count moved."""
+    for _ in range(MAX_ATTEMPTS):
+        conversation = await conversations_collection.find_one({"id": conversation_id}, {"_id": 0, "messages": 1})
+        messages = (conversation or {}).get("messages")
+        if messages is None:
+            return 0
+
+        buckets = legacy_buckets(conversation_id, messages)
+        if buckets:
+            await chat_message_buckets_collection.bulk_write([
+                ReplaceOne({"conversation_id": conversation_id, "seq": bucket["seq"]}, bucket, upsert=True)
+                for bucket in buckets
+            ], ordered=False)
+
+        if messages:
+            # Inbox preview, unless a message appended since already set one
+            await conversations_collection.update_one(
+                {"id": conversation_id, "last_message": {"$exists": False}},
+                {"$set": {"last_message": message_preview(messages[-1])}}
+            )
+
+        result = await conversations_collection.update_one(
+            {"id": conversation_id, "messages": messages},
+            {"$unset": {"messages": ""}, "$inc": {"message_count": len(messages)}}
+        )
+        if result.modified_count:
+            return len(messages)
+        # Marked read while we copied; copy the new flags
+
+    print(f"  ⚠️ {conversation_id} kept changing, re-run to finish it")
+    return 0
+
+async def migrate_chat_buckets():
+    """Migrate every conversation that still embeds its messages"""
+    print("🔧 Migrating public chat messages into buckets...")
+
+    total_conversations = 0
+    total_messages = 0
+    cursor = conversations_collection.find(
+        {"messages": {"$exists": True}},
+        {"_id": 0, "id": 1, "customer_email": 1}
+    )
+    async for conversation in cursor:
+        moved = await migrate_conversation(conversation["id"])
+        total_conversations += 1
+        total_messages += moved
+        print(f"  • {conversation.get('customer_email', conversation['id'])}: {moved} messages")
+
+    print(f"\n✅ Migrated {total_messages} messages from {total_conversations} conversations")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_chat_buckets())
@@ -0,0 +1,85 @@
+"""
+Move embedded client project arrays (milestones, tasks, files, comments,
+chat_messages, activity_log) into their own collections.
+
+Safe to run while the API is serving traffic and safe to re-run:
+- entries are upserted by id with $setOnInsert, so anything already moved
+  (or edited since) is never overwritten
+- only the ids that were copied are $pull-ed from the project document, so
+  nothing written concurrently is lost
+- the routes read both locations until a project has been migrated
+"""
+import asyncio
+import uuid
+from pymongo import UpdateOne
+from database import client_projects_collection
+from utils.project_entities import PROJECT_ENTITIES
+
+BATCH_SIZE = 500
+
+async def migrate_project(project_doc) -> dict:
+    """Copy one project's embedded entries out and strip them from the document"""
+    project_id = project_doc['id']
+    moved = {}
+
+    for kind, (collection, _) in PROJECT_ENTITIES.items():
+        entries = project_doc.get(kind) or []
+        if not entries:
+            continue
+
+        # Very old entries may predate ids; give them one so they stay addressable
+        migrated_ids = [entry['id'] for entry in entries if entry.get('id')]
+        has_missing_ids = len(migrated_ids) < len(entries)
+        for entry in entries:
+            if not entry.get('id'):
+                entry['id'] = str(uuid.uuid4())
+
+        for start in range(0, len(entries), BATCH_SIZE):
+            batch = entries[start:start + BATCH_SIZE]
+            await collection.bulk_write([
+                UpdateOne(
+                    {"id": entry['id']},
+                    {"$setOnInsert": {**entry, "project_id": project_id}},
+                    upsert=True
+                ) for entry in batch
+            ], ordered=False)
+
+        await client_projects_collection.update_one(
+            {"id": project_id},
+            {"$pull": {kind: {"id": {"$in": migrated_ids}}}}
+        )
+        if has_missing_ids:
+            # Matches entries whose id is null or absent
+            await client_projects_collection.update_one(
+                {"id": project_id},
+                {"$pull": {kind: {"id": None}}}
+            )
+        await client_projects_collection.update_one(
+            {"id": project_id, kind: {"$size": 0}},
+            {"$unset": {kind: ""}}
+        )
+        moved[kind] = len(entries)
+
+    return moved
+
+async def migrate_project_entities():
+    """Migrate every project that still has embedded sub-entities"""
+    print("🔧 Migrating client project sub-entities...")
+
+    query = {"$or": [{kind: {"$exists": True}} for kind in PROJECT_ENTITIES]}
+    total_projects = 0
+    totals = {kind: 0 for kind in PROJECT_ENTITIES}
+
+    async for project_doc in client_projects_collection.find(query):
+        moved = await migrate_project(project_doc)
+        total_projects += 1
+        for kind, count in moved.items():
+            totals[kind] += count
+        print(f"  • {project_doc.get('name', project_doc['id'])}: {moved or 'nothing to move'}")
+
+    print(f"\n✅ Migrated {total_projects} projects")
+    for kind, count in totals.items():
+        print(f"  • {kind}: {count}")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_project_entities())
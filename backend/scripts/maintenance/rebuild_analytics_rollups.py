@@ -0,0 +1,122 @@
+"""
+Rebuild the analytics_daily and analytics_hourly rollups from raw analytics events.
+
+The range is split into chunks of --chunk-days days that are aggregated in
+parallel (--concurrency at a time). Each chunk's rollup rows are replaced
+wholesale, so the script is safe to re-run. Counts for a day that is still
+receiving events can miss increments that land mid-rebuild; rebuild closed
+days, or re-run today's chunk afterwards.
+
+Usage:
+    cd /app/backend
+    python scripts/maintenance/rebuild_analytics_rollups.py --start 2025-01-01 [--end 2025-06-30]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from collections import Counter
+
+from database import (
+    analytics_collection, analytics_daily_collection, analytics_hourly_collection, ANALYTICS_RETENTION_DAYS
+)
+from utils.analytics_rollups import DAY_FORMAT, HOUR_FORMAT
+
+async def rebuild_chunk(start: datetime, end: datetime) -> int:
+    """Recompute daily and hourly rollups for [start, end) from one scan and swap them in"""
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {
+                "hour": {"$dateToString": {"format": HOUR_FORMAT, "date": "$timestamp"}},
+                # Events migrated to the time-series layout keep these under meta
+                "event_type": {"$ifNull": ["$meta.event_type", "$event_type"]},
+                "page_name": {"$ifNull": ["$meta.page_name", "$page_name"]},
+                "blog_id": "$blog_id"
+            },
+            "count": {"$sum": 1},
+            "blog_title": {"$last": "$blog_title"}
+        }}
+    ]
+    rows = await analytics_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+    daily = Counter()
+    hourly = Counter()
+    titles = {}
+    for row in rows:
+        key = row["_id"]
+        hour, event_type, page_name, blog_id = key["hour"], key["event_type"], key.get("page_name"), key.get("blog_id")
+        day = hour[:10]
+        daily[(day, event_type, page_name, blog_id)] += row["count"]
+        hourly[(hour, event_type, page_name)] += row["count"]
+        if row.get("blog_title"):
+            titles[(day, event_type, page_name, blog_id)] = row["blog_title"]
+
+    daily_docs = []
+    for (day, event_type, page_name, blog_id), count in daily.items():
+        doc = {"day": day, "event_type": event_type, "page_name": page_name, "blog_id": blog_id, "count": count}
+        if (day, event_type, page_name, blog_id) in titles:
+            doc["blog_title"] = titles[(day, event_type, page_name, blog_id)]
+        daily_docs.append(doc)
+    hourly_docs = [
+        {"hour": hour, "event_type": event_type, "page_name": page_name, "count": count}
+        for (hour, event_type, page_name), count in hourly.items()
+    ]
+
+    await asyncio.gather(
+        analytics_daily_collection.delete_many({
+            "day": {"$gte": start.strftime(DAY_FORMAT), "$lt": end.strftime(DAY_FORMAT)}
+        }),
+        analytics_hourly_collection.delete_many({
+            "hour": {"$gte": start.strftime(HOUR_FORMAT), "$lt": end.strftime(HOUR_FORMAT)}
+        })
+    )
+    if daily_docs:
+        await analytics_daily_collection.insert_many(daily_docs, ordered=False)
+    if hourly_docs:
+        await analytics_hourly_collection.insert_many(hourly_docs, ordered=False)
+    print(f"  • {start:%Y-%m-%d} .. {end - timedelta(days=1):%Y-%m-%d}: "
+          f"{len(daily_docs)} daily / {len(hourly_docs)} hourly rows")
+    return len(daily_docs) + len(hourly_docs)
+
+async def rebuild_rollups(start: datetime, end: datetime, chunk_days: int, concurrency: int):
+    print(f"🔧 Rebuilding analytics rollups {start:%Y-%m-%d} .. {end - timedelta(days=1):%Y-%m-%d}...")
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(chunk_start: datetime):
+        async with slots:
+            return await rebuild_chunk(chunk_start, min(chunk_start + timedelta(days=chunk_days), end))
+
+    chunk_starts = []
+    cursor = start
+    while cursor < end:
+        chunk_starts.append(cursor)
+        cursor += timedelta(days=chunk_days)
+
+    counts = await asyncio.gather(*(run(chunk_start) for chunk_start in chunk_starts))
+    print(f"\n✅ Rebuilt {len(chunk_starts)} chunks, {sum(counts)} rollup rows")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from raw events")
+    parser.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", help="last day, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    last_day = datetime.strptime(args.end, "%Y-%m-%d") if args.end else datetime.utcnow()
+    end = datetime(last_day.year, last_day.month, last_day.day) + timedelta(days=1)
+
+    if ANALYTICS_RETENTION_DAYS > 0:
+        # Raw events older than the retention window are gone; rebuilding those
+        # days would wipe rollups that can no longer be recomputed
+        horizon = datetime.utcnow() - timedelta(days=ANALYTICS_RETENTION_DAYS - 1)
+        horizon = datetime(horizon.year, horizon.month, horizon.day)
+        if start < horizon:
+            print(f"⚠️ Raw events before {horizon:%Y-%m-%d} have expired; starting there instead")
+            start = horizon
+    await rebuild_rollups(start, end, args.chunk_days, args.concurrency)
+
+if __name__ == "__main__":
+    asyncio.run(main())
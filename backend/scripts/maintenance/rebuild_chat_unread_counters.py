@@ -0,0 +1,42 @@
+"""
+Recount the per-project chat_unread counters from the chat messages themselves.
+
+Projects created before the counters existed have none, and a counter can
+drift if a message lands while its side is being marked read. Safe to re-run;
+a message sent while a project is being recounted may be left out until the
+next read resets the counter or the script runs again.
+
+Usage:
+    cd /app/backend
+    python scripts/maintenance/rebuild_chat_unread_counters.py
+"""
+import asyncio
+
+from database import client_projects_collection
+from utils.project_entities import count_unread_chat_messages
+
+SIDES = ("client", "admin")
+
+async def rebuild_project(project_id: str) -> dict:
+    """Recount and store both counters for one project"""
+    counts = await asyncio.gather(*(count_unread_chat_messages(project_id, side) for side in SIDES))
+    chat_unread = dict(zip(SIDES, counts))
+    await client_projects_collection.update_one({"id": project_id}, {"$set": {"chat_unread": chat_unread}})
+    return chat_unread
+
+async def rebuild_chat_unread_counters():
+    print("🔧 Rebuilding project chat unread counters...")
+
+    total_projects = 0
+    cursor = client_projects_collection.find({}, {"_id": 0, "id": 1, "name": 1})
+    async for project in cursor:
+        chat_unread = await rebuild_project(project["id"])
+        total_projects += 1
+        if any(chat_unread.values()):
+            print(f"  • {project.get('name', project['id'])}: "
+                  f"{chat_unread['client']} unread by admins, {chat_unread['admin']} unread by the client")
+
+    print(f"\n✅ Rebuilt counters for {total_projects} projects")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_chat_unread_counters())
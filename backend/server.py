@@ -40,6 +40,12 @@ from routes.client_projects import router as client_projects_router
 from routes.bookings import router as bookings_router
 from routes.booking_settings import router as booking_settings_router
 
+# Realtime push (WebSocket / SSE)
+from routes.realtime import router as realtime_router
+
+# Aggregated public page data
+from routes.public import router as public_router
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -95,6 +101,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -------------------------------------------------------------------
+# ETag / 304 / Cache-Control for endpoints marked @public_cache
+# -------------------------------------------------------------------
+from utils.http_cache import ConditionalGetMiddleware
+
+app.add_middleware(ConditionalGetMiddleware)
+
 # -------------------------------------------------------------------
 # Routers
 # -------------------------------------------------------------------
@@ -137,6 +150,9 @@ api_router.include_router(bookings_router)
 api_router.include_router(booking_settings_router)
 api_router.include_router(feelings_services_router)
 
+api_router.include_router(realtime_router)
+api_router.include_router(public_router)
+
 app.include_router(api_router)
 
 # -------------------------------------------------------------------
@@ -144,12 +160,35 @@ app.include_router(api_router)
 # -------------------------------------------------------------------
 @app.on_event("startup")
 async def startup_event():
+    try:
+        from database import ensure_timeseries_collections
+        await ensure_timeseries_collections()
+    except Exception as e:
+        logger.warning(f"Time-series collection setup failed: {e}")
+
+    try:
+        from database import ensure_indexes
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Index reconciliation failed: {e}")
+
+    from utils.email_outbox import start_email_outbox
+    from utils.analytics_ingest import start_analytics_buffer
+    from utils.realtime import start_realtime
+    from utils.cache_versions import start_cache_versions
+    from utils.public_snapshot import start_public_snapshot
+    start_email_outbox()
+    start_analytics_buffer()
+    start_realtime()
+    start_cache_versions()
+    start_public_snapshot()
+
     try:
         from auto_init import auto_initialize_database
         await auto_initialize_database()
 
         from database import admins_collection
-        from auth.password import hash_password
+        from auth.password import hash_password_async
         import uuid
         from datetime import datetime
 
@@ -161,7 +200,7 @@ async def startup_event():
             admin_user = {
                 "id": str(uuid.uuid4()),
                 "username": "maneesh",
-                "password_hash": hash_password("maneesh123"),
+                "password_hash": await hash_password_async("maneesh123"),
                 "role": "super_admin",
                 "permissions": {"canManageAdmins": True},
                 "created_at": datetime.utcnow().isoformat(),
@@ -183,4 +222,16 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    from auth.password import shutdown_password_hasher
+    from utils.email_outbox import stop_email_outbox
+    from utils.analytics_ingest import stop_analytics_buffer
+    from utils.realtime import stop_realtime
+    from utils.cache_versions import stop_cache_versions
+    from utils.public_snapshot import stop_public_snapshot
+    await stop_public_snapshot()
+    await stop_cache_versions()
+    await stop_realtime()
+    await stop_analytics_buffer()
+    await stop_email_outbox()
+    shutdown_password_hasher()
     await close_db_connection()
@@ -1,3 +1,3 @@
-from .helpers import create_slug, serialize_document
+from .helpers import create_slug, serialize_document, encode_cursor, decode_cursor
 
-__all__ = ['create_slug', 'serialize_document']
+__all__ = ['create_slug', 'serialize_document', 'encode_cursor', 'decode_cursor']
@@ -0,0 +1,124 @@
+"""
+Incremental conversion funnel.
+
+FUNNEL_STEPS are tracked per browser session. analytics_funnel_sessions holds
+each session's landing page, start day and the furthest step reached; a
+session advances only from the step directly before, with one conditional
+update, so concurrent workers can't double count. Every advance bumps
+analytics_funnel_daily for the session's start day and landing page, which is
+all the funnel endpoint reads. Idle sessions expire after
+FUNNEL_SESSION_TTL_HOURS (database.py) via a TTL index.
+"""
+import asyncio
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from database import analytics_funnel_sessions_collection, analytics_funnel_daily_collection
+from utils.analytics_rollups import day_of
+
+FUNNEL_STEPS = ["page_view", "calculator_opened", "calculator_estimate", "contact_submission"]
+
+# Landing page recorded for sessions whose first page view had no page name
+UNKNOWN_PAGE = "unknown"
+
+async def _start_session(session_id: str, event: Dict):
+    """Open the session on its first page view. Returns (landing_page, day) if it was new."""
+    landing = (event.get("page_name") or UNKNOWN_PAGE, day_of(event["timestamp"]))
+    try:
+        result = await analytics_funnel_sessions_collection.update_one(
+            {"session_id": session_id},
+            {
+                "$setOnInsert": {"landing_page": landing[0], "day": landing[1], "step": 0},
+                "$set": {"updated_at": event["timestamp"]}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return None
+    return landing if result.upserted_id is not None else None
+
+async def _advance_session(session_id: str, step: int, event: Dict):
+    """Move the session from step-1 to step. Returns (landing_page, day) if it advanced."""
+    session = await analytics_funnel_sessions_collection.find_one_and_update(
+        {"session_id": session_id, "step": step - 1},
+        {"$set": {"step": step, "updated_at": event["timestamp"]}},
+        projection={"landing_page": 1, "day": 1}
+    )
+    return (session["landing_page"], session["day"]) if session else None
+
+async def _apply_session(session_id: str, events: List[Dict], counts: Counter):
+    # A session's events are applied in arrival order
+    for event in events:
+        step = FUNNEL_STEPS.index(event["event_type"])
+        if step == 0:
+            landing = await _start_session(session_id, event)
+        else:
+            landing = await _advance_session(session_id, step, event)
+        if landing:
+            landing_page, day = landing
+            counts[(day, landing_page, FUNNEL_STEPS[step])] += 1
+
+async def apply_funnel(events: List[Dict]):
+    """Advance funnel sessions for a batch of raw events and bump the daily counters"""
+    by_session: Dict[str, List[Dict]] = defaultdict(list)
+    for event in events:
+        session_id = event.get("session_id") or event.get("visitor_id")
+        if session_id and event["event_type"] in FUNNEL_STEPS:
+            by_session[session_id].append(event)
+    if not by_session:
+        return
+
+    counts: Counter = Counter()
+    await asyncio.gather(*(
+        _apply_session(session_id, session_events, counts)
+        for session_id, session_events in by_session.items()
+    ))
+
+    operations = [
+        UpdateOne(
+            {"day": day, "landing_page": landing_page},
+            {"$inc": {f"steps.{step}": count}},
+            upsert=True
+        )
+        for (day, landing_page, step), count in counts.items()
+    ]
+    if operations:
+        await analytics_funnel_daily_collection.bulk_write(operations, ordered=False)
+
+def _steps(counts: Counter) -> List[Dict]:
+    steps = []
+    first = counts[FUNNEL_STEPS[0]]
+    previous = None
+    for event_type in FUNNEL_STEPS:
+        count = counts[event_type]
+        steps.append({
+            "event_type": event_type,
+            "sessions": count,
+            "step_conversion": round(count / previous, 4) if previous else None,
+            "overall_conversion": round(count / first, 4) if first else 0.0
+        })
+        previous = count
+    return steps
+
+async def load_funnel(start_day: str, end_day: str) -> Tuple[List[Dict], List[Dict]]:
+    """Funnel steps for sessions started in an inclusive day range: (overall, per landing page)"""
+    rows = await analytics_funnel_daily_collection.find(
+        {"day": {"$gte": start_day, "$lte": end_day}},
+        {"_id": 0}
+    ).to_list(length=None)
+
+    overall: Counter = Counter()
+    by_page: Dict[str, Counter] = defaultdict(Counter)
+    for row in rows:
+        for event_type, count in row.get("steps", {}).items():
+            overall[event_type] += count
+            by_page[row["landing_page"]][event_type] += count
+
+    breakdown = [
+        {"landing_page": landing_page, "steps": _steps(counts)}
+        for landing_page, counts in sorted(by_page.items(), key=lambda item: -item[1][FUNNEL_STEPS[0]])
+    ]
+    return _steps(overall), breakdown
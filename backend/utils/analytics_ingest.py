@@ -0,0 +1,171 @@
+"""
+Buffered ingestion for analytics events.
+
+POST /analytics/event used to await one insert_one per page view. Events are
+now appended to an in-process buffer and returned immediately; a background
+task writes them with unordered insert_many every ANALYTICS_FLUSH_EVENTS
+events or ANALYTICS_FLUSH_INTERVAL_MS milliseconds, whichever comes first.
+
+If Mongo falls behind, the buffer grows up to ANALYTICS_MAX_BUFFERED events
+and then sheds load according to ANALYTICS_DROP_POLICY:
+- drop_newest (default) refuse incoming events, keeping what is queued
+- drop_oldest evict the oldest queued events to make room
+Analytics are best effort, so dropping is preferred over slowing the site.
+Whatever is buffered is flushed when the app shuts down.
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from database import analytics_collection
+from utils.analytics_rollups import apply_rollups
+from utils.analytics_visitors import apply_visitor_sketches
+from utils.analytics_funnel import apply_funnel
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_FLUSH_EVENTS = int(os.environ.get('ANALYTICS_FLUSH_EVENTS', 500))
+ANALYTICS_FLUSH_INTERVAL_MS = int(os.environ.get('ANALYTICS_FLUSH_INTERVAL_MS', 1000))
+ANALYTICS_MAX_BUFFERED = int(os.environ.get('ANALYTICS_MAX_BUFFERED', 50000))
+ANALYTICS_DROP_POLICY = os.environ.get('ANALYTICS_DROP_POLICY', 'drop_newest')
+
+def to_stored_event(event: Dict) -> Dict:
+    """
+    Shape a buffered event for the analytics time-series collection: the
+    fields events are grouped and filtered by go in the metaField.
+    """
+    stored = {key: value for key, value in event.items() if key not in ("event_type", "page_name")}
+    stored["meta"] = {"event_type": event["event_type"], "page_name": event.get("page_name")}
+    return stored
+
+async def write_event_batch(events: List[Dict]) -> int:
+    """
+    Persist one batch of raw events, then fold the events that were actually
+    stored into the daily rollups. Returns how many were stored.
+    """
+    try:
+        await analytics_collection.insert_many([to_stored_event(event) for event in events], ordered=False)
+    except BulkWriteError as e:
+        # Unordered insert: everything but the reported failures went in
+        rejected = {error["index"] for error in e.details.get("writeErrors", [])}
+        events = [event for index, event in enumerate(events) if index not in rejected]
+        if not events:
+            return 0
+
+    await asyncio.gather(
+        apply_rollups(events),
+        apply_visitor_sketches(events),
+        apply_funnel(events)
+    )
+    return len(events)
+
+class AnalyticsBuffer:
+    """Bounded in-memory queue of events drained by a single flusher task"""
+
+    def __init__(
+        self,
+        flush_events: int = ANALYTICS_FLUSH_EVENTS,
+        flush_interval_ms: int = ANALYTICS_FLUSH_INTERVAL_MS,
+        max_buffered: int = ANALYTICS_MAX_BUFFERED,
+        drop_policy: str = ANALYTICS_DROP_POLICY
+    ):
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffered = max_buffered
+        self.drop_policy = drop_policy
+        self._events = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, events: List[Dict]) -> int:
+        """Queue events without waiting on Mongo. Returns how many were accepted."""
+        overflow = len(self._events) + len(events) - self.max_buffered
+        if overflow > 0:
+            if self.drop_policy == "drop_oldest":
+                evicted = min(overflow, len(self._events))
+                for _ in range(evicted):
+                    self._events.popleft()
+                # A batch bigger than the whole buffer keeps only its newest events
+                events = events[overflow - evicted:]
+            else:
+                events = events[:len(events) - overflow]
+            self.dropped += overflow
+
+        self._events.extend(events)
+        self.accepted += len(events)
+        if len(self._events) >= self.flush_events:
+            self._wakeup.set()
+        return len(events)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        while self._events:
+            await self._flush_once()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            # Drain in full batches while a backlog remains, then go back to waiting
+            while self._events and not self._stopping:
+                await self._flush_once()
+                if len(self._events) < self.flush_events:
+                    break
+
+    async def _flush_once(self):
+        batch = [self._events.popleft() for _ in range(min(self.flush_events, len(self._events)))]
+        if not batch:
+            return
+        try:
+            stored = await write_event_batch(batch)
+            self.written += stored
+            if stored < len(batch):
+                self.failed += len(batch) - stored
+                logger.warning(f"Analytics flush stored {stored} of {len(batch)} events")
+        except Exception as e:
+            # Best effort: a failed batch is dropped rather than retried into a struggling server
+            self.failed += len(batch)
+            logger.warning(f"Analytics flush of {len(batch)} events failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "buffered": len(self._events),
+            "max_buffered": self.max_buffered,
+            "drop_policy": self.drop_policy,
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed
+        }
+
+analytics_buffer = AnalyticsBuffer()
+
+def start_analytics_buffer():
+    """Start the flusher (called from app startup)"""
+    analytics_buffer.start()
+
+async def stop_analytics_buffer():
+    """Flush and stop (called from app shutdown)"""
+    await analytics_buffer.stop()
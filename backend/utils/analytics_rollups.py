@@ -0,0 +1,108 @@
+"""
+Analytics rollups.
+
+Every flushed batch of raw events also bumps counters in two collections, so
+dashboard reads scan small pre-aggregated rows instead of every raw event:
+- analytics_daily: one document per (day, event_type, page_name, blog_id),
+  day formatted YYYY-MM-DD (UTC); backs the summary
+- analytics_hourly: one document per (hour, event_type, page_name), hour
+  formatted YYYY-MM-DDTHH (UTC); backs hourly time series
+scripts/maintenance/rebuild_analytics_rollups.py recomputes both from raw events.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from database import analytics_daily_collection, analytics_hourly_collection
+
+DAY_FORMAT = "%Y-%m-%d"
+HOUR_FORMAT = "%Y-%m-%dT%H"
+
+RollupKey = Tuple[str, str, str, str]
+HourlyKey = Tuple[str, str, str]
+
+def day_of(timestamp: datetime) -> str:
+    return timestamp.strftime(DAY_FORMAT)
+
+def hour_of(timestamp: datetime) -> str:
+    return timestamp.strftime(HOUR_FORMAT)
+
+def rollup_key(event: Dict) -> RollupKey:
+    return (day_of(event["timestamp"]), event["event_type"], event.get("page_name"), event.get("blog_id"))
+
+def hourly_key(event: Dict) -> HourlyKey:
+    return (hour_of(event["timestamp"]), event["event_type"], event.get("page_name"))
+
+def _key_filter(key: RollupKey) -> Dict:
+    day, event_type, page_name, blog_id = key
+    return {"day": day, "event_type": event_type, "page_name": page_name, "blog_id": blog_id}
+
+async def _apply_daily(events: List[Dict]):
+    counts = Counter(rollup_key(event) for event in events)
+    titles = {rollup_key(event): event["blog_title"] for event in events if event.get("blog_title")}
+
+    operations = []
+    for key, count in counts.items():
+        update = {"$inc": {"count": count}}
+        if key in titles:
+            update["$set"] = {"blog_title": titles[key]}
+        operations.append(UpdateOne(_key_filter(key), update, upsert=True))
+
+    if operations:
+        await analytics_daily_collection.bulk_write(operations, ordered=False)
+
+async def _apply_hourly(events: List[Dict]):
+    counts = Counter(hourly_key(event) for event in events)
+    operations = [
+        UpdateOne(
+            {"hour": hour, "event_type": event_type, "page_name": page_name},
+            {"$inc": {"count": count}},
+            upsert=True
+        )
+        for (hour, event_type, page_name), count in counts.items()
+    ]
+    if operations:
+        await analytics_hourly_collection.bulk_write(operations, ordered=False)
+
+async def apply_rollups(events: List[Dict]):
+    """Fold a batch of raw events into the daily and hourly counters"""
+    await asyncio.gather(_apply_daily(events), _apply_hourly(events))
+
+async def load_rollups(start_day: str, end_day: str) -> List[Dict]:
+    """Daily rollup rows for an inclusive range of days"""
+    return await analytics_daily_collection.find(
+        {"day": {"$gte": start_day, "$lte": end_day}},
+        {"_id": 0}
+    ).to_list(length=None)
+
+async def load_counts(
+    start: datetime,
+    end: datetime,
+    hourly: bool,
+    event_types: Optional[List[str]] = None,
+    page_name: Optional[str] = None
+) -> List[Dict]:
+    """
+    (period, event_type, page_name, count) rows for an inclusive range, from the
+    hourly or the daily rollups. Daily rows are summed over blog_id.
+    """
+    field, fmt = ("hour", HOUR_FORMAT) if hourly else ("day", DAY_FORMAT)
+    match = {field: {"$gte": start.strftime(fmt), "$lte": end.strftime(fmt)}}
+    if event_types:
+        match["event_type"] = {"$in": event_types}
+    if page_name:
+        match["page_name"] = page_name
+
+    collection = analytics_hourly_collection if hourly else analytics_daily_collection
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"period": f"${field}", "event_type": "$event_type", "page_name": "$page_name"},
+            "count": {"$sum": "$count"}
+        }}
+    ]
+    rows = await collection.aggregate(pipeline).to_list(length=None)
+    return [{**row["_id"], "count": row["count"]} for row in rows]
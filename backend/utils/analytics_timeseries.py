@@ -0,0 +1,69 @@
+"""
+Zero-filled analytics time series built from rollup rows with pandas.
+
+Rows come from utils.analytics_rollups.load_counts (hourly rows for hour
+granularity, daily rows otherwise). They are floored to the requested bucket,
+pivoted into one column per (event_type, page_name) and reindexed onto the
+full bucket range, so every series has a value for every bucket.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+# Granularity -> pandas frequency of the bucket range
+GRANULARITY_FREQ = {
+    "hour": "h",
+    "day": "D",
+    "week": "W-MON",
+    "month": "MS",
+}
+
+def floor_to_bucket(values: pd.Series, granularity: str) -> pd.Series:
+    """Start of the bucket containing each timestamp (weeks start on Monday)"""
+    if granularity == "hour":
+        return values.dt.floor("h")
+    if granularity == "day":
+        return values.dt.floor("D")
+    if granularity == "week":
+        days = values.dt.floor("D")
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    return values.dt.to_period("M").dt.start_time
+
+def bucket_range(start: datetime, end: datetime, granularity: str) -> pd.DatetimeIndex:
+    """Every bucket start from the one containing `start` to the one containing `end`"""
+    bounds = floor_to_bucket(pd.Series(pd.to_datetime([start, end])), granularity)
+    return pd.date_range(bounds.iloc[0], bounds.iloc[1], freq=GRANULARITY_FREQ[granularity])
+
+def build_time_series(rows: List[Dict], start: datetime, end: datetime, granularity: str) -> Dict:
+    """Bucket rollup rows into zero-filled series per (event_type, page_name)"""
+    buckets = bucket_range(start, end, granularity)
+    response = {"buckets": [bucket.isoformat() for bucket in buckets], "series": []}
+    if not rows:
+        return response
+
+    frame = pd.DataFrame(rows)
+    period_format = "%Y-%m-%dT%H" if granularity == "hour" else "%Y-%m-%d"
+    frame["bucket"] = floor_to_bucket(pd.to_datetime(frame["period"], format=period_format), granularity)
+    # pivot_table drops NaN keys, so events without a page get an empty-string page
+    frame["page_name"] = frame["page_name"].fillna("")
+
+    table = frame.pivot_table(
+        index="bucket",
+        columns=["event_type", "page_name"],
+        values="count",
+        aggfunc="sum",
+        fill_value=0
+    ).reindex(buckets, fill_value=0)
+
+    values = table.to_numpy(dtype="int64")
+    totals = values.sum(axis=0)
+    for position, (event_type, page_name) in enumerate(table.columns):
+        response["series"].append({
+            "event_type": event_type,
+            "page_name": page_name or None,
+            "total": int(totals[position]),
+            "values": values[:, position].tolist()
+        })
+    response["series"].sort(key=lambda series: series["total"], reverse=True)
+    return response
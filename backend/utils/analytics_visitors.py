@@ -0,0 +1,85 @@
+"""
+Unique-visitor sketches.
+
+Each flushed batch folds the anonymous visitor ids it contains into one
+HyperLogLog sketch per (day, page_name), plus a site-wide sketch per day
+stored under page_name SITE_WIDE. Sketches are 4 KB binary registers in
+analytics_visitors; merging them over any period gives a distinct-visitor
+estimate in constant memory with ~1.6% standard error (see utils/hyperloglog.py).
+
+Mongo has no element-wise max for binary fields, so sketch updates are a
+read-merge-write guarded by a version number and retried on conflict.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from bson import Binary
+from pymongo.errors import DuplicateKeyError
+
+from database import analytics_visitors_collection
+from utils.analytics_rollups import day_of
+from utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+SITE_WIDE = "__all__"
+MAX_UPDATE_ATTEMPTS = 5
+
+async def _merge_sketch(day: str, page_name: str, sketch: HyperLogLog):
+    key = {"day": day, "page_name": page_name}
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        stored = await analytics_visitors_collection.find_one(key, {"registers": 1, "version": 1})
+        if stored is None:
+            try:
+                await analytics_visitors_collection.insert_one({
+                    **key, "registers": Binary(sketch.to_bytes()), "version": 1
+                })
+                return
+            except DuplicateKeyError:
+                continue
+
+        merged = HyperLogLog.from_bytes(stored["registers"]).merge(sketch)
+        result = await analytics_visitors_collection.update_one(
+            {**key, "version": stored["version"]},
+            {"$set": {"registers": Binary(merged.to_bytes())}, "$inc": {"version": 1}}
+        )
+        if result.modified_count:
+            return
+
+    logger.warning(f"Gave up merging visitor sketch {day}/{page_name} after {MAX_UPDATE_ATTEMPTS} conflicts")
+
+async def apply_visitor_sketches(events: List[Dict]):
+    """Fold the visitor ids of a batch of raw events into the daily sketches"""
+    sketches: Dict[Tuple[str, str], HyperLogLog] = defaultdict(HyperLogLog)
+    for event in events:
+        visitor_id = event.get("visitor_id")
+        if not visitor_id:
+            continue
+        day = day_of(event["timestamp"])
+        sketches[(day, SITE_WIDE)].add(visitor_id)
+        if event.get("page_name"):
+            sketches[(day, event["page_name"])].add(visitor_id)
+
+    await asyncio.gather(*(
+        _merge_sketch(day, page_name, sketch) for (day, page_name), sketch in sketches.items()
+    ))
+
+async def count_unique_visitors(start_day: str, end_day: str) -> Tuple[int, Dict[str, int]]:
+    """Estimated distinct visitors over an inclusive day range: (site-wide, per page)"""
+    merged: Dict[str, HyperLogLog] = {}
+    cursor = analytics_visitors_collection.find(
+        {"day": {"$gte": start_day, "$lte": end_day}},
+        {"_id": 0, "page_name": 1, "registers": 1}
+    )
+    async for doc in cursor:
+        sketch = HyperLogLog.from_bytes(doc["registers"])
+        existing: Optional[HyperLogLog] = merged.get(doc["page_name"])
+        merged[doc["page_name"]] = existing.merge(sketch) if existing else sketch
+
+    site_wide = merged.pop(SITE_WIDE, None)
+    return (
+        site_wide.count() if site_wide else 0,
+        {page_name: sketch.count() for page_name, sketch in merged.items()}
+    )
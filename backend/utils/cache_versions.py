@@ -0,0 +1,173 @@
+"""
+Cross-worker coherence for the in-process caches.
+
+Each worker keeps its own copy of cached principals (auth.principal_cache) and
+content documents (utils.singleton_cache). When a write invalidates an entry,
+the worker that handled it drops its copy and bumps that entry's version in the
+cache_versions collection ({_id: "<namespace>:<key>", version, updated_at}).
+Every worker follows the collection in the background and drops its copy of
+anything whose version moved, so requests never have to check with Mongo
+before serving from memory.
+
+CACHE_COHERENCE picks how versions are followed:
+- auto (default)   change stream, falling back to polling every
+                   CACHE_VERSION_POLL_SECONDS when the server has no change
+                   streams (standalone mongod)
+- poll             always poll
+- off              single worker, nothing is shared
+
+A bump reaches the other workers within one poll interval (or right away over
+a change stream). If the watcher is down, the caches' own TTLs still bound how
+stale an entry can get.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+
+from database import cache_versions_collection
+
+logger = logging.getLogger(__name__)
+
+CACHE_COHERENCE = os.environ.get('CACHE_COHERENCE', 'auto')
+CACHE_VERSION_POLL_SECONDS = float(os.environ.get('CACHE_VERSION_POLL_SECONDS', 2))
+# Re-read this far back on every poll so clock skew between workers can't hide bumps
+POLL_LOOKBACK_SECONDS = 5
+RESTART_DELAY_SECONDS = 5
+
+class CacheVersions:
+    """Tracks entry versions and drops local copies when another worker bumps them"""
+
+    def __init__(self, collection=cache_versions_collection, mode: str = CACHE_COHERENCE,
+                 interval: float = CACHE_VERSION_POLL_SECONDS):
+        self.collection = collection
+        self.mode = mode
+        self.interval = interval
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._known: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.following = "off"
+        self.bumps = 0
+        self.remote_invalidations = 0
+
+    def register(self, namespace: str, invalidate: Callable[[str], None]):
+        """Call `invalidate(key)` when another worker bumps "<namespace>:<key>" """
+        self._handlers[namespace] = invalidate
+
+    async def bump(self, namespace: str, key: str):
+        """Tell the other workers to drop `key`; the caller has already dropped its own copy"""
+        if self.mode == "off":
+            return
+        name = f"{namespace}:{key}"
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": name},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            # Our own bump needs no second invalidation when the watcher sees it
+            self._known[name] = max(self._known.get(name, 0), doc["version"])
+            self.bumps += 1
+        except Exception as e:
+            # The write itself went through; other workers catch up when their entry expires
+            logger.warning(f"Cache version bump failed for {name}: {e}")
+
+    def _apply(self, doc: Dict):
+        name, version = doc["_id"], doc.get("version", 0)
+        if version <= self._known.get(name, 0):
+            return
+        self._known[name] = version
+        namespace, _, key = name.partition(":")
+        handler = self._handlers.get(namespace)
+        if handler is not None:
+            handler(key)
+            self.remote_invalidations += 1
+
+    async def _sync(self, since: Optional[datetime] = None):
+        query = {"updated_at": {"$gte": since - timedelta(seconds=POLL_LOOKBACK_SECONDS)}} if since else {}
+        # Oldest first, so a cache built from another (e.g. the home bundle from
+        # content) is dropped after what it reads from
+        async for doc in self.collection.find(query, {"_id": 1, "version": 1}).sort("updated_at", 1):
+            self._apply(doc)
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        async with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+            self.following = "change_stream"
+            # Anything bumped between the last sync and the stream opening
+            await self._sync()
+            async for change in stream:
+                if change.get("fullDocument"):
+                    self._apply(change["fullDocument"])
+
+    async def _poll(self):
+        self.following = "polling"
+        since = datetime.utcnow()
+        while True:
+            await asyncio.sleep(self.interval)
+            polled_at = datetime.utcnow()
+            await self._sync(since)
+            since = polled_at
+
+    async def _run(self):
+        use_change_stream = self.mode == "auto"
+        while True:
+            try:
+                # A fresh process has nothing cached, and after a restart this
+                # catches bumps missed while the watcher was down
+                await self._sync()
+                if use_change_stream:
+                    try:
+                        await self._watch()
+                    except OperationFailure as e:
+                        logger.info(f"Change streams unavailable ({e}), polling cache versions instead")
+                        use_change_stream = False
+                        continue
+                else:
+                    await self._poll()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.following = "off"
+                logger.error(f"Cache version watcher error, restarting: {e}")
+                await asyncio.sleep(RESTART_DELAY_SECONDS)
+
+    def start(self):
+        if self.mode != "off" and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.following = "off"
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "following": self.following,
+            "poll_seconds": self.interval,
+            "tracked_entries": len(self._known),
+            "bumps": self.bumps,
+            "remote_invalidations": self.remote_invalidations,
+        }
+
+cache_versions = CacheVersions()
+
+def start_cache_versions():
+    """Start following other workers' invalidations (called from app startup)"""
+    cache_versions.start()
+
+async def stop_cache_versions():
+    """Stop the watcher (called from app shutdown)"""
+    await cache_versions.stop()
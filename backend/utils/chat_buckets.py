@@ -0,0 +1,184 @@
+"""
+Bucketed storage for public chat messages.
+
+Conversations used to embed every message in one `messages` array that grew
+without bound and was rewritten whole on every read receipt. Messages now live
+in chat_message_buckets, at most BUCKET_SIZE per document, keyed by
+(conversation_id, seq) with seq increasing towards the newest bucket. The
+conversation document keeps `bucket_seq`, the newest bucket it knows of, so an
+append only touches the tail bucket.
+
+Conversations not yet moved by scripts/maintenance/migrate_chat_buckets.py
+still carry a legacy embedded array; it is read as the oldest messages. The
+migration stores those in negative seqs so they sort before anything appended
+since.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import conversations_collection, chat_message_buckets_collection
+
+BUCKET_SIZE = 100
+# Characters of the last message kept on the conversation for the inbox
+PREVIEW_LENGTH = 140
+
+async def append_message(conversation_id: str, message: Dict, tail_seq: int = 0) -> int:
+    """
+    Push a message into the tail bucket, opening the next bucket when it is
+    full. `tail_seq` is a hint (the conversation's bucket_seq); returns the seq
+    the message landed in.
+    """
+    seq = tail_seq
+    while True:
+        try:
+            await chat_message_buckets_collection.update_one(
+                {"conversation_id": conversation_id, "seq": seq, "count": {"$lt": BUCKET_SIZE}},
+                {
+                    "$push": {"messages": message},
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {"first_at": message["timestamp"]},
+                    "$set": {"last_at": message["timestamp"]}
+                },
+                upsert=True
+            )
+            return seq
+        except DuplicateKeyError:
+            # The bucket exists: either it is full, or a concurrent append just opened it
+            bucket = await chat_message_buckets_collection.find_one(
+                {"conversation_id": conversation_id, "seq": seq}, {"count": 1}
+            )
+            if bucket is None or bucket["count"] >= BUCKET_SIZE:
+                seq += 1
+
+def message_preview(message: Dict) -> Dict:
+    """Trimmed copy of a message, stored on the conversation as `last_message`"""
+    return {
+        "id": message.get("id"),
+        "sender": message.get("sender"),
+        "message": (message.get("message") or "")[:PREVIEW_LENGTH],
+        "timestamp": message.get("timestamp")
+    }
+
+def _merge(legacy: List[Dict], stored: List[Dict]) -> List[Dict]:
+    """Legacy embedded messages first (they are older), then bucketed ones, deduped by id"""
+    stored_ids = {message.get("id") for message in stored}
+    return [message for message in legacy if message.get("id") not in stored_ids] + stored
+
+async def attach_messages(conversations: List[Dict]) -> List[Dict]:
+    """Fill `messages` on conversation documents in place, in one query for all of them"""
+    by_id = {conversation["id"]: [] for conversation in conversations}
+    cursor = chat_message_buckets_collection.find(
+        {"conversation_id": {"$in": list(by_id)}},
+        {"_id": 0, "conversation_id": 1, "messages": 1}
+    ).sort([("conversation_id", 1), ("seq", 1)])
+    async for bucket in cursor:
+        by_id[bucket["conversation_id"]].extend(bucket["messages"])
+
+    for conversation in conversations:
+        conversation["messages"] = _merge(conversation.get("messages") or [], by_id[conversation["id"]])
+    return conversations
+
+async def load_message_page(conversation: Dict, before: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+    """
+    One bucket of messages, newest first when paging: the tail bucket, or the
+    one just below `before`. Returns (messages oldest-first, cursor for the
+    next older page or None). Legacy embedded messages form the last page.
+    """
+    query = {"conversation_id": conversation["id"]}
+    if before is not None:
+        query["seq"] = {"$lt": before}
+    bucket = await chat_message_buckets_collection.find_one(
+        query, {"_id": 0, "seq": 1, "messages": 1}, sort=[("seq", -1)]
+    )
+    legacy = conversation.get("messages") or []
+    if bucket:
+        older = await chat_message_buckets_collection.find_one(
+            {"conversation_id": conversation["id"], "seq": {"$lt": bucket["seq"]}}, {"_id": 1}
+        )
+        return bucket["messages"], bucket["seq"] if older or legacy else None
+    return legacy, None
+
+async def find_message_timestamp(conversation: Dict, message_id: str) -> Optional[str]:
+    """Timestamp of one message, for use as an after/before cursor"""
+    bucket = await chat_message_buckets_collection.find_one(
+        {"conversation_id": conversation["id"], "messages.id": message_id},
+        {"_id": 0, "messages.$": 1}
+    )
+    if bucket:
+        return bucket["messages"][0]["timestamp"]
+    for message in conversation.get("messages") or []:
+        if message.get("id") == message_id:
+            return message["timestamp"]
+    return None
+
+async def load_messages_since(
+    conversation: Dict,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = 100
+) -> List[Dict]:
+    """
+    Messages newer than `after` (the oldest `limit` of them) or older than
+    `before` (the newest `limit`), oldest first. Only buckets whose time span
+    reaches past the cursor are read.
+    """
+    query = {"conversation_id": conversation["id"]}
+    if after is not None:
+        query["last_at"] = {"$gt": after}
+        order = 1
+        keep = lambda message: message["timestamp"] > after
+    else:
+        query["first_at"] = {"$lt": before}
+        order = -1
+        keep = lambda message: message["timestamp"] < before
+
+    found: List[Dict] = []
+    cursor = chat_message_buckets_collection.find(query, {"_id": 0, "messages": 1}).sort("seq", order)
+    async for bucket in cursor:
+        matching = [message for message in bucket["messages"] if keep(message)]
+        found = found + matching if order == 1 else matching + found
+        if len(found) >= limit:
+            break
+
+    legacy = [message for message in conversation.get("messages") or [] if keep(message)]
+    messages = _merge(legacy, found)
+    return messages[:limit] if after is not None else messages[-limit:]
+
+def _count_unread(doc: Optional[Dict]) -> int:
+    return sum(
+        1 for message in (doc or {}).get("messages") or []
+        if message.get("sender") == "customer" and message.get("read") is not True
+    )
+
+async def _flag_read(collection, query: Dict) -> int:
+    """Flag one document's unread customer messages; returns how many this call flagged"""
+    before = await collection.find_one_and_update(
+        {**query, "messages": {"$elemMatch": {"sender": "customer", "read": {"$ne": True}}}},
+        {"$set": {"messages.$[m].read": True}},
+        array_filters=[{"m.sender": "customer", "m.read": {"$ne": True}}],
+        projection={"_id": 0, "messages.sender": 1, "messages.read": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    return _count_unread(before)
+
+async def mark_customer_messages_read(conversation_id: str) -> int:
+    """
+    Flag unread customer messages as read, touching only buckets that have
+    any. Returns the number flagged by this call, counted from each
+    document's pre-update image, so concurrent calls never count one twice.
+    """
+    unread = {"sender": "customer", "read": {"$ne": True}}
+    buckets = await chat_message_buckets_collection.find(
+        {"conversation_id": conversation_id, "messages": {"$elemMatch": unread}}, {"_id": 1}
+    ).to_list(length=None)
+    flagged = await asyncio.gather(
+        *(_flag_read(chat_message_buckets_collection, {"_id": bucket["_id"]}) for bucket in buckets),
+        _flag_read(conversations_collection, {"id": conversation_id})
+    )
+    return sum(flagged)
+
+async def delete_messages(conversation_id: str):
+    await chat_message_buckets_collection.delete_many({"conversation_id": conversation_id})
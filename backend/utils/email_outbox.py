@@ -0,0 +1,285 @@
+"""
+Durable outbox for outgoing email.
+
+Routes call enqueue_email(), which only inserts a document into email_outbox
+and returns. A background worker started with the app claims due messages,
+sends them through the configured transport, retries failures with
+exponential backoff and moves messages that keep failing to the "dead" status
+for inspection. Claims are leased with find_one_and_update, so several app
+workers can drain the same outbox and a crashed send is retried once its lease
+expires.
+
+EMAIL_TRANSPORT selects where mail goes:
+- brevo  (default) Brevo's HTTP API over a pooled async client
+- file   append each message as a JSON line to EMAIL_OUTBOX_FILE
+- memory keep messages in a list (tests and offline load runs)
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+from pymongo import ReturnDocument
+
+from database import email_outbox_collection
+
+logger = logging.getLogger(__name__)
+
+BREVO_API_KEY = os.environ.get('BREVO_API_KEY', '')
+BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
+
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'brevo')
+EMAIL_OUTBOX_FILE = os.environ.get('EMAIL_OUTBOX_FILE', '/tmp/email_outbox.jsonl')
+EMAIL_SEND_TIMEOUT_SECONDS = float(os.environ.get('EMAIL_SEND_TIMEOUT_SECONDS', 10))
+EMAIL_OUTBOX_CONCURRENCY = int(os.environ.get('EMAIL_OUTBOX_CONCURRENCY', 4))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', 5))
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 30 * 60
+# A claimed message whose sender died is picked up again after this long
+LEASE_SECONDS = 120
+
+class EmailDeliveryError(Exception):
+    """Raised by transports; permanent errors are dead-lettered without retrying"""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+class BrevoTransport:
+    """Brevo transactional email API over one pooled keep-alive client"""
+
+    def __init__(self, api_key: str = BREVO_API_KEY, timeout: float = EMAIL_SEND_TIMEOUT_SECONDS):
+        self.api_key = api_key
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=EMAIL_OUTBOX_CONCURRENCY, max_keepalive_connections=EMAIL_OUTBOX_CONCURRENCY),
+            headers={
+                "accept": "application/json",
+                "api-key": api_key,
+                "content-type": "application/json"
+            }
+        )
+
+    async def send(self, payload: Dict):
+        try:
+            response = await self._client.post(BREVO_API_URL, json=payload)
+        except httpx.HTTPError as e:
+            raise EmailDeliveryError(f"{type(e).__name__}: {e}")
+
+        if response.status_code >= 400:
+            # Rate limits and server errors are worth retrying; other 4xx won't get better
+            permanent = response.status_code < 500 and response.status_code != 429
+            raise EmailDeliveryError(f"Brevo returned {response.status_code}: {response.text[:500]}", permanent)
+
+    async def close(self):
+        await self._client.aclose()
+
+class FileTransport:
+    """Append messages to a JSON-lines file instead of sending them"""
+
+    def __init__(self, path: str = EMAIL_OUTBOX_FILE):
+        self.path = path
+
+    def _append(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def send(self, payload: Dict):
+        await asyncio.to_thread(self._append, json.dumps(payload))
+
+    async def close(self):
+        pass
+
+class MemoryTransport:
+    """Collect messages in memory"""
+
+    def __init__(self):
+        self.sent: List[Dict] = []
+
+    async def send(self, payload: Dict):
+        self.sent.append(payload)
+
+    async def close(self):
+        pass
+
+def get_transport():
+    """Build the transport selected by EMAIL_TRANSPORT"""
+    if EMAIL_TRANSPORT == "file":
+        return FileTransport()
+    if EMAIL_TRANSPORT == "memory":
+        return MemoryTransport()
+    return BrevoTransport()
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+async def enqueue_email(payload: Dict, kind: str) -> Optional[str]:
+    """Queue one Brevo-shaped email payload for delivery. Returns the outbox id."""
+    if EMAIL_TRANSPORT == "brevo" and not BREVO_API_KEY:
+        print("Warning: BREVO_API_KEY not configured. Email not sent.")
+        return None
+
+    now = _now().isoformat()
+    message = {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "payload": payload,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "locked_until": None,
+        "last_error": None,
+        "created_at": now,
+        "sent_at": None
+    }
+    await email_outbox_collection.insert_one(message)
+
+    if _worker is not None:
+        _worker.notify()
+    return message["id"]
+
+async def _claim_next() -> Optional[Dict]:
+    """Lease the oldest due message, or None if nothing is due"""
+    now = _now()
+    return await email_outbox_collection.find_one_and_update(
+        {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now.isoformat()}},
+            {"status": "sending", "locked_until": {"$lte": now.isoformat()}}
+        ]},
+        {
+            "$set": {
+                "status": "sending",
+                "locked_until": (now + timedelta(seconds=LEASE_SECONDS)).isoformat()
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def _record_failure(message: Dict, error: str, permanent: bool):
+    attempts = message["attempts"]
+    if permanent or attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+        await email_outbox_collection.update_one(
+            {"id": message["id"]},
+            {"$set": {"status": "dead", "locked_until": None, "last_error": error}}
+        )
+        logger.error(f"❌ Email {message['id']} ({message['kind']}) dead-lettered after {attempts} attempts: {error}")
+        return
+
+    # Full backoff window doubles per attempt; jitter spreads retries after an outage
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS) * random.uniform(0.5, 1.0)
+    await email_outbox_collection.update_one(
+        {"id": message["id"]},
+        {"$set": {
+            "status": "pending",
+            "locked_until": None,
+            "last_error": error,
+            "next_attempt_at": (_now() + timedelta(seconds=delay)).isoformat()
+        }}
+    )
+    logger.warning(f"⚠️ Email {message['id']} ({message['kind']}) attempt {attempts} failed, retrying in {delay:.0f}s: {error}")
+
+class EmailOutboxWorker:
+    """Background task that drains email_outbox with bounded concurrency"""
+
+    def __init__(self, transport=None, concurrency: int = EMAIL_OUTBOX_CONCURRENCY):
+        self.transport = transport or get_transport()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._in_flight = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll"""
+        self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10):
+        """Stop claiming, give in-flight sends up to `timeout` seconds, close the transport"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._in_flight:
+            # Anything still running keeps its lease and is retried after it expires
+            await asyncio.wait(self._in_flight, timeout=timeout)
+        await self.transport.close()
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed = await self._drain()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+                claimed = 0
+
+            if not claimed and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), EMAIL_OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _drain(self) -> int:
+        claimed = 0
+        while not self._stopping:
+            await self._slots.acquire()
+            try:
+                message = await _claim_next()
+            except Exception:
+                self._slots.release()
+                raise
+            if message is None:
+                self._slots.release()
+                break
+
+            claimed += 1
+            task = asyncio.create_task(self._deliver(message))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        return claimed
+
+    async def _deliver(self, message: Dict):
+        try:
+            await self.transport.send(message["payload"])
+        except EmailDeliveryError as e:
+            await _record_failure(message, str(e), e.permanent)
+        except Exception as e:
+            await _record_failure(message, f"{type(e).__name__}: {e}", False)
+        else:
+            await email_outbox_collection.update_one(
+                {"id": message["id"]},
+                {"$set": {"status": "sent", "locked_until": None, "sent_at": _now().isoformat()}}
+            )
+            logger.info(f"📧 Email {message['id']} ({message['kind']}) sent")
+        finally:
+            self._slots.release()
+
+_worker: Optional[EmailOutboxWorker] = None
+
+def start_email_outbox(transport=None) -> EmailOutboxWorker:
+    """Start the process-wide outbox worker (called from app startup)"""
+    global _worker
+    if _worker is None:
+        _worker = EmailOutboxWorker(transport)
+        _worker.start()
+    return _worker
+
+async def stop_email_outbox():
+    """Stop the process-wide outbox worker (called from app shutdown)"""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
@@ -1,25 +1,13 @@
 import os
-import requests
 from typing import Optional
+from utils.email_outbox import enqueue_email
 
-BREVO_API_KEY = os.environ.get('BREVO_API_KEY', '')
-BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@promptforgedev.com')
 BREVO_SENDER_EMAIL = os.environ.get('BREVO_SENDER_EMAIL', 'noreply@promptforgedev.com')
 BREVO_SENDER_NAME = os.environ.get('BREVO_SENDER_NAME', 'Prompt Forge')
 
-def send_contact_email(name: str, email: str, message: str, phone: Optional[str] = None) -> bool:
-    """Send contact form notification email via Brevo"""
-    
-    if not BREVO_API_KEY:
-        print("Warning: BREVO_API_KEY not configured. Email not sent.")
-        return False
-    
-    headers = {
-        "accept": "application/json",
-        "api-key": BREVO_API_KEY,
-        "content-type": "application/json"
-    }
+async def send_contact_email(name: str, email: str, message: str, phone: Optional[str] = None) -> bool:
+    """Queue contact form notification email via Brevo"""
     
     phone_text = f"<p><strong>Phone:</strong> {phone}</p>" if phone else ""
     
@@ -53,27 +41,11 @@ def send_contact_email(name: str, email: str, message: str, phone: Optional[str]
         }
     }
     
-    try:
-        response = requests.post(BREVO_API_URL, json=email_data, headers=headers)
-        response.raise_for_status()
-        print(f"Email sent successfully to {ADMIN_EMAIL}")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to send email: {str(e)}")
-        return False
+    # Delivered (with retries) by the outbox worker; only the enqueue is awaited here
+    return await enqueue_email(email_data, "contact") is not None
 
-def send_chat_notification(customer_name: str, customer_email: str, message: str) -> bool:
-    """Send notification when customer sends a chat message"""
-    
-    if not BREVO_API_KEY:
-        print("Warning: BREVO_API_KEY not configured. Email not sent.")
-        return False
-    
-    headers = {
-        "accept": "application/json",
-        "api-key": BREVO_API_KEY,
-        "content-type": "application/json"
-    }
+async def send_chat_notification(customer_name: str, customer_email: str, message: str) -> bool:
+    """Queue notification when customer sends a chat message"""
     
     email_data = {
         "sender": {
@@ -100,27 +72,11 @@ def send_chat_notification(customer_name: str, customer_email: str, message: str
         """
     }
     
-    try:
-        response = requests.post(BREVO_API_URL, json=email_data, headers=headers)
-        response.raise_for_status()
-        print(f"Chat notification sent to {ADMIN_EMAIL}")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to send chat notification: {str(e)}")
-        return False
+    # Delivered (with retries) by the outbox worker; only the enqueue is awaited here
+    return await enqueue_email(email_data, "chat") is not None
 
 async def send_booking_notification(booking_data: dict) -> bool:
-    """Send notification when a new booking is created"""
-    
-    if not BREVO_API_KEY:
-        print("Warning: BREVO_API_KEY not configured. Email not sent.")
-        return False
-    
-    headers = {
-        "accept": "application/json",
-        "api-key": BREVO_API_KEY,
-        "content-type": "application/json"
-    }
+    """Queue notification when a new booking is created"""
     
     message_text = f"<p><strong>Message:</strong> {booking_data.get('message')}</p>" if booking_data.get('message') else ""
     
@@ -159,11 +115,5 @@ async def send_booking_notification(booking_data: dict) -> bool:
         }
     }
     
-    try:
-        response = requests.post(BREVO_API_URL, json=email_data, headers=headers)
-        response.raise_for_status()
-        print(f"Booking notification sent to {ADMIN_EMAIL}")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to send booking notification: {str(e)}")
-        return False
+    # Delivered (with retries) by the outbox worker; only the enqueue is awaited here
+    return await enqueue_email(email_data, "booking") is not None
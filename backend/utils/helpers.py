@@ -1,6 +1,8 @@
+import base64
+import json
 import re
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 def create_slug(title: str) -> str:
     """Create a URL-friendly slug from a title"""
@@ -24,3 +26,58 @@ def serialize_document(doc: Dict[str, Any]) -> Dict[str, Any]:
             doc[key] = value.isoformat()
     
     return doc
+
+def _cursor_value(value: Any) -> Any:
+    # Tagged so the next page compares against a Date, not its string form
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _cursor_object(obj: Dict[str, Any]) -> Any:
+    if set(obj) == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque keyset cursor"""
+    raw = json.dumps([_cursor_value(value) for value in values], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Decode a cursor produced by encode_cursor. Returns None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'), object_hook=_cursor_object)
+    except (ValueError, UnicodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+def keyset_before(field: str, value: Any, tie_field: str, tie_value: Any) -> List[Dict[str, Any]]:
+    """
+    $or clauses for the rows after (`value`, `tie_value`) in a descending sort
+    on (`field`, `tie_field`). Timestamps are stored as ISO strings by the
+    routes but as datetimes by older seed data; Mongo sorts Dates above
+    strings and only compares values of the same type, so past the last
+    datetime the page continues with the string-valued rows.
+    """
+    clauses = [
+        {field: {"$lt": value}},
+        {field: value, tie_field: {"$lt": tie_value}}
+    ]
+    if isinstance(value, datetime):
+        clauses.append({field: {"$type": "string"}})
+    return clauses
+
+def normalize_timestamp(value: str) -> Optional[str]:
+    """
+    ISO 8601 string -> naive UTC isoformat, the way the routes store timestamps,
+    so it compares correctly against stored strings. None if it isn't a timestamp.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
@@ -0,0 +1,99 @@
+"""
+Conditional GET for public catalog endpoints.
+
+Routes opt in with the @public_cache decorator (under @router.get). For
+their 200 responses ConditionalGetMiddleware:
+- adds a strong ETag, a hash of the serialized body
+- answers 304 Not Modified with no body when If-None-Match carries that ETag
+- adds Cache-Control: public, max-age, stale-while-revalidate, so browsers
+  and a CDN can reuse the response without asking and revalidate it cheaply
+
+Only decorate endpoints whose response is the same for every caller.
+"""
+import hashlib
+import os
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+PUBLIC_CACHE_MAX_AGE_SECONDS = int(os.environ.get('PUBLIC_CACHE_MAX_AGE_SECONDS', 60))
+PUBLIC_CACHE_STALE_SECONDS = int(os.environ.get('PUBLIC_CACHE_STALE_SECONDS', 300))
+
+# Headers a 304 repeats from the full response; the rest describe a body it doesn't have
+NOT_MODIFIED_HEADERS = {"cache-control", "etag", "vary", "access-control-allow-origin", "access-control-allow-credentials"}
+
+def cache_control(max_age: int = None, stale_while_revalidate: int = None) -> str:
+    max_age = PUBLIC_CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    stale = PUBLIC_CACHE_STALE_SECONDS if stale_while_revalidate is None else stale_while_revalidate
+    return f"public, max-age={max_age}, stale-while-revalidate={stale}"
+
+def public_cache(endpoint: Optional[Callable] = None, *, max_age: int = None, stale_while_revalidate: int = None):
+    """
+    Mark an endpoint's responses as public and cacheable. Use as @public_cache
+    or @public_cache(max_age=..., stale_while_revalidate=...).
+    """
+    def mark(func: Callable) -> Callable:
+        func.__public_cache__ = cache_control(max_age, stale_while_revalidate)
+        return func
+    return mark(endpoint) if endpoint is not None else mark
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x" """
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+class ConditionalGetMiddleware:
+    """ETag / 304 / Cache-Control for endpoints marked with @public_cache"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if start is None and message["type"] == "http.response.start":
+                # The router has put the matched endpoint in scope by now
+                policy = getattr(scope.get("endpoint"), "__public_cache__", None)
+                if policy is None or message["status"] != 200:
+                    start = False
+                    await send(message)
+                else:
+                    start = message
+                return
+            if not start or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._finish(scope, start, b"".join(chunks), send)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _finish(self, scope, start, body: bytes, send):
+        headers = MutableHeaders(scope=start)
+        etag = headers.get("etag") or body_etag(body)
+        headers["etag"] = etag
+        if "cache-control" not in headers:
+            headers["cache-control"] = getattr(scope["endpoint"], "__public_cache__")
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(etag, if_none_match):
+            kept = [(key, value) for key, value in start["headers"] if key.decode("latin-1") in NOT_MODIFIED_HEADERS]
+            await send({"type": "http.response.start", "status": 304, "headers": kept})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
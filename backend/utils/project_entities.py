@@ -0,0 +1,307 @@
+"""
+Storage helpers for client project sub-entities.
+
+Milestones, tasks, files, comments, chat messages and the activity log used to
+be embedded arrays on the client_projects document. They now live in their own
+collections keyed by project_id so a project document stays small no matter how
+much history it accumulates. These helpers reassemble the old document shape for
+the routes, and keep reading any legacy embedded entries that have not been moved
+yet by scripts/maintenance/migrate_project_entities.py.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReturnDocument
+
+from utils.helpers import normalize_timestamp
+from database import (
+    client_projects_collection,
+    project_milestones_collection,
+    project_tasks_collection,
+    project_files_collection,
+    project_comments_collection,
+    project_chat_messages_collection,
+    project_activity_collection,
+)
+
+# Embedded field name -> (collection, field used for chronological order)
+PROJECT_ENTITIES = {
+    "milestones": (project_milestones_collection, "created_at"),
+    "tasks": (project_tasks_collection, "created_at"),
+    "files": (project_files_collection, "uploaded_at"),
+    "comments": (project_comments_collection, "created_at"),
+    "chat_messages": (project_chat_messages_collection, "created_at"),
+    "activity_log": (project_activity_collection, "timestamp"),
+}
+
+def _clean(doc: Dict) -> Dict:
+    """Strip storage-only fields so entries look like the old embedded ones"""
+    doc.pop("_id", None)
+    doc.pop("project_id", None)
+    return doc
+
+def _merge(legacy: List[Dict], stored: List[Dict]) -> List[Dict]:
+    """Legacy embedded entries first (they are older), then stored ones, deduped by id"""
+    stored_ids = {entry.get("id") for entry in stored}
+    return [entry for entry in legacy if entry.get("id") not in stored_ids] + stored
+
+async def _load_entities(kind: str, project_ids: List[str]) -> Dict[str, List[Dict]]:
+    collection, order_field = PROJECT_ENTITIES[kind]
+    grouped = {project_id: [] for project_id in project_ids}
+    cursor = collection.find({"project_id": {"$in": project_ids}}).sort(order_field, 1)
+    async for doc in cursor:
+        grouped.setdefault(doc["project_id"], []).append(_clean(doc))
+    return grouped
+
+async def attach_project_entities(project_docs: List[Dict], kinds: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Fill the sub-entity arrays on project documents in place.
+
+    One query per entity kind regardless of how many projects are passed, so
+    list endpoints cost the same number of round trips as a single project.
+    """
+    if not project_docs:
+        return project_docs
+
+    kinds = list(kinds) if kinds is not None else list(PROJECT_ENTITIES)
+    project_ids = [doc["id"] for doc in project_docs]
+    results = await asyncio.gather(*(_load_entities(kind, project_ids) for kind in kinds))
+
+    for kind, grouped in zip(kinds, results):
+        for doc in project_docs:
+            doc[kind] = _merge(doc.get(kind) or [], grouped.get(doc["id"], []))
+    return project_docs
+
+async def load_project(query: Dict, kinds: Optional[Iterable[str]] = None) -> Optional[Dict]:
+    """find_one on client_projects with sub-entities (all, or just `kinds`) attached"""
+    project_doc = await client_projects_collection.find_one(query)
+    if project_doc:
+        await attach_project_entities([project_doc], kinds)
+    return project_doc
+
+async def project_exists(query: Dict) -> bool:
+    """Existence check that doesn't pull the project document over the wire"""
+    return await client_projects_collection.find_one(query, {"_id": 1}) is not None
+
+async def count_project_entities(kind: str, project_ids: List[str], match: Optional[Dict] = None) -> Dict[str, int]:
+    """Per-project entry counts for a batch of projects, in one indexed aggregation"""
+    collection, _ = PROJECT_ENTITIES[kind]
+    pipeline = [
+        {"$match": {"project_id": {"$in": project_ids}, **(match or {})}},
+        {"$group": {"_id": "$project_id", "count": {"$sum": 1}}}
+    ]
+    rows = await collection.aggregate(pipeline).to_list(length=None)
+    return {row["_id"]: row["count"] for row in rows}
+
+async def add_project_entity(kind: str, project_id: str, entity: Dict) -> Dict:
+    """Store one sub-entity; the caller's dict is left untouched"""
+    collection, _ = PROJECT_ENTITIES[kind]
+    await collection.insert_one({**entity, "project_id": project_id})
+    return entity
+
+async def find_project_entity(kind: str, project_id: str, entity_id: str) -> Optional[Dict]:
+    """Fetch one sub-entity, falling back to the legacy embedded array"""
+    collection, _ = PROJECT_ENTITIES[kind]
+    doc = await collection.find_one({"project_id": project_id, "id": entity_id})
+    if doc:
+        return _clean(doc)
+
+    legacy = await client_projects_collection.find_one(
+        {"id": project_id, f"{kind}.id": entity_id},
+        {f"{kind}.$": 1}
+    )
+    if legacy and legacy.get(kind):
+        return legacy[kind][0]
+    return None
+
+def _created_at(message: Dict) -> str:
+    value = message.get("created_at")
+    return value.isoformat() if isinstance(value, datetime) else str(value or "")
+
+async def resolve_chat_cursor(project_id: str, cursor: str) -> Optional[str]:
+    """An after/before cursor (message id or ISO timestamp) as a created_at string, or None if unknown"""
+    timestamp = normalize_timestamp(cursor)
+    if timestamp:
+        return timestamp
+    message = await find_project_entity("chat_messages", project_id, cursor)
+    return _created_at(message) if message else None
+
+async def load_chat_messages_since(
+    project_id: str,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = 100
+) -> List[Dict]:
+    """
+    Chat messages newer than `after` (the oldest `limit` of them) or older than
+    `before` (the newest `limit`), oldest first, from the (project_id,
+    created_at) index plus any legacy embedded messages.
+    """
+    if after is not None:
+        query = {"project_id": project_id, "created_at": {"$gt": after}}
+        keep = lambda message: _created_at(message) > after
+        order = 1
+    else:
+        query = {"project_id": project_id, "created_at": {"$lt": before}}
+        keep = lambda message: _created_at(message) < before
+        order = -1
+
+    stored, legacy_doc = await asyncio.gather(
+        project_chat_messages_collection.find(query).sort("created_at", order).limit(limit).to_list(length=limit),
+        client_projects_collection.find_one({"id": project_id}, {"_id": 0, "chat_messages": 1})
+    )
+    stored = [_clean(doc) for doc in stored]
+    if order == -1:
+        stored.reverse()
+
+    legacy = [message for message in (legacy_doc or {}).get("chat_messages") or [] if keep(message)]
+    messages = _merge(legacy, stored)
+    return messages[:limit] if after is not None else messages[-limit:]
+
+async def update_project_entity(kind: str, project_id: str, entity_id: str, update_data: Dict) -> Optional[Dict]:
+    """
+    Atomically $set fields on one sub-entity and return it as updated.
+
+    Only the changed fields of the one entry are written, so concurrent edits
+    to other entries (or other fields) are never overwritten. Returns None if
+    the entry doesn't exist.
+    """
+    if not update_data:
+        return await find_project_entity(kind, project_id, entity_id)
+
+    collection, _ = PROJECT_ENTITIES[kind]
+    doc = await collection.find_one_and_update(
+        {"project_id": project_id, "id": entity_id},
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
+    )
+    if doc:
+        return _clean(doc)
+
+    legacy = await client_projects_collection.find_one_and_update(
+        {"id": project_id, f"{kind}.id": entity_id},
+        {"$set": {f"{kind}.$[entry].{field}": value for field, value in update_data.items()}},
+        array_filters=[{"entry.id": entity_id}],
+        projection={kind: {"$elemMatch": {"id": entity_id}}},
+        return_document=ReturnDocument.AFTER
+    )
+    if legacy and legacy.get(kind):
+        return legacy[kind][0]
+    return None
+
+def unread_counter(sender_type: str) -> str:
+    """
+    Field on the project document counting unread messages from `sender_type`:
+    chat_unread.client is what admins haven't read, chat_unread.admin what the
+    client hasn't read.
+    """
+    return f"chat_unread.{sender_type}"
+
+def _unread_count(project: Optional[Dict], sender_type: str) -> int:
+    return ((project or {}).get("chat_unread") or {}).get(sender_type, 0)
+
+async def add_chat_message(project_id: str, message: Dict) -> int:
+    """Bump its side's unread counter and store a chat message. Returns the new count."""
+    counter = unread_counter(message["sender_type"])
+    # Count first: a read-mark can only flag (and subtract) a message that is
+    # already counted, so the counter never ends above what is unread
+    project = await client_projects_collection.find_one_and_update(
+        {"id": project_id},
+        {"$inc": {counter: 1}},
+        projection={"_id": 0, "chat_unread": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    try:
+        await add_project_entity("chat_messages", project_id, message)
+    except Exception:
+        await client_projects_collection.update_one({"id": project_id}, {"$inc": {counter: -1}})
+        raise
+    return _unread_count(project, message["sender_type"])
+
+async def mark_chat_messages_read(project_id: str, sender_type: str) -> int:
+    """
+    Flag every unread message from `sender_type` as read, in place, without
+    reading them first. Returns that side's unread counter afterwards, which
+    stays above 0 if a message arrived meanwhile.
+    """
+    unread = {"sender_type": sender_type, "read": {"$ne": True}}
+    stored, legacy = await asyncio.gather(
+        project_chat_messages_collection.update_many(
+            {"project_id": project_id, **unread},
+            {"$set": {"read": True}}
+        ),
+        client_projects_collection.find_one_and_update(
+            {"id": project_id, "chat_messages": {"$elemMatch": unread}},
+            {"$set": {"chat_messages.$[m].read": True}},
+            array_filters=[{"m.sender_type": sender_type, "m.read": {"$ne": True}}],
+            projection={"_id": 0, "chat_messages.sender_type": 1, "chat_messages.read": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    )
+    # Take off only what this call flagged: a message sent meanwhile stays
+    # counted, and concurrent calls never flag (or subtract) the same one twice
+    flagged = stored.modified_count + sum(
+        1 for message in (legacy or {}).get("chat_messages") or []
+        if message.get("sender_type") == sender_type and message.get("read") is not True
+    )
+    counter = unread_counter(sender_type)
+    if flagged:
+        project = await client_projects_collection.find_one_and_update(
+            {"id": project_id},
+            [{"$set": {counter: {"$max": [0, {"$subtract": [{"$ifNull": [f"${counter}", 0]}, flagged]}]}}}],
+            projection={"_id": 0, "chat_unread": 1},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        project = await client_projects_collection.find_one({"id": project_id}, {"_id": 0, "chat_unread": 1})
+    return _unread_count(project, sender_type)
+
+async def count_unread_chat_messages(project_id: str, sender_type: str) -> int:
+    """
+    Unread messages from `sender_type` in one project, stored and legacy
+    embedded, counted from the messages themselves. Routes read the
+    chat_unread counters instead; this is for rebuilding them.
+    """
+    unread = {"sender_type": sender_type, "read": {"$ne": True}}
+    stored, legacy = await asyncio.gather(
+        project_chat_messages_collection.count_documents({"project_id": project_id, **unread}),
+        client_projects_collection.aggregate([
+            {"$match": {"id": project_id}},
+            {"$project": {"_id": 0, "count": {"$size": {"$filter": {
+                "input": {"$ifNull": ["$chat_messages", []]},
+                "as": "m",
+                "cond": {"$and": [{"$eq": ["$$m.sender_type", sender_type]}, {"$ne": ["$$m.read", True]}]}
+            }}}}}
+        ]).to_list(length=1)
+    )
+    return stored + (legacy[0]["count"] if legacy else 0)
+
+async def delete_project_entity(kind: str, project_id: str, entity_id: str) -> bool:
+    """Remove one sub-entity wherever it is stored. Returns False if not found."""
+    collection, _ = PROJECT_ENTITIES[kind]
+    result = await collection.delete_one({"project_id": project_id, "id": entity_id})
+    if result.deleted_count:
+        return True
+
+    legacy = await client_projects_collection.update_one(
+        {"id": project_id},
+        {"$pull": {kind: {"id": entity_id}}}
+    )
+    return legacy.modified_count > 0
+
+async def delete_project_entities(project_id: str):
+    """Remove every sub-entity belonging to a project"""
+    await asyncio.gather(*(
+        collection.delete_many({"project_id": project_id})
+        for collection, _ in PROJECT_ENTITIES.values()
+    ))
+
+async def record_project_activity(project_id: str, activity: Dict):
+    """Append an activity entry and bump the project's last_activity_at"""
+    await asyncio.gather(
+        add_project_entity("activity_log", project_id, activity),
+        client_projects_collection.update_one(
+            {"id": project_id},
+            {"$set": {"last_activity_at": datetime.utcnow().isoformat()}}
+        )
+    )
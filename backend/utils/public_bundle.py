@@ -0,0 +1,55 @@
+"""
+Cache for the home page bundle served by routes/public.py, and change
+notifications for public site data.
+
+The bundle is stored as its encoded JSON bytes plus their ETag, so a request
+in steady state is answered from memory without a query or a JSON encode. It
+lives in its own SingletonCache namespace with a long TTL: it is dropped by
+writes, not by time.
+
+Routers serving public data declare public_data_changed("<section>") as a
+dependency. After any successful write through them the bundle is invalidated
+on every worker (when the section is part of it) and the listeners registered
+with on_public_data_change, such as the static snapshot, are told which
+section changed.
+"""
+import logging
+import os
+from typing import Callable, List
+
+from fastapi import Request
+
+from utils.singleton_cache import SingletonCache
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_BUNDLE_TTL_SECONDS = float(os.environ.get('PUBLIC_BUNDLE_TTL_SECONDS', 3600))
+PUBLIC_BUNDLE_STALE_SECONDS = float(os.environ.get('PUBLIC_BUNDLE_STALE_SECONDS', 86400))
+
+HOME_BUNDLE = "home"
+# Sections the home bundle is built from
+BUNDLE_SECTIONS = {"content", "about", "services", "projects", "testimonials", "skills", "pricing"}
+
+bundle_cache = SingletonCache("bundle", ttl=PUBLIC_BUNDLE_TTL_SECONDS, stale=PUBLIC_BUNDLE_STALE_SECONDS)
+
+_listeners: List[Callable[[str], None]] = []
+
+def on_public_data_change(listener: Callable[[str], None]):
+    """Call `listener(section)` after each successful write to public data on this worker"""
+    _listeners.append(listener)
+
+def public_data_changed(section: str):
+    """Router dependency: after a write on the router succeeds, report `section` as changed"""
+    async def dependency(request: Request):
+        yield
+        # Not reached when the handler raised
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return
+        if section in BUNDLE_SECTIONS:
+            await bundle_cache.invalidate_everywhere(HOME_BUNDLE)
+        for listener in _listeners:
+            try:
+                listener(section)
+            except Exception as e:
+                logger.warning(f"Public data listener failed for {section}: {e}")
+    return dependency
@@ -0,0 +1,273 @@
+"""
+Static snapshot of the public site data, for serving from a CDN or the
+frontend host when the API is asleep or cold-starting.
+
+Each public GET is rendered to a JSON file named after its path, without
+/api and with .json added: services.json, blogs/<slug>.json,
+pages/<page>.json, public/bundle.json, ... Every file has precompressed
+.gz and .br siblings. The .br files need the brotli package and are skipped
+without it.
+
+Snapshots are versioned. Each build writes a new directory under
+PUBLIC_SNAPSHOT_DIR and then atomically repoints `current` (a symlink) and
+current.json at it. Files are never modified in place, so a host syncing the
+directory never sees a half-written snapshot. The newest
+PUBLIC_SNAPSHOT_KEEP versions are kept.
+
+Builds are incremental. Routes register a renderer per section (routes/public.py).
+A write reported through utils.public_bundle marks its section dirty, and
+after PUBLIC_SNAPSHOT_DEBOUNCE_SECONDS the dirty sections are rendered again.
+Files whose bytes did not change are hard-linked from the previous version.
+If nothing changed, no version is written. The in-app rebuild only runs when
+PUBLIC_SNAPSHOT_DIR is set. scripts/maintenance/export_public_snapshot.py
+does a full build on demand.
+"""
+import asyncio
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_SNAPSHOT_DIR = os.environ.get('PUBLIC_SNAPSHOT_DIR', '')
+PUBLIC_SNAPSHOT_KEEP = int(os.environ.get('PUBLIC_SNAPSHOT_KEEP', 3))
+PUBLIC_SNAPSHOT_DEBOUNCE_SECONDS = float(os.environ.get('PUBLIC_SNAPSHOT_DEBOUNCE_SECONDS', 2))
+
+MANIFEST = "manifest.json"
+CURRENT = "current"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+# Version directories: <sequence>-<UTC time>; the sequence orders them
+VERSION_NAME = re.compile(r"^(\d{10})-\d{8}T\d{6}Z$")
+
+# section -> coroutine returning {relative path: encoded JSON bytes}
+Renderer = Callable[[], Awaitable[Dict[str, bytes]]]
+
+def _compress(path: Path, body: bytes):
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(body, quality=11))
+
+def _link_or_copy(source: Path, target: Path):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def _safe_path(relative: str) -> bool:
+    parts = Path(relative).parts
+    return bool(parts) and not Path(relative).is_absolute() and all(part not in ("", ".", "..") for part in parts)
+
+class PublicSnapshot:
+    """Renders registered sections into versioned snapshot directories"""
+
+    def __init__(self, root: str = PUBLIC_SNAPSHOT_DIR, keep: int = PUBLIC_SNAPSHOT_KEEP,
+                 debounce: float = PUBLIC_SNAPSHOT_DEBOUNCE_SECONDS):
+        self.root = Path(root) if root else None
+        self.keep = max(keep, 1)
+        self.debounce = debounce
+        self._renderers: Dict[str, Renderer] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._dirty: Set[str] = set()
+        self._flush: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.last_build: Optional[Dict] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def register(self, section: str, render: Renderer, depends_on: Iterable[str] = ()):
+        """Add a section; it is also re-rendered whenever one of `depends_on` changes"""
+        self._renderers[section] = render
+        for source in depends_on:
+            self._dependents.setdefault(source, set()).add(section)
+
+    def mark_dirty(self, section: str):
+        """Schedule `section` (and what is built from it) for the next incremental build"""
+        if not self.enabled:
+            return
+        if section in self._renderers:
+            self._dirty.add(section)
+        self._dirty |= self._dependents.get(section, set())
+        if self._dirty and self._flush is None:
+            self._flush = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            # Let a burst of edits land in one version
+            await asyncio.sleep(self.debounce)
+            self._flush = None
+            sections, self._dirty = self._dirty, set()
+            await self.build(sections)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Public snapshot rebuild failed: {e}")
+
+    async def build(self, sections: Optional[Set[str]] = None) -> Dict:
+        """
+        Render `sections` (all when None, or when there is no snapshot yet) and
+        publish a new version if any file changed. Returns a build summary.
+        """
+        if not self.enabled:
+            raise RuntimeError("PUBLIC_SNAPSHOT_DIR is not set")
+        async with self._lock:
+            if sections is not None and await asyncio.to_thread(self._read_manifest) is None:
+                # Nothing to build on yet
+                sections = None
+            names = sorted(self._renderers if sections is None else set(sections) & set(self._renderers))
+            rendered_sections = await asyncio.gather(*(self._renderers[name]() for name in names))
+            rendered = {name: files for name, files in zip(names, rendered_sections)}
+            # Compression and file IO off the event loop
+            summary = await asyncio.to_thread(self._publish, rendered, sections is None)
+            self.last_build = summary
+            return summary
+
+    def _publish(self, rendered: Dict[str, Dict[str, bytes]], full: bool) -> Dict:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            # Other workers build into the same directory; each starts from the latest version
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            previous = self._read_manifest()
+            full = full or previous is None
+            previous_files = previous["files"] if previous else {}
+            previous_dir = self.root / previous["version"] if previous else None
+
+            # Under the lock, so versions are numbered in build order across workers
+            sequence = max((int(match.group(1)) for match in map(VERSION_NAME.match, self._versions())), default=0) + 1
+            version = f"{sequence:010d}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}"
+            staging = self.root / f".{version}.tmp"
+            staging.mkdir()
+            files: Dict[str, Dict] = {}
+            written = linked = 0
+            try:
+                for path, entry in previous_files.items():
+                    if entry["section"] not in rendered and not full:
+                        self._reuse(previous_dir, staging, path)
+                        files[path] = entry
+                        linked += 1
+
+                for section, section_files in rendered.items():
+                    for path, body in section_files.items():
+                        if not _safe_path(path):
+                            logger.warning(f"Skipping unsafe snapshot path {path!r}")
+                            continue
+                        digest = hashlib.sha256(body).hexdigest()
+                        previous_entry = previous_files.get(path)
+                        if previous_entry and previous_entry["sha256"] == digest:
+                            self._reuse(previous_dir, staging, path)
+                            linked += 1
+                        else:
+                            target = staging / path
+                            target.parent.mkdir(parents=True, exist_ok=True)
+                            target.write_bytes(body)
+                            _compress(target, body)
+                            written += 1
+                        files[path] = {"section": section, "sha256": digest, "bytes": len(body)}
+
+                removed = sorted(set(previous_files) - set(files))
+                if previous and not written and not removed:
+                    shutil.rmtree(staging)
+                    return {"version": previous["version"], "written": 0, "linked": 0, "removed": [], "published": False}
+
+                manifest = {
+                    "version": version,
+                    "built_at": datetime.utcnow().isoformat(),
+                    "brotli": brotli is not None,
+                    "files": files
+                }
+                (staging / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+                staging.rename(self.root / version)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+            self._point_current(version, manifest)
+            self._prune(version)
+            return {"version": version, "written": written, "linked": linked, "removed": removed, "published": True}
+
+    def _reuse(self, previous_dir: Path, staging: Path, path: str):
+        _link_or_copy(previous_dir / path, staging / path)
+        for suffix in COMPRESSED_SUFFIXES:
+            source = previous_dir / (path + suffix)
+            if source.exists():
+                _link_or_copy(source, staging / (path + suffix))
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            return json.loads((self.root / CURRENT / MANIFEST).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _point_current(self, version: str, manifest: Dict):
+        link = self.root / f".{CURRENT}.{uuid.uuid4().hex[:8]}"
+        os.symlink(version, link)
+        os.replace(link, self.root / CURRENT)
+
+        pointer = self.root / f".{CURRENT}.json.tmp"
+        pointer.write_text(json.dumps({"version": version, "built_at": manifest["built_at"]}))
+        os.replace(pointer, self.root / f"{CURRENT}.json")
+
+    def _versions(self):
+        return [
+            entry.name for entry in self.root.iterdir()
+            if entry.is_dir() and not entry.is_symlink() and VERSION_NAME.match(entry.name)
+        ]
+
+    def _prune(self, current: str):
+        # Zero-padded sequence first, so name order is build order
+        for name in sorted(self._versions())[:-self.keep]:
+            if name != current:
+                shutil.rmtree(self.root / name, ignore_errors=True)
+
+    def stats(self) -> Dict:
+        current = self._read_manifest() if self.enabled else None
+        return {
+            "enabled": self.enabled,
+            "directory": str(self.root) if self.root else None,
+            "brotli": brotli is not None,
+            "current_version": current["version"] if current else None,
+            "files": len(current["files"]) if current else 0,
+            "pending_sections": sorted(self._dirty),
+            "last_build": self.last_build,
+        }
+
+    def start(self):
+        """Build a first snapshot in the background if there is none yet"""
+        if self.enabled and self._read_manifest() is None and self._flush is None:
+            self._flush = asyncio.create_task(self._flush_later())
+            self._dirty |= set(self._renderers)
+
+    async def stop(self):
+        if self._flush is not None:
+            self._flush.cancel()
+            try:
+                await self._flush
+            except asyncio.CancelledError:
+                pass
+            self._flush = None
+
+public_snapshot = PublicSnapshot()
+
+def start_public_snapshot():
+    """Called from app startup"""
+    public_snapshot.start()
+
+async def stop_public_snapshot():
+    """Called from app shutdown; a pending incremental build is dropped"""
+    await public_snapshot.stop()
@@ -0,0 +1,241 @@
+"""
+Realtime push for chat.
+
+Routes publish small events (new messages, read receipts, unread counts) to
+topics on the process-wide `broker`; the WebSocket and SSE endpoints in
+routes/realtime.py subscribe each connection to the topics its principal may
+see. Events carry only the change, so clients patch their local state instead
+of re-fetching whole histories.
+
+With several app workers an event also has to reach the other processes.
+REALTIME_BACKEND picks how:
+- local (default)      single worker, nothing leaves the process
+- mongo_poll           events are written to realtime_events and every worker
+                       polls it every REALTIME_POLL_SECONDS
+- mongo_change_stream  same collection, tailed with a change stream
+                       (needs a replica set)
+"""
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from database import realtime_events_collection
+
+logger = logging.getLogger(__name__)
+
+REALTIME_BACKEND = os.environ.get('REALTIME_BACKEND', 'local')
+REALTIME_POLL_SECONDS = float(os.environ.get('REALTIME_POLL_SECONDS', 1))
+# Events a slow connection may have queued before it is told to resync
+REALTIME_QUEUE_SIZE = int(os.environ.get('REALTIME_QUEUE_SIZE', 256))
+# Re-read this far back on every poll so clock skew between workers can't hide events
+POLL_LOOKBACK_SECONDS = 5
+SEEN_EVENT_IDS = 10000
+RESTART_DELAY_SECONDS = 5
+
+# Upper bound for long-poll requests
+MAX_LONG_POLL_SECONDS = 30
+
+# Identifies this process's own events in the shared collection
+WORKER_ID = str(uuid.uuid4())
+
+ADMIN_CHAT_TOPIC = "admin:chat"
+ADMIN_PROJECTS_TOPIC = "admin:projects"
+
+def client_topic(client_id: str) -> str:
+    return f"client:{client_id}"
+
+def conversation_topic(conversation_id: str) -> str:
+    return f"conversation:{conversation_id}"
+
+def project_chat_topics(client_id: str) -> List[str]:
+    """Everyone who follows a client project's chat: all admins and the project's client"""
+    return [ADMIN_PROJECTS_TOPIC, client_topic(client_id)]
+
+class Subscription:
+    """Queue of events for one connection"""
+
+    def __init__(self, topics: Set[str], max_queue: int = REALTIME_QUEUE_SIZE):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def offer(self, event: Dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event: drop the backlog and
+            # tell the client to re-fetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"id": str(uuid.uuid4()), "type": "resync", "topics": [], "data": {}})
+
+    async def next(self, timeout: float) -> Optional[Dict]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class LocalBackend:
+    """Single worker: every subscriber lives in this process"""
+
+    async def publish(self, event: Dict):
+        pass
+
+    async def run(self, deliver: Callable[[Dict], None]):
+        pass
+
+class MongoPollingBackend:
+    """Relay through realtime_events; each worker polls for the others' events"""
+
+    def __init__(self, collection=realtime_events_collection, interval: float = REALTIME_POLL_SECONDS):
+        self.collection = collection
+        self.interval = interval
+
+    async def publish(self, event: Dict):
+        await self.collection.insert_one({
+            **event, "_id": event["id"], "origin": WORKER_ID, "created_at": datetime.utcnow()
+        })
+
+    async def run(self, deliver: Callable[[Dict], None]):
+        seen: OrderedDict = OrderedDict()
+        since = datetime.utcnow()
+        while True:
+            await asyncio.sleep(self.interval)
+            polled_at = datetime.utcnow()
+            cursor = self.collection.find({
+                "created_at": {"$gte": since - timedelta(seconds=POLL_LOOKBACK_SECONDS)},
+                "origin": {"$ne": WORKER_ID}
+            }).sort("created_at", 1)
+            async for doc in cursor:
+                if doc["_id"] in seen:
+                    continue
+                seen[doc["_id"]] = True
+                deliver(_from_document(doc))
+            while len(seen) > SEEN_EVENT_IDS:
+                seen.popitem(last=False)
+            since = polled_at
+
+class MongoChangeStreamBackend(MongoPollingBackend):
+    """Relay through realtime_events, tailed with a change stream instead of polling"""
+
+    async def run(self, deliver: Callable[[Dict], None]):
+        pipeline = [{"$match": {"operationType": "insert", "fullDocument.origin": {"$ne": WORKER_ID}}}]
+        async with self.collection.watch(pipeline) as stream:
+            async for change in stream:
+                deliver(_from_document(change["fullDocument"]))
+
+def _from_document(doc: Dict) -> Dict:
+    return {key: doc[key] for key in ("id", "type", "topics", "data")}
+
+BACKENDS = {
+    "local": LocalBackend,
+    "mongo_poll": MongoPollingBackend,
+    "mongo_change_stream": MongoChangeStreamBackend,
+}
+
+class RealtimeBroker:
+    """In-process topic fan-out with a pluggable cross-worker backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or BACKENDS[REALTIME_BACKEND]()
+        self._subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(set(topics))
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    async def publish(self, topics: List[str], event_type: str, data: Dict):
+        """Push an event to every subscriber of any of `topics`, on every worker"""
+        event = {"id": str(uuid.uuid4()), "type": event_type, "topics": topics, "data": data}
+        self.published += 1
+        self._deliver(event)
+        try:
+            await self.backend.publish(event)
+        except Exception as e:
+            # Local subscribers already have it; clients on other workers see it on their next fetch
+            logger.warning(f"Realtime relay failed for {event_type}: {e}")
+
+    def _deliver(self, event: Dict):
+        topics = set(event["topics"])
+        for subscription in list(self._subscriptions):
+            if subscription.topics & topics:
+                subscription.offer(event)
+                self.delivered += 1
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.backend.run(self._deliver)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime backend error, restarting: {e}")
+                await asyncio.sleep(RESTART_DELAY_SECONDS)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "worker_id": WORKER_ID,
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+broker = RealtimeBroker()
+
+async def long_poll(topics: Iterable[str], wait: float, fetch: Callable[[], Awaitable[List]]) -> List:
+    """
+    Run `fetch`; while it finds nothing, run it again after each event on
+    `topics`, for up to `wait` seconds. Subscribes before the first fetch so an
+    event published meanwhile isn't missed. Only events that reach this worker
+    wake it (see REALTIME_BACKEND); otherwise it simply returns empty on time.
+    """
+    if wait <= 0:
+        return await fetch()
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    subscription = broker.subscribe(topics)
+    try:
+        results = await fetch()
+        while not results:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or await subscription.next(remaining) is None:
+                break
+            results = await fetch()
+        return results
+    finally:
+        broker.unsubscribe(subscription)
+
+def start_realtime():
+    """Start relaying events from other workers (called from app startup)"""
+    broker.start()
+
+async def stop_realtime():
+    """Stop the relay (called from app shutdown)"""
+    await broker.stop()
@@ -0,0 +1,141 @@
+"""
+In-process read-through cache for singleton content documents.
+
+The public site loads a handful of one-document collections (website content,
+about, contact page, pricing, settings, booking settings) on every page view,
+and they change only when an admin saves them. Each is cached here under a
+name, loaded by a loader coroutine the route supplies:
+
+- fresh for SINGLETON_CACHE_TTL_SECONDS, served straight from memory
+- then stale for up to SINGLETON_CACHE_STALE_SECONDS more: served as is while
+  one background load refreshes it
+- concurrent misses share a single load
+
+Every name has a version that invalidate() bumps; a load that was already
+running when the version changed is not stored. The admin write routes call
+invalidate_everywhere() after saving, so this worker serves the new document
+on the next request and the others drop their copy once utils.cache_versions
+relays the bump.
+"""
+import asyncio
+import copy
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from utils.cache_versions import cache_versions
+
+logger = logging.getLogger(__name__)
+
+SINGLETON_CACHE_TTL_SECONDS = float(os.environ.get('SINGLETON_CACHE_TTL_SECONDS', 30))
+SINGLETON_CACHE_STALE_SECONDS = float(os.environ.get('SINGLETON_CACHE_STALE_SECONDS', 300))
+
+Loader = Callable[[], Awaitable[Any]]
+
+class CacheEntry:
+    __slots__ = ("value", "loaded_at", "version")
+
+    def __init__(self, value: Any, loaded_at: float, version: int):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.version = version
+
+class SingletonCache:
+    """Named, versioned entries with stale-while-revalidate and single-flight loads"""
+
+    def __init__(self, namespace: str, ttl: float = SINGLETON_CACHE_TTL_SECONDS,
+                 stale: float = SINGLETON_CACHE_STALE_SECONDS):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale = stale
+        self._entries: Dict[str, CacheEntry] = {}
+        self._versions: Dict[str, int] = {}
+        self._loads: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.invalidations = 0
+        cache_versions.register(namespace, self.invalidate)
+
+    async def get(self, name: str, loader: Loader) -> Any:
+        """The cached value for `name`, loading it with `loader` when missing or expired"""
+        entry = self._entries.get(name)
+        if entry is not None and entry.version == self._versions.get(name, 0):
+            age = time.monotonic() - entry.loaded_at
+            if age < self.ttl:
+                self.hits += 1
+                return copy.deepcopy(entry.value)
+            if age < self.ttl + self.stale:
+                self.stale_hits += 1
+                self._start_load(name, loader)
+                return copy.deepcopy(entry.value)
+
+        self.misses += 1
+        # shield: a cancelled request must not cancel a load others are waiting on
+        value = await asyncio.shield(self._start_load(name, loader))
+        return copy.deepcopy(value)
+
+    def _start_load(self, name: str, loader: Loader) -> asyncio.Task:
+        task = self._loads.get(name)
+        if task is None:
+            task = asyncio.create_task(self._load(name, loader, self._versions.get(name, 0)))
+            self._loads[name] = task
+            task.add_done_callback(lambda done: self._load_finished(name, done))
+        return task
+
+    async def _load(self, name: str, loader: Loader, version: int) -> Any:
+        value = await loader()
+        # Invalidated while loading: what we read may predate the write
+        if self._versions.get(name, 0) == version:
+            self._entries[name] = CacheEntry(value, time.monotonic(), version)
+        return value
+
+    def _load_finished(self, name: str, task: asyncio.Task):
+        if self._loads.get(name) is task:
+            del self._loads[name]
+        self.loads += 1
+        if not task.cancelled() and task.exception() is not None:
+            # Waiting requests get the error; a background refresh keeps serving the stale copy
+            self.load_errors += 1
+            logger.warning(f"Loading cached {name} failed: {task.exception()}")
+
+    def invalidate(self, name: str):
+        """Drop this worker's copy of `name`; the next request loads it again"""
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._entries.pop(name, None)
+        # Requests from now on must not join a load that started before the write
+        self._loads.pop(name, None)
+        self.invalidations += 1
+
+    async def invalidate_everywhere(self, name: str):
+        """Drop `name` here and on every other worker, after a write"""
+        self.invalidate(name)
+        await cache_versions.bump(self.namespace, name)
+
+    def clear(self):
+        for name in list(self._entries):
+            self.invalidate(name)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "invalidations": self.invalidations,
+            "entries": {
+                name: {"version": entry.version, "age_seconds": round(now - entry.loaded_at, 1)}
+                for name, entry in self._entries.items()
+            }
+        }
+
+singleton_cache = SingletonCache("singleton")
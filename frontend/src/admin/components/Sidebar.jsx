@@ -25,9 +25,15 @@ import {
   Heart,
   Link2
 } from 'lucide-react';
+import chatService from '../../services/chatService';
+import { subscribeRealtime } from '../../services/realtime';
+
+// Wait for a burst of chat events to settle before re-reading the unread totals
+const UNREAD_REFRESH_DELAY_MS = 1000;
 
 const Sidebar = ({ isOpen, onClose }) => {
   const [currentUser, setCurrentUser] = useState(null);
+  const [unreadTotals, setUnreadTotals] = useState(null);
 
   useEffect(() => {
     const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
@@ -41,6 +47,29 @@ const Sidebar = ({ isOpen, onClose }) => {
     }
   }, []);
 
+  // Unread badges for Chat and Client Projects, refreshed when chat events arrive
+  useEffect(() => {
+    const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
+    if (!token) return undefined;
+
+    let timer = null;
+    const refresh = () => chatService.getUnreadTotals().then(setUnreadTotals).catch(() => {});
+    refresh();
+    const unsubscribe = subscribeRealtime({ token }, () => {
+      clearTimeout(timer);
+      timer = setTimeout(refresh, UNREAD_REFRESH_DELAY_MS);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, []);
+
+  const unreadCounts = {
+    '/admin/chat': unreadTotals?.conversationsUnread,
+    '/admin/client-projects': unreadTotals?.projectsUnread,
+  };
+
   const allNavItems = [
     { path: '/admin/about', icon: BookOpen, label: 'About', permission: 'canManageAbout' },
     { path: '/admin/portfolio', icon: Briefcase, label: 'Portfolio', permission: 'canManagePortfolio' },
@@ -133,6 +162,9 @@ const Sidebar = ({ isOpen, onClose }) => {
             >
               <item.icon className="admin-nav-icon" />
               <span>{item.label}</span>
+              {unreadCounts[item.path] > 0 && (
+                <span className="admin-nav-count">{unreadCounts[item.path]}</span>
+              )}
             </NavLink>
           ))}
         </nav>
@@ -1,32 +1,99 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { MessageCircle, Send, Trash2, Mail, Phone, Clock, CheckCircle } from 'lucide-react';
 import axios from 'axios';
 import { getBackendURL } from '../../lib/utils';
+import { subscribeRealtime, appendMessage } from '../../services/realtime';
 
 const BACKEND_URL = getBackendURL();
 
+const authHeaders = () => {
+  const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
+  return { Authorization: `Bearer ${token}` };
+};
+
+const INBOX_PAGE_SIZE = 50;
+
 const ChatManager = () => {
   const [conversations, setConversations] = useState([]);
   const [selectedConv, setSelectedConv] = useState(null);
   const [loading, setLoading] = useState(true);
   const [replyText, setReplyText] = useState('');
   const [totalUnread, setTotalUnread] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [search, setSearch] = useState('');
+  const [unreadOnly, setUnreadOnly] = useState(false);
+  // Realtime handlers are bound once, so they read the current filters from here
+  const filtersRef = useRef({ search, unreadOnly });
+  filtersRef.current = { search, unreadOnly };
 
   useEffect(() => {
-    fetchConversations();
-    // Poll for new messages every 30 seconds
-    const interval = setInterval(fetchConversations, 30000);
-    return () => clearInterval(interval);
+    // New messages, read receipts and deletions are pushed instead of polled
+    const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
+    return subscribeRealtime({ token }, handleRealtimeEvent);
   }, []);
 
-  const fetchConversations = async () => {
+  useEffect(() => {
+    const timer = setTimeout(() => fetchConversations(), search ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [search, unreadOnly]);
+
+  const patchConversation = (id, patch) => {
+    setConversations((current) => current
+      .map((conv) => (conv.id === id ? { ...conv, ...patch } : conv))
+      .sort((a, b) => new Date(b.lastMessageAt) - new Date(a.lastMessageAt)));
+    setSelectedConv((current) => (current && current.id === id ? { ...current, ...patch } : current));
+  };
+
+  const handleRealtimeEvent = ({ type, data }) => {
+    switch (type) {
+      case 'chat.conversation':
+        setConversations((current) => [data, ...current.filter((conv) => conv.id !== data.id)]);
+        setTotalUnread(data.totalUnread);
+        break;
+      case 'chat.message': {
+        const patch = { lastMessage: data.message, lastMessageAt: data.lastMessageAt || data.message.timestamp };
+        if (data.unreadCount !== undefined) patch.unreadCount = data.unreadCount;
+        patchConversation(data.conversationId, patch);
+        setSelectedConv((current) => (current && current.id === data.conversationId
+          ? { ...current, messages: appendMessage(current.messages, data.message) }
+          : current));
+        if (data.totalUnread !== undefined) setTotalUnread(data.totalUnread);
+        break;
+      }
+      case 'chat.read':
+        patchConversation(data.conversationId, { unreadCount: data.unreadCount });
+        setTotalUnread(data.totalUnread);
+        break;
+      case 'chat.deleted':
+        setConversations((current) => current.filter((conv) => conv.id !== data.conversationId));
+        setSelectedConv((current) => (current && current.id === data.conversationId ? null : current));
+        break;
+      case 'resync':
+        fetchConversations();
+        break;
+      default:
+        break;
+    }
+  };
+
+  // Inbox previews only; message history is loaded per conversation
+  const fetchConversations = async (cursor = null) => {
+    const filters = filtersRef.current;
     try {
-      const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
       const response = await axios.get(`${BACKEND_URL}/chat/conversations`, {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: authHeaders(),
+        params: {
+          view: 'inbox',
+          limit: INBOX_PAGE_SIZE,
+          cursor: cursor || undefined,
+          unread_only: filters.unreadOnly || undefined,
+          search: filters.search.trim() || undefined
+        }
       });
-      setConversations(response.data.conversations);
+      const page = response.data.conversations;
+      setConversations((current) => (cursor ? [...current, ...page] : page));
       setTotalUnread(response.data.totalUnread);
+      setNextCursor(response.data.nextCursor);
     } catch (error) {
       console.error('Error fetching conversations:', error);
     } finally {
@@ -34,19 +101,46 @@ const ChatManager = () => {
     }
   };
 
+  const fetchMessages = async (conv, before = null) => {
+    const response = await axios.get(`${BACKEND_URL}/chat/conversations/${conv.id}/messages`, {
+      headers: authHeaders(),
+      params: { before: before ?? undefined }
+    });
+    return response.data;
+  };
+
+  const loadEarlierMessages = async () => {
+    if (!selectedConv || selectedConv.before === null) return;
+    try {
+      const page = await fetchMessages(selectedConv, selectedConv.before);
+      setSelectedConv((current) => (current && current.id === selectedConv.id
+        ? { ...current, messages: [...page.messages, ...current.messages], before: page.before }
+        : current));
+    } catch (error) {
+      console.error('Error loading messages:', error);
+    }
+  };
+
   const selectConversation = async (conv) => {
-    setSelectedConv(conv);
+    setSelectedConv({ ...conv, messages: [], before: null });
+    
+    try {
+      const page = await fetchMessages(conv);
+      setSelectedConv((current) => (current && current.id === conv.id
+        ? { ...current, messages: page.messages, before: page.before }
+        : current));
+    } catch (error) {
+      console.error('Error loading messages:', error);
+    }
     
     // Mark as read if there are unread messages
     if (conv.unreadCount > 0) {
       try {
-        const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
         await axios.put(
           `${BACKEND_URL}/chat/conversations/${conv.id}/read`,
           {},
-          { headers: { Authorization: `Bearer ${token}` } }
+          { headers: authHeaders() }
         );
-        fetchConversations();
       } catch (error) {
         console.error('Error marking as read:', error);
       }
@@ -58,16 +152,15 @@ const ChatManager = () => {
     if (!replyText.trim() || !selectedConv) return;
 
     try {
-      const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
       const response = await axios.post(
         `${BACKEND_URL}/chat/conversations/${selectedConv.id}/reply`,
         { message: replyText },
-        { headers: { Authorization: `Bearer ${token}` } }
+        { headers: authHeaders() }
       );
       
-      setSelectedConv(response.data.conversation);
+      const reply = response.data.message;
+      setSelectedConv((current) => ({ ...current, messages: appendMessage(current.messages, reply) }));
       setReplyText('');
-      fetchConversations();
     } catch (error) {
       console.error('Error sending reply:', error);
       alert('Failed to send reply');
@@ -78,15 +171,14 @@ const ChatManager = () => {
     if (!window.confirm('Are you sure you want to delete this conversation?')) return;
 
     try {
-      const token = localStorage.getItem('admin_token') || localStorage.getItem('adminToken');
       await axios.delete(`${BACKEND_URL}/chat/conversations/${id}`, {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: authHeaders()
       });
       
       if (selectedConv && selectedConv.id === id) {
         setSelectedConv(null);
       }
-      fetchConversations();
+      setConversations((current) => current.filter((conv) => conv.id !== id));
     } catch (error) {
       console.error('Error deleting conversation:', error);
       alert('Failed to delete conversation');
@@ -128,6 +220,30 @@ const ChatManager = () => {
                 {totalUnread} unread
               </span>
             )}
+            <input
+              type="search"
+              value={search}
+              onChange={(e) => setSearch(e.target.value)}
+              placeholder="Search name or email..."
+              style={{
+                width: '100%',
+                marginTop: '12px',
+                padding: '8px 12px',
+                border: '1px solid #e5e7eb',
+                borderRadius: '8px',
+                fontSize: '13px'
+              }}
+              data-testid="conversation-search"
+            />
+            <label style={{ display: 'flex', alignItems: 'center', gap: '6px', marginTop: '8px', fontSize: '12px', color: '#6b7280' }}>
+              <input
+                type="checkbox"
+                checked={unreadOnly}
+                onChange={(e) => setUnreadOnly(e.target.checked)}
+                data-testid="unread-only-toggle"
+              />
+              Unread only
+            </label>
           </div>
 
           <div style={{ flex: 1, overflowY: 'auto' }} data-testid="conversations-list">
@@ -161,6 +277,18 @@ const ChatManager = () => {
                 <p style={{ margin: '4px 0', fontSize: '12px', color: '#6b7280' }}>
                   {conv.customerEmail}
                 </p>
+                {conv.lastMessage && (
+                  <p style={{
+                    margin: '4px 0',
+                    fontSize: '12px',
+                    color: '#374151',
+                    whiteSpace: 'nowrap',
+                    overflow: 'hidden',
+                    textOverflow: 'ellipsis'
+                  }}>
+                    {conv.lastMessage.sender === 'admin' ? 'You: ' : ''}{conv.lastMessage.message}
+                  </p>
+                )}
                 <p style={{ margin: '4px 0', fontSize: '11px', color: '#9ca3af' }}>
                   <Clock size={12} style={{ display: 'inline', marginRight: '4px' }} />
                   {formatDate(conv.lastMessageAt)}
@@ -168,6 +296,17 @@ const ChatManager = () => {
               </div>
             ))}
 
+            {nextCursor && (
+              <button
+                className="admin-btn"
+                onClick={() => fetchConversations(nextCursor)}
+                style={{ margin: '12px auto', display: 'block' }}
+                data-testid="load-more-conversations"
+              >
+                Load more
+              </button>
+            )}
+
             {conversations.length === 0 && (
               <div style={{ padding: '40px', textAlign: 'center', color: '#6b7280' }}>
                 <MessageCircle size={48} style={{ margin: '0 auto 16px' }} />
@@ -216,6 +355,16 @@ const ChatManager = () => {
 
               {/* Messages */}
               <div style={{ flex: 1, overflowY: 'auto', padding: '20px' }} data-testid="messages-container">
+                {selectedConv.before !== null && (
+                  <button
+                    className="admin-btn"
+                    onClick={loadEarlierMessages}
+                    style={{ margin: '0 auto 16px', display: 'block' }}
+                    data-testid="load-earlier-messages"
+                  >
+                    Load earlier messages
+                  </button>
+                )}
                 {selectedConv.messages.map((msg) => (
                   <div
                     key={msg.id}
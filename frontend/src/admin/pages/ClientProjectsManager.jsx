@@ -33,6 +33,8 @@ import clientService from '../../services/clientService';
 
 export default function ClientProjectsManager() {
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [clients, setClients] = useState([]);
   const [loading, setLoading] = useState(true);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
@@ -44,6 +46,7 @@ export default function ClientProjectsManager() {
   const [chatMessage, setChatMessage] = useState('');
   const [sendingMessage, setSendingMessage] = useState(false);
   const chatEndRef = useRef(null);
+  const selectingRef = useRef(null);
 
   // Enhanced features state
   const [searchQuery, setSearchQuery] = useState('');
@@ -113,12 +116,14 @@ export default function ClientProjectsManager() {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  // The list shows summaries only; the full project is loaded when it is selected
   const fetchProjects = async () => {
     try {
-      const data = await clientService.getAllClientProjects();
-      setProjects(data);
-      if (data.length > 0 && !selectedProject) {
-        setSelectedProject(data[0]);
+      const page = await clientService.getClientProjectSummaries();
+      setProjects(page.items);
+      setNextCursor(page.next_cursor);
+      if (page.items.length > 0 && !selectedProject) {
+        selectProject(page.items[0]);
       }
     } catch (error) {
       console.error('Error fetching projects:', error);
@@ -128,6 +133,35 @@ export default function ClientProjectsManager() {
     }
   };
 
+  const fetchMoreProjects = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await clientService.getClientProjectSummaries({ cursor: nextCursor });
+      setProjects(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching projects:', error);
+      toast.error('Failed to fetch projects');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const selectProject = async (summary) => {
+    selectingRef.current = summary.id;
+    try {
+      const project = await clientService.getProject(summary.id);
+      // Ignore a slower response for a project that is no longer selected
+      if (selectingRef.current === summary.id) {
+        setSelectedProject(project);
+      }
+    } catch (error) {
+      console.error('Error fetching project:', error);
+      toast.error('Failed to load project');
+    }
+  };
+
   const fetchClients = async () => {
     try {
       const data = await clientService.getAllClients();
@@ -577,7 +611,7 @@ export default function ClientProjectsManager() {
                       selectedProject?.id === project.id ? 'bg-blue-50 border-l-4 border-blue-600' : ''
                     }`}
                     onClick={() => {
-                      setSelectedProject(project);
+                      selectProject(project);
                       setActiveTab('overview');
                     }}
                     data-testid={`project-item-${project.id}`}
@@ -585,7 +619,7 @@ export default function ClientProjectsManager() {
                     <div className="flex items-center justify-between gap-2 mb-3">
                       <div className="flex-1 min-w-0">
                         <h3 className="font-medium text-gray-900 truncate leading-tight">{project.name}</h3>
-                        <p className="text-xs text-gray-600 truncate mt-1.5">{getClientName(project.client_id)}</p>
+                        <p className="text-xs text-gray-600 truncate mt-1.5">{project.client_name || getClientName(project.client_id)}</p>
                       </div>
                       <Badge className={`${getStatusColor(project.status)} text-xs shrink-0 self-start`}>
                         {getStatusLabel(project.status)}
@@ -601,6 +635,13 @@ export default function ClientProjectsManager() {
                   </div>
                 ))
               )}
+              {nextCursor && (
+                <div className="p-4 text-center">
+                  <Button variant="outline" size="sm" onClick={fetchMoreProjects} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </Button>
+                </div>
+              )}
             </div>
           </div>
         </div>
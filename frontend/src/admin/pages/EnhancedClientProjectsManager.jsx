@@ -33,6 +33,8 @@ import clientService from '../../services/clientService';
 
 export default function EnhancedClientProjectsManager() {
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [clients, setClients] = useState([]);
   const [loading, setLoading] = useState(true);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
@@ -44,6 +46,7 @@ export default function EnhancedClientProjectsManager() {
   const [chatMessage, setChatMessage] = useState('');
   const [sendingMessage, setSendingMessage] = useState(false);
   const chatEndRef = useRef(null);
+  const selectingRef = useRef(null);
 
   // Enhanced features state
   const [searchQuery, setSearchQuery] = useState('');
@@ -75,11 +78,15 @@ export default function EnhancedClientProjectsManager() {
   });
 
   useEffect(() => {
-    fetchProjects();
     fetchClients();
     fetchNotifications();
   }, []);
 
+  // Filters are applied by the server, so a change starts again from the first page
+  useEffect(() => {
+    fetchProjects();
+  }, [statusFilter, priorityFilter, clientFilter]);
+
   useEffect(() => {
     if (selectedProject && activeTab === 'chat') {
       fetchChatMessages();
@@ -94,12 +101,20 @@ export default function EnhancedClientProjectsManager() {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  const summaryFilters = () => ({
+    status: statusFilter === 'all' ? undefined : statusFilter,
+    priority: priorityFilter === 'all' ? undefined : priorityFilter,
+    clientId: clientFilter === 'all' ? undefined : clientFilter,
+  });
+
+  // The list shows summaries only; the full project is loaded when it is selected
   const fetchProjects = async () => {
     try {
-      const data = await clientService.getAllClientProjects();
-      setProjects(data);
-      if (data.length > 0 && !selectedProject) {
-        setSelectedProject(data[0]);
+      const page = await clientService.getClientProjectSummaries(summaryFilters());
+      setProjects(page.items);
+      setNextCursor(page.next_cursor);
+      if (page.items.length > 0 && !selectedProject) {
+        selectProject(page.items[0]);
       }
     } catch (error) {
       console.error('Error fetching projects:', error);
@@ -109,6 +124,35 @@ export default function EnhancedClientProjectsManager() {
     }
   };
 
+  const fetchMoreProjects = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await clientService.getClientProjectSummaries({ ...summaryFilters(), cursor: nextCursor });
+      setProjects(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching projects:', error);
+      toast.error('Failed to fetch projects');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const selectProject = async (summary) => {
+    selectingRef.current = summary.id;
+    try {
+      const project = await clientService.getProject(summary.id);
+      // Ignore a slower response for a project that is no longer selected
+      if (selectingRef.current === summary.id) {
+        setSelectedProject(project);
+      }
+    } catch (error) {
+      console.error('Error fetching project:', error);
+      toast.error('Failed to load project');
+    }
+  };
+
   const fetchClients = async () => {
     try {
       const data = await clientService.getAllClients();
@@ -250,7 +294,7 @@ export default function EnhancedClientProjectsManager() {
   const handleExportProjects = () => {
     const dataToExport = filteredProjects.map(p => ({
       Name: p.name,
-      Client: getClientName(p.client_id),
+      Client: getProjectClientName(p),
       Status: getStatusLabel(p.status),
       Priority: p.priority,
       Progress: `${p.progress}%`,
@@ -516,6 +560,8 @@ export default function EnhancedClientProjectsManager() {
     return client ? client.name : 'Unknown';
   };
 
+  const getProjectClientName = (project) => project.client_name || getClientName(project.client_id);
+
   const toggleProjectSelection = (projectId) => {
     setSelectedProjects(prev => 
       prev.includes(projectId) 
@@ -532,16 +578,11 @@ export default function EnhancedClientProjectsManager() {
     }
   };
 
-  // Filter projects
-  const filteredProjects = projects.filter(project => {
-    const matchesSearch = project.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-                          getClientName(project.client_id).toLowerCase().includes(searchQuery.toLowerCase());
-    const matchesStatus = statusFilter === 'all' || project.status === statusFilter;
-    const matchesPriority = priorityFilter === 'all' || project.priority === priorityFilter;
-    const matchesClient = clientFilter === 'all' || project.client_id === clientFilter;
-    
-    return matchesSearch && matchesStatus && matchesPriority && matchesClient;
-  });
+  // Status, priority and client are filtered by the server; search covers the loaded pages
+  const filteredProjects = projects.filter(project =>
+    project.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
+    getProjectClientName(project).toLowerCase().includes(searchQuery.toLowerCase())
+  );
 
   // Calculate stats
   const stats = {
@@ -751,14 +792,14 @@ export default function EnhancedClientProjectsManager() {
                       <div 
                         className="flex-1 min-w-0"
                         onClick={() => {
-                          setSelectedProject(project);
+                          selectProject(project);
                           setActiveTab('overview');
                         }}
                       >
                         <div className="flex items-center justify-between gap-2 mb-3">
                           <div className="flex-1 min-w-0">
                             <h3 className="font-medium text-gray-900 truncate leading-tight">{project.name}</h3>
-                            <p className="text-xs text-gray-600 truncate mt-1.5">{getClientName(project.client_id)}</p>
+                            <p className="text-xs text-gray-600 truncate mt-1.5">{getProjectClientName(project)}</p>
                           </div>
                           <div className="flex flex-col gap-1 items-end shrink-0">
                             <Badge className={`${getStatusColor(project.status)} text-xs`}>
@@ -781,6 +822,13 @@ export default function EnhancedClientProjectsManager() {
                   </div>
                 ))
               )}
+              {nextCursor && (
+                <div className="p-4 text-center">
+                  <Button variant="outline" size="sm" onClick={fetchMoreProjects} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </Button>
+                </div>
+              )}
             </div>
           </div>
         </div>
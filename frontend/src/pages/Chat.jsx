@@ -2,8 +2,11 @@ import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { MessageCircle, Send, User, Mail, Phone, Clock, Star, CheckCircle } from 'lucide-react';
 import axios from 'axios';
 import { getBackendURL } from '../lib/utils';
+import { subscribeRealtime, appendMessage } from '../services/realtime';
 
 const BACKEND_URL = getBackendURL();
+// Messages per delta request; a longer gap (e.g. after a reconnect) is fetched in pages
+const CHAT_PAGE_SIZE = 100;
 
 const Chat = () => {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
@@ -26,8 +29,8 @@ const Chat = () => {
   const [testimonialSubmitted, setTestimonialSubmitted] = useState(false);
   const [hoveredRating, setHoveredRating] = useState(0);
   const messagesEndRef = useRef(null);
-  const intervalRef = useRef(null);
   const lastFetchRef = useRef(0);
+  const conversationRef = useRef(null);
 
   // Optimized scroll to bottom
   const scrollToBottom = useCallback(() => {
@@ -60,6 +63,49 @@ const Chat = () => {
     }
   }, [userInfo.email, userInfo.phone]);
 
+  // Only the messages after the last one shown are transferred; the whole
+  // conversation when there is none yet
+  const fetchNewMessages = useCallback(async () => {
+    const messages = conversationRef.current?.messages || [];
+    if (messages.length === 0) {
+      lastFetchRef.current = 0;
+      await fetchConversation();
+      return;
+    }
+
+    try {
+      let after = messages[messages.length - 1].id;
+      let page;
+      do {
+        const response = await axios.get(
+          `${BACKEND_URL}/chat/user-conversation`,
+          {
+            params: {
+              email: userInfo.email,
+              phone: userInfo.phone || '',
+              after,
+              limit: CHAT_PAGE_SIZE
+            }
+          }
+        );
+        if (!response.data.success) return;
+        page = response.data.conversation.messages;
+        setConversation((current) => current && {
+          ...current,
+          messages: page.reduce(appendMessage, current.messages),
+          lastMessageAt: response.data.conversation.lastMessageAt
+        });
+        if (page.length > 0) after = page[page.length - 1].id;
+      } while (page.length === CHAT_PAGE_SIZE);
+    } catch (error) {
+      console.error('Error fetching new messages:', error);
+    }
+  }, [userInfo.email, userInfo.phone, fetchConversation]);
+
+  useEffect(() => {
+    conversationRef.current = conversation;
+  }, [conversation]);
+
   // Check localStorage on mount
   useEffect(() => {
     const savedUserInfo = localStorage.getItem('chat_user_info');
@@ -78,26 +124,27 @@ const Chat = () => {
     }
   }, []);
 
-  // Auto-refresh with cleanup
+  // Admin replies and read receipts are pushed once the conversation exists
+  const conversationId = conversation?.id;
   useEffect(() => {
-    if (isAuthenticated && userInfo.email) {
-      // Clear existing interval
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current);
+    if (!isAuthenticated || !userInfo.email || !conversationId) return undefined;
+
+    return subscribeRealtime({ conversation_id: conversationId, email: userInfo.email }, ({ type, data }) => {
+      if (type === 'chat.message') {
+        setConversation((current) => current && {
+          ...current,
+          messages: appendMessage(current.messages, data.message)
+        });
+      } else if (type === 'chat.read') {
+        setConversation((current) => current && {
+          ...current,
+          messages: current.messages.map((msg) => (msg.sender === 'customer' ? { ...msg, read: true } : msg))
+        });
+      } else if (type === 'resync') {
+        fetchNewMessages();
       }
-      
-      // Set new interval for 5 seconds
-      intervalRef.current = setInterval(() => {
-        fetchConversation();
-      }, 5000);
-      
-      return () => {
-        if (intervalRef.current) {
-          clearInterval(intervalRef.current);
-        }
-      };
-    }
-  }, [isAuthenticated, userInfo.email, fetchConversation]);
+    });
+  }, [isAuthenticated, userInfo.email, conversationId, fetchNewMessages]);
 
   // Scroll when conversation changes
   useEffect(() => {
@@ -184,8 +231,8 @@ const Chat = () => {
         { timeout: 10000 }
       );
 
-      // Refresh conversation
-      await fetchConversation();
+      // Pick up the stored message (and anything else new)
+      await fetchNewMessages();
     } catch (error) {
       console.error('Error sending message:', error);
       setMessage(tempMessage); // Restore message on error
@@ -196,9 +243,6 @@ const Chat = () => {
   };
 
   const handleLogout = () => {
-    if (intervalRef.current) {
-      clearInterval(intervalRef.current);
-    }
     localStorage.removeItem('chat_user_info');
     setIsAuthenticated(false);
     setConversation(null);
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../services/api';
 import clientService from '../services/clientService';
+import { subscribeRealtime, appendMessage } from '../services/realtime';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -26,6 +27,9 @@ import {
   Search, Filter, Download as DownloadIcon, Tag, AlertTriangle, RefreshCw
 } from 'lucide-react';
 
+// Messages per delta request; a longer gap (e.g. after a reconnect) is fetched in pages
+const CHAT_PAGE_SIZE = 100;
+
 export default function ClientDashboard() {
   const navigate = useNavigate();
   const [client, setClient] = useState(null);
@@ -39,6 +43,7 @@ export default function ClientDashboard() {
   const [commentText, setCommentText] = useState('');
   const [submittingComment, setSubmittingComment] = useState(false);
   const chatEndRef = useRef(null);
+  const chatMessagesRef = useRef([]);
 
   // Testimonial submission state
   const [showTestimonialDialog, setShowTestimonialDialog] = useState(false);
@@ -54,6 +59,8 @@ export default function ClientDashboard() {
   const [searchQuery, setSearchQuery] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [priorityFilter, setPriorityFilter] = useState('all');
+  // Unread admin messages per project id
+  const [unreadByProject, setUnreadByProject] = useState({});
 
   useEffect(() => {
     const token = localStorage.getItem('client_token');
@@ -66,10 +73,12 @@ export default function ClientDashboard() {
 
     setClient(JSON.parse(clientData));
     fetchProjects(token);
+    fetchUnreadCounts(token);
     
     // Auto-refresh projects every 30 seconds
     const refreshInterval = setInterval(() => {
       fetchProjects(token);
+      fetchUnreadCounts(token);
     }, 30000); // 30 seconds
     
     return () => clearInterval(refreshInterval);
@@ -79,16 +88,32 @@ export default function ClientDashboard() {
     if (selectedProject && activeTab === 'chat') {
       fetchChatMessages();
       
-      // Auto-refresh chat messages every 10 seconds when on chat tab
-      const chatRefreshInterval = setInterval(() => {
-        fetchChatMessages();
-      }, 10000); // 10 seconds
-      
-      return () => clearInterval(chatRefreshInterval);
+      // New messages and read receipts are pushed while the chat tab is open
+      const token = localStorage.getItem('client_token');
+      return subscribeRealtime({ token }, ({ type, data }) => {
+        if (type === 'resync') {
+          fetchNewChatMessages();
+        } else if (data.project_id !== selectedProject.id) {
+          return;
+        } else if (type === 'project.chat.message') {
+          const since = lastChatMessageId();
+          setChatMessages((current) => appendMessage(current, data.message));
+          // Fetching marks admin messages read, which sends the admin a read receipt
+          if (data.message.sender_type === 'admin') fetchNewChatMessages(since);
+        } else if (type === 'project.chat.read') {
+          setChatMessages((current) => current.map((msg) => (
+            msg.sender_type === data.sender_type ? { ...msg, read: true } : msg
+          )));
+          if (data.sender_type === 'admin') {
+            setUnreadByProject((current) => ({ ...current, [data.project_id]: data.unread_count }));
+          }
+        }
+      });
     }
   }, [selectedProject, activeTab]);
 
   useEffect(() => {
+    chatMessagesRef.current = chatMessages;
     scrollToBottom();
   }, [chatMessages]);
 
@@ -128,13 +153,58 @@ export default function ClientDashboard() {
     }
   };
 
+  const fetchUnreadCounts = async (token) => {
+    try {
+      const data = await clientService.getClientUnreadCount(token);
+      setUnreadByProject(data.projects);
+    } catch (error) {
+      console.error('Error fetching unread counts:', error);
+    }
+  };
+
+  const clearUnread = (projectId) => {
+    setUnreadByProject((current) => ({ ...current, [projectId]: 0 }));
+  };
+
   const fetchChatMessages = async () => {
     if (!selectedProject) return;
     
     const token = localStorage.getItem('client_token');
     try {
       const messages = await clientService.getClientChatMessages(selectedProject.id, token);
+      chatMessagesRef.current = messages;
       setChatMessages(messages);
+      // Fetching marks the admin's messages read
+      clearUnread(selectedProject.id);
+    } catch (error) {
+      console.error('Error fetching chat messages:', error);
+    }
+  };
+
+  const lastChatMessageId = () => {
+    const messages = chatMessagesRef.current;
+    return messages.length > 0 ? messages[messages.length - 1].id : null;
+  };
+
+  // Only the messages after `since` (default: the last one shown) are transferred
+  const fetchNewChatMessages = async (since = lastChatMessageId()) => {
+    if (!selectedProject) return;
+    if (!since) {
+      fetchChatMessages();
+      return;
+    }
+
+    const token = localStorage.getItem('client_token');
+    try {
+      let after = since;
+      let page;
+      do {
+        page = await clientService.getClientChatMessages(selectedProject.id, token, { after, limit: CHAT_PAGE_SIZE });
+        // Refetched messages replace the copies shown, e.g. with read: true
+        const ids = new Set(page.map((msg) => msg.id));
+        setChatMessages((current) => page.reduce(appendMessage, current.filter((msg) => !ids.has(msg.id))));
+        if (page.length > 0) after = page[page.length - 1].id;
+      } while (page.length === CHAT_PAGE_SIZE);
     } catch (error) {
       console.error('Error fetching chat messages:', error);
     }
@@ -148,9 +218,9 @@ export default function ClientDashboard() {
     const token = localStorage.getItem('client_token');
 
     try {
-      await clientService.sendClientChatMessage(selectedProject.id, chatMessage, token);
+      const sent = await clientService.sendClientChatMessage(selectedProject.id, chatMessage, token);
       setChatMessage('');
-      fetchChatMessages();
+      setChatMessages((current) => appendMessage(current, sent));
       toast.success('Message sent!');
     } catch (error) {
       console.error('Error sending message:', error);
@@ -615,7 +685,14 @@ export default function ClientDashboard() {
                         }`}
                         data-testid={`project-item-${project.id}`}
                       >
-                        <h3 className="font-semibold text-gray-900 mb-2">{project.name}</h3>
+                        <div className="flex items-start justify-between gap-2 mb-2">
+                          <h3 className="font-semibold text-gray-900">{project.name}</h3>
+                          {unreadByProject[project.id] > 0 && (
+                            <span className="bg-red-500 text-white text-xs rounded-full min-w-5 h-5 px-1.5 flex items-center justify-center shrink-0">
+                              {unreadByProject[project.id]}
+                            </span>
+                          )}
+                        </div>
                         <div className="flex flex-wrap gap-2 mb-2">
                           <Badge className={`${getStatusColor(project.status)} text-xs`}>
                             {getStatusLabel(project.status)}
@@ -717,9 +794,14 @@ export default function ClientDashboard() {
                           <Activity className="w-4 h-4 mr-1" />
                           Activity
                         </TabsTrigger>
-                        <TabsTrigger value="chat" className="text-xs lg:text-sm">
+                        <TabsTrigger value="chat" className="text-xs lg:text-sm relative">
                           <MessageCircle className="w-4 h-4 mr-1" />
                           Chat
+                          {unreadByProject[selectedProject.id] > 0 && (
+                            <span className="absolute -top-1 -right-1 bg-red-500 text-white text-xs rounded-full w-4 h-4 flex items-center justify-center">
+                              {unreadByProject[selectedProject.id]}
+                            </span>
+                          )}
                         </TabsTrigger>
                       </TabsList>
 
@@ -7,6 +7,7 @@ import { Card } from '../components/ui/card';
 import api from '../services/api';
 import projectService from '../services/projectService';
 import { getPublicTestimonials } from '../services/testimonialService';
+import { getHomeBundle } from '../services/publicService';
 import { trackPageView } from '../services/analytics';
 
 const Home = () => {
@@ -22,66 +23,82 @@ const Home = () => {
     trackPageView('home');
   }, []);
 
-  const fetchContent = async () => {
-    try {
-      // Fetch home content, about content, projects, and testimonials with error handling
-      const [homeResponse, aboutResponse, projectsData, testimonialsData] = await Promise.allSettled([
-        api.get('/content/').catch(err => {
-          console.warn('Home content fetch failed, using defaults');
-          return { data: null };
-        }),
-        api.get('/about/').catch(err => {
-          console.warn('About content fetch failed, will use defaults for stats');
-          return { data: null };
-        }),
-        projectService.getPublicProjects().catch(err => {
-          console.warn('Projects fetch failed, using empty array');
-          return [];
-        }),
-        getPublicTestimonials().catch(err => {
-          console.warn('Testimonials fetch failed, using empty array');
-          return [];
-        })
-      ]);
-      
-      // Handle fulfilled promises
-      if (homeResponse.status === 'fulfilled' && homeResponse.value?.data) {
-        setContent(homeResponse.value.data);
-      }
-      
-      if (aboutResponse.status === 'fulfilled' && aboutResponse.value?.data) {
-        setAboutContent(aboutResponse.value.data);
-      }
+  const applyHomeData = ({ home, about, projects, testimonials }) => {
+    if (home) setContent(home);
+    if (about) setAboutContent(about);
 
-      // Handle projects data
-      if (projectsData.status === 'fulfilled' && projectsData.value) {
-        const projects = projectsData.value;
-        const featured = projects
-          .filter(p => p.featured)
-          .slice(0, 3)
-          .map(p => ({
-            id: p.id,
-            title: p.title,
-            slug: p.slug,
-            category: p.category,
-            description: p.description,
-            image: p.image_url,
-            technologies: p.tech_stack || [],
-            featured: p.featured
-          }));
-        setFeaturedProjects(featured);
-      }
+    if (projects) {
+      const featured = projects
+        .filter(p => p.featured)
+        .slice(0, 3)
+        .map(p => ({
+          id: p.id,
+          title: p.title,
+          slug: p.slug,
+          category: p.category,
+          description: p.description,
+          image: p.image_url,
+          technologies: p.tech_stack || [],
+          featured: p.featured
+        }));
+      setFeaturedProjects(featured);
+    }
+
+    if (testimonials) setClientTestimonials(testimonials);
+  };
 
-      // Handle testimonials data
-      if (testimonialsData.status === 'fulfilled' && testimonialsData.value) {
-        setClientTestimonials(testimonialsData.value);
+  // One request for the whole page; falls back to the separate endpoints
+  const fetchBundle = async () => {
+    const bundle = await getHomeBundle();
+    applyHomeData({
+      home: bundle.content,
+      about: bundle.about,
+      projects: bundle.featured_projects,
+      testimonials: bundle.testimonials
+    });
+  };
+
+  const fetchSeparately = async () => {
+    // Fetch home content, about content, projects, and testimonials with error handling
+    const [homeResponse, aboutResponse, projectsData, testimonialsData] = await Promise.allSettled([
+      api.get('/content/').catch(err => {
+        console.warn('Home content fetch failed, using defaults');
+        return { data: null };
+      }),
+      api.get('/about/').catch(err => {
+        console.warn('About content fetch failed, will use defaults for stats');
+        return { data: null };
+      }),
+      projectService.getPublicProjects().catch(err => {
+        console.warn('Projects fetch failed, using empty array');
+        return [];
+      }),
+      getPublicTestimonials().catch(err => {
+        console.warn('Testimonials fetch failed, using empty array');
+        return [];
+      })
+    ]);
+
+    applyHomeData({
+      home: homeResponse.status === 'fulfilled' ? homeResponse.value?.data : null,
+      about: aboutResponse.status === 'fulfilled' ? aboutResponse.value?.data : null,
+      projects: projectsData.status === 'fulfilled' ? projectsData.value : null,
+      testimonials: testimonialsData.status === 'fulfilled' ? testimonialsData.value : null
+    });
+  };
+
+  const fetchContent = async () => {
+    try {
+      await fetchBundle();
+    } catch (bundleError) {
+      console.warn('Home bundle fetch failed, loading sections separately');
+      try {
+        await fetchSeparately();
+      } catch (error) {
+        console.error('Error fetching content:', error);
       }
-      
-      setLoading(false);
-    } catch (error) {
-      console.error('Error fetching content:', error);
-      setLoading(false);
     }
+    setLoading(false);
   };
 
   // Use content from API or fallback to defaults
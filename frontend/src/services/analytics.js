@@ -3,21 +3,92 @@ import { getBackendURL } from '../lib/utils';
 
 const API_URL = getBackendURL();
 
+const FLUSH_INTERVAL_MS = 2000;
+const MAX_BATCH_EVENTS = 100;
+
+let queue = [];
+let flushTimer = null;
+
 /**
- * Track analytics event - fails silently to not block user actions
+ * Send queued events in one request. Uses sendBeacon when available so events
+ * survive page unloads; a plain string body goes out as text/plain, which
+ * avoids a CORS preflight.
  */
-const trackEvent = async (eventType, data = {}) => {
+const flushEvents = () => {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+
+  while (queue.length) {
+    const batch = queue.splice(0, MAX_BATCH_EVENTS);
+    const body = JSON.stringify(batch);
+    try {
+      if (navigator.sendBeacon && navigator.sendBeacon(`${API_URL}/analytics/events`, body)) {
+        continue;
+      }
+      axios.post(`${API_URL}/analytics/events`, batch, { timeout: 2000 }).catch((error) => {
+        console.debug('Analytics tracking failed:', error.message);
+      });
+    } catch (error) {
+      // Fail silently - don't block user actions or show errors
+      console.debug('Analytics tracking failed:', error.message);
+    }
+  }
+};
+
+if (typeof window !== 'undefined') {
+  window.addEventListener('pagehide', flushEvents);
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushEvents();
+  });
+}
+
+const VISITOR_ID_KEY = 'pf_visitor_id';
+const SESSION_ID_KEY = 'pf_session_id';
+
+const randomId = () => (window.crypto?.randomUUID
+  ? window.crypto.randomUUID()
+  : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`);
+
+const getStoredId = (storage, key) => {
   try {
-    // Non-blocking async call
-    await axios.post(`${API_URL}/analytics/event`, {
-      event_type: eventType,
-      ...data
-    }, {
-      timeout: 2000 // 2 second timeout
-    });
+    let id = storage.getItem(key);
+    if (!id) {
+      id = randomId();
+      storage.setItem(key, id);
+    }
+    return id;
   } catch (error) {
-    // Fail silently - don't block user actions or show errors
-    console.debug('Analytics tracking failed:', error.message);
+    // Storage disabled (private mode etc.) - track without an id
+    return undefined;
+  }
+};
+
+/**
+ * Anonymous random id kept in localStorage, used only to estimate unique visitors
+ */
+const getVisitorId = () => getStoredId(localStorage, VISITOR_ID_KEY);
+
+/**
+ * Per-tab random id kept in sessionStorage, used to follow a visit through the conversion funnel
+ */
+const getSessionId = () => getStoredId(sessionStorage, SESSION_ID_KEY);
+
+/**
+ * Track analytics event - queued and sent in batches, fails silently
+ */
+const trackEvent = (eventType, data = {}) => {
+  queue.push({
+    event_type: eventType,
+    visitor_id: getVisitorId(),
+    session_id: getSessionId(),
+    ...data
+  });
+  if (queue.length >= MAX_BATCH_EVENTS) {
+    flushEvents();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushEvents, FLUSH_INTERVAL_MS);
   }
 };
 
@@ -35,6 +35,37 @@ const api = axios.create({
 const MAX_RETRIES = 2;
 const RETRY_DELAY = 2000; // 2 seconds
 
+// Static snapshot of the public data (backend/scripts/maintenance/export_public_snapshot.py).
+// When set, public GETs wait less for a sleeping backend and are answered from the snapshot instead.
+const SNAPSHOT_URL = (process.env.REACT_APP_SNAPSHOT_URL || '').replace(/\/+$/, '');
+const SNAPSHOT_TIMEOUT = 8000;
+
+// Endpoint paths that have a snapshot file
+const SNAPSHOT_PATHS = [
+  /^\/(services|projects|blogs|testimonials|skills|pricing|content|about|contact-page|settings|feelings-services)$/,
+  /^\/blogs\/[^/]+$/,
+  /^\/pages\/[^/]+$/,
+  /^\/public\/bundle$/,
+];
+
+// Snapshot file for a GET: its path without /api, with .json added
+const snapshotFile = (url = '') => {
+  const [rawPath, query = ''] = url.split('?');
+  const path = rawPath.replace(/\/+$/, '');
+  if (!SNAPSHOT_PATHS.some((pattern) => pattern.test(path))) return null;
+  if (path === '/feelings-services' && /(^|&)active_only=true(&|$)/.test(query)) {
+    return 'feelings-services.active.json';
+  }
+  return query && path !== '/feelings-services' ? null : `${path.slice(1)}.json`;
+};
+
+const fromSnapshot = async (config) => {
+  const file = snapshotFile(config.url);
+  const response = await axios.get(`${SNAPSHOT_URL}/current/${file}`, { timeout: SNAPSHOT_TIMEOUT });
+  console.log('[API Snapshot]', file);
+  return { ...response, config };
+};
+
 // Helper function to delay
 const delay = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
@@ -49,6 +80,11 @@ api.interceptors.request.use(
       config.headers.Authorization = `Bearer ${token}`;
     }
 
+    if (SNAPSHOT_URL && config.method === 'get' && snapshotFile(config.url)) {
+      config._snapshot = true;
+      config.timeout = Math.min(config.timeout || API_TIMEOUT, SNAPSHOT_TIMEOUT);
+    }
+
     console.log(
       '[API Request]',
       config.method?.toUpperCase(),
@@ -65,6 +101,15 @@ api.interceptors.response.use(
   (response) => response,
   async (error) => {
     const config = error.config;
+
+    // Backend asleep or failing: serve public data from the static snapshot
+    if (config?._snapshot && (!error.response || error.response.status >= 500)) {
+      try {
+        return await fromSnapshot(config);
+      } catch (snapshotError) {
+        console.error('Snapshot fallback failed:', snapshotError.message);
+      }
+    }
     
     // Log the error with more details
     if (error.code === 'ECONNABORTED' || error.message.includes('timeout')) {
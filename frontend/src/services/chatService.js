@@ -21,6 +21,17 @@ class ChatService {
     }
   }
 
+  // Unread totals for the admin badge: public chat and client project chats
+  async getUnreadTotals() {
+    try {
+      const response = await api.get('/chat/unread-totals');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching unread totals:', error);
+      throw error;
+    }
+  }
+
   async markAsRead(id) {
     try {
       const response = await api.put(`/chat/conversations/${id}/read`);
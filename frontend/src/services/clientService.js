@@ -55,9 +55,15 @@ const clientService = {
     return response.data;
   },
 
-  // Get all client projects
-  getAllClientProjects: async () => {
-    const response = await api.get('/admin/client-projects/');
+  // Get one page of project summaries for list views; pass next_cursor back for the next page
+  getClientProjectSummaries: async ({ status, priority, clientId, cursor, limit } = {}) => {
+    const params = {};
+    if (status) params.status = status;
+    if (priority) params.priority = priority;
+    if (clientId) params.client_id = clientId;
+    if (cursor) params.cursor = cursor;
+    if (limit) params.limit = limit;
+    const response = await api.get('/admin/client-projects/summary', { params });
     return response.data;
   },
 
@@ -189,9 +195,20 @@ const clientService = {
     return response.data;
   },
 
-  // Get chat messages (Client)
-  getClientChatMessages: async (projectId, token) => {
+  // Get chat messages (Client); with `after` (a message id) only newer messages, up to `limit`
+  getClientChatMessages: async (projectId, token, { after, limit } = {}) => {
     const response = await api.get(`/client/projects/${projectId}/chat`, {
+      params: after ? { after, limit } : {},
+      headers: {
+        Authorization: `Bearer ${token}`
+      }
+    });
+    return response.data;
+  },
+
+  // Get unread admin messages across the client's projects (Client)
+  getClientUnreadCount: async (token) => {
+    const response = await api.get('/client/projects/unread-count', {
       headers: {
         Authorization: `Bearer ${token}`
       }
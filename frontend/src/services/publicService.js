@@ -0,0 +1,10 @@
+import api from './api';
+
+/**
+ * Everything the home page renders in one request: content, about, services,
+ * featured projects, testimonials, skills and pricing.
+ */
+export const getHomeBundle = async () => {
+  const response = await api.get('/public/bundle');
+  return response.data;
+};
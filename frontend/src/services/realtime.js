@@ -0,0 +1,102 @@
+import { getBackendURL } from '../lib/utils';
+
+const RECONNECT_BASE_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+// WebSocket attempts that never got through before falling back to SSE
+const WEBSOCKET_ATTEMPTS = 2;
+
+/**
+ * Append a message to a list unless it is already there (our own sends come
+ * back as events too).
+ */
+export const appendMessage = (messages = [], message) => (
+  messages.some((existing) => existing.id === message.id) ? messages : [...messages, message]
+);
+
+/**
+ * Subscribe to realtime chat events.
+ *
+ * `params` is { token } for admins and clients, or { conversation_id, email }
+ * for the public chat widget. Uses a WebSocket and falls back to Server-Sent
+ * Events when the WebSocket can't connect. `onEvent` receives { type, data };
+ * a 'resync' event means events may have been missed (reconnect or backlog
+ * overflow) and the caller should re-fetch. Returns an unsubscribe function.
+ */
+export const subscribeRealtime = (params, onEvent) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value)
+  ).toString();
+  const baseURL = getBackendURL();
+
+  let socket = null;
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+  let failures = 0;
+  let connectedBefore = false;
+  let useEventSource = typeof WebSocket === 'undefined';
+
+  const handle = (raw) => {
+    let event;
+    try {
+      event = JSON.parse(raw);
+    } catch (error) {
+      return;
+    }
+    if (event.type === 'ping') return;
+    if (event.type === 'ready') {
+      failures = 0;
+      if (connectedBefore) onEvent({ type: 'resync', data: {} });
+      connectedBefore = true;
+      return;
+    }
+    onEvent(event);
+  };
+
+  const scheduleReconnect = () => {
+    if (closed) return;
+    const delay = Math.min(RECONNECT_BASE_MS * 2 ** failures, RECONNECT_MAX_MS);
+    failures += 1;
+    retryTimer = setTimeout(connect, delay * (0.5 + Math.random() / 2));
+  };
+
+  const connectEventSource = () => {
+    // EventSource reconnects by itself; each reconnect starts with a 'ready'
+    source = new EventSource(`${baseURL}/realtime/events?${query}`);
+    source.onmessage = (message) => handle(message.data);
+  };
+
+  const connectWebSocket = () => {
+    let opened = false;
+    socket = new WebSocket(`${baseURL.replace(/^http/, 'ws')}/realtime/ws?${query}`);
+    socket.onopen = () => {
+      opened = true;
+    };
+    socket.onmessage = (message) => handle(message.data);
+    socket.onclose = () => {
+      socket = null;
+      if (!opened && !connectedBefore && failures + 1 >= WEBSOCKET_ATTEMPTS) {
+        useEventSource = true;
+      }
+      scheduleReconnect();
+    };
+  };
+
+  function connect() {
+    if (closed) return;
+    if (useEventSource) {
+      connectEventSource();
+    } else {
+      connectWebSocket();
+    }
+  }
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (socket) socket.close();
+    if (source) source.close();
+  };
+};
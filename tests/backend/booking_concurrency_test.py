@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Booking Concurrency Testing
+Hammers a single booking slot with parallel requests and checks it is never overbooked
+"""
+
+import requests
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+PARALLEL_REQUESTS = 300
+
+class BookingConcurrencyTester:
+    def __init__(self, base_url="http://localhost:8001/api"):
+        self.base_url = base_url
+        self.token = None
+        self.tests_run = 0
+        self.tests_passed = 0
+        self.failed_tests = []
+        self.created_booking_ids = []
+        self.active_before = 0
+
+    def log_result(self, test_name, success, error=None):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {test_name} - PASSED")
+        else:
+            self.failed_tests.append({"test": test_name, "error": error})
+            print(f"❌ {test_name} - FAILED: {error}")
+
+    def admin_headers(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+    def test_admin_login(self):
+        """Login as admin to inspect and clean up bookings"""
+        response = requests.post(
+            f"{self.base_url}/admins/login",
+            json={"username": "admin", "password": "admin123"}
+        )
+        success = response.status_code == 200 and 'token' in response.json()
+        self.log_result("Admin Login", success, None if success else f"Got {response.status_code}")
+        if success:
+            self.token = response.json()['token']
+        return success
+
+    def find_open_slot(self):
+        """Pick the first slot with free spots in the next month"""
+        start_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        response = requests.get(
+            f"{self.base_url}/bookings/available-slots",
+            params={"start_date": start_date, "days": 30}
+        )
+        if response.status_code != 200:
+            self.log_result("Find Open Slot", False, f"Got {response.status_code}")
+            return None
+
+        for slot in response.json():
+            if slot['is_available']:
+                self.log_result("Find Open Slot", True)
+                print(f"   Slot: {slot['date']} {slot['time_slot']} ({slot['available_spots']} spots free)")
+                return slot
+
+        self.log_result("Find Open Slot", False, "No available slot in the next 30 days")
+        return None
+
+    def count_active(self, slot):
+        """Pending/confirmed bookings stored for the slot"""
+        response = requests.get(
+            f"{self.base_url}/bookings/admin/all",
+            params={"date": slot['date']},
+            headers=self.admin_headers()
+        )
+        return len([
+            b for b in response.json()
+            if b['preferred_time_slot'] == slot['time_slot'] and b['status'] in ("pending", "confirmed")
+        ])
+
+    def book(self, slot, index):
+        booking = {
+            "name": f"Concurrency Test {index}",
+            "email": f"concurrency{index}@example.com",
+            "phone": "9999999999",
+            "preferred_date": slot['date'],
+            "preferred_time_slot": slot['time_slot'],
+            "message": "booking_concurrency_test"
+        }
+        response = requests.post(f"{self.base_url}/bookings/", json=booking)
+        return response.status_code, response.json() if response.status_code == 200 else None
+
+    def test_parallel_bookings(self, slot):
+        """Fire PARALLEL_REQUESTS bookings at one slot at once"""
+        self.active_before = self.count_active(slot)
+        print(f"\n🔨 Sending {PARALLEL_REQUESTS} parallel bookings...")
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            results = list(pool.map(lambda i: self.book(slot, i), range(PARALLEL_REQUESTS)))
+
+        accepted = [body for status_code, body in results if status_code == 200]
+        rejected = [status_code for status_code, _ in results if status_code == 400]
+        errors = [status_code for status_code, _ in results if status_code not in (200, 400)]
+        self.created_booking_ids = [body['id'] for body in accepted]
+        print(f"   Accepted: {len(accepted)}, rejected: {len(rejected)}, errors: {len(errors)}")
+
+        self.log_result(
+            "Accepted bookings match free spots",
+            len(accepted) == slot['available_spots'],
+            f"{len(accepted)} accepted for {slot['available_spots']} free spots"
+        )
+        self.log_result("No server errors", not errors, f"Unexpected statuses: {sorted(set(errors))}")
+
+    def test_slot_not_overbooked(self, slot):
+        """Stored bookings grew by exactly the free spots and the slot now reports full"""
+        added = self.count_active(slot) - self.active_before
+        self.log_result(
+            "Slot not overbooked",
+            added == slot['available_spots'],
+            f"{added} bookings stored for {slot['available_spots']} free spots"
+        )
+        response = requests.get(
+            f"{self.base_url}/bookings/check-availability",
+            params={"date": slot['date'], "time_slot": slot['time_slot']}
+        )
+        availability = response.json()
+        self.log_result("Slot reports full", not availability.get("available"), f"Availability: {availability}")
+
+    def test_cancel_releases_spot(self, slot):
+        """Cancelling one booking frees exactly one spot"""
+        if not self.created_booking_ids:
+            return
+        booking_id = self.created_booking_ids[0]
+        requests.put(
+            f"{self.base_url}/bookings/admin/{booking_id}",
+            json={"status": "cancelled"},
+            headers=self.admin_headers()
+        )
+        status_code, body = self.book(slot, "after-cancel")
+        if body:
+            self.created_booking_ids.append(body['id'])
+        self.log_result("Cancel releases spot", status_code == 200, f"Rebooking got {status_code}")
+
+        status_code, body = self.book(slot, "after-refill")
+        if body:
+            self.created_booking_ids.append(body['id'])
+        self.log_result("Refilled slot rejects again", status_code == 400, f"Extra booking got {status_code}")
+
+    def cleanup_test_data(self):
+        """Delete every booking this run created"""
+        print("\n🧹 Cleaning up test bookings...")
+        for booking_id in self.created_booking_ids:
+            requests.delete(f"{self.base_url}/bookings/admin/{booking_id}", headers=self.admin_headers())
+
+    def run_all_tests(self):
+        """Run all booking concurrency tests"""
+        print("🚀 Starting Booking Concurrency Tests")
+        print("=" * 70)
+
+        if not self.test_admin_login():
+            print("❌ Admin authentication failed. Stopping tests.")
+            return False
+
+        slot = self.find_open_slot()
+        if slot:
+            self.test_parallel_bookings(slot)
+            self.test_slot_not_overbooked(slot)
+            self.test_cancel_releases_spot(slot)
+            self.cleanup_test_data()
+
+        print("\n" + "=" * 70)
+        print("📊 BOOKING CONCURRENCY TEST SUMMARY")
+        print("=" * 70)
+        print(f"Total Tests: {self.tests_run}")
+        print(f"Passed: {self.tests_passed}")
+        print(f"Failed: {len(self.failed_tests)}")
+
+        if self.failed_tests:
+            print("\n❌ FAILED TESTS:")
+            for test in self.failed_tests:
+                print(f"   • {test['test']}: {test['error']}")
+
+        return len(self.failed_tests) == 0
+
+def main():
+    """Main test execution"""
+    tester = BookingConcurrencyTester()
+    success = tester.run_all_tests()
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "total_tests": tester.tests_run,
+        "passed_tests": tester.tests_passed,
+        "failed_tests": len(tester.failed_tests),
+        "failed_test_details": tester.failed_tests
+    }
+
+    with open('/app/test_reports/booking_concurrency_test_results.json', 'w') as f:
+        json.dump(results, f, indent=2)
+
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())